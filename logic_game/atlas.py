@@ -0,0 +1,201 @@
+import hashlib
+import io
+import json
+import os
+import re
+
+import pygame
+
+from camera import LOD_ZOOM, MAX_ZOOM, ZOOM_STEP
+from fonts import CACHE_DIR, FONT_NAME, font_path, get_font
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "assets")
+ATLAS_WIDTH = 2048
+# Bump when the baked look changes so atlases cached on disk are rebuilt
+ATLAS_VERSION = 1
+# Gate symbol font size at zoom 1
+SYMBOL_SIZE = 32
+# Sprites baked outside the atlas (multi-input heights, fitted zooms)
+MAX_LOOSE_SPRITES = 256
+
+_GRAPHICS = {}  # (image_file, symbol) -> size at zoom 1
+_SPRITES = None  # (image_file, symbol, w, h) -> subsurface of the atlas
+_LOOSE = {}  # same keys, sprites baked on demand
+_SVG = {}  # image_file -> SVG text, or None if unreadable
+
+
+def register_graphic(image_file, symbol, size):
+    """Adds a gate graphic to the atlas, baked at every zoom in atlas_zooms()."""
+    _GRAPHICS[(image_file, symbol)] = tuple(size)
+
+
+def atlas_zooms():
+    """Zooms the mouse wheel reaches from 1 above the LOD threshold, and the max."""
+    zooms = {MAX_ZOOM}
+    for k in range(-64, 64):
+        zoom = ZOOM_STEP**k
+        if LOD_ZOOM <= zoom <= MAX_ZOOM:
+            zooms.add(zoom)
+    return sorted(zooms)
+
+
+def atlas_entries():
+    """(image_file, symbol, w, h) of every sprite in the atlas."""
+    entries = {}
+    for (image_file, symbol), (w, h) in sorted(_GRAPHICS.items(), key=repr):
+        for zoom in atlas_zooms():
+            # Same rounding as Camera.screen_rect
+            size = (max(1, round(w * zoom)), max(1, round(h * zoom)))
+            entries[(image_file, symbol) + size] = None
+    return list(entries)
+
+
+def _sized_svg(text, size):
+    """Sets the root element's size, keeping the drawing's coordinates in a viewBox."""
+    match = re.search(r"<svg\b[^>]*>", text)
+    if not match:
+        return text
+    tag = match.group(0)
+    width = re.search(r'\swidth="([\d.]+)"', tag)
+    height = re.search(r'\sheight="([\d.]+)"', tag)
+    if not width or not height:
+        return text
+    sized = tag.replace(width.group(0), f' width="{size[0]}"', 1)
+    sized = sized.replace(height.group(0), f' height="{size[1]}"', 1)
+    if "viewBox" not in tag:
+        sized = sized.replace(
+            "<svg", f'<svg viewBox="0 0 {width.group(1)} {height.group(1)}"', 1
+        )
+    if "preserveAspectRatio" not in tag:
+        # Stretch to the node rect, as scaling a bitmap did
+        sized = sized.replace("<svg", '<svg preserveAspectRatio="none"', 1)
+    return text[: match.start()] + sized + text[match.end() :]
+
+
+def load_svg(image_file, size):
+    """Rasterizes an asset at size (not scaled from a bitmap), or returns None."""
+    if image_file not in _SVG:
+        try:
+            with open(os.path.join(ASSET_DIR, image_file), "r", encoding="utf-8") as f:
+                _SVG[image_file] = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error loading image {image_file}: {e}")
+            _SVG[image_file] = None
+    text = _SVG[image_file]
+    if text is None:
+        return None
+    try:
+        image = pygame.image.load(
+            io.BytesIO(_sized_svg(text, size).encode("utf-8")), image_file
+        )
+    except pygame.error as e:
+        print(f"Error loading image {image_file}: {e}")
+        return None
+    if image.get_size() != tuple(size):
+        image = pygame.transform.smoothscale(image, size)
+    return image
+
+
+def bake(image_file, symbol, size):
+    """A gate graphic with its symbol drawn in, or None if the SVG is unreadable."""
+    image = load_svg(image_file, size)
+    if image is None:
+        return None
+    sprite = pygame.Surface(size, pygame.SRCALPHA)
+    sprite.blit(image, (0, 0))
+    if symbol:
+        base_width = _GRAPHICS.get((image_file, symbol), size)[0]
+        font = get_font(max(6, round(SYMBOL_SIZE * size[0] / base_width)))
+        text = font.render(symbol, True, (0, 0, 0))
+        sprite.blit(text, text.get_rect(center=(size[0] // 2, size[1] // 2)))
+    return sprite
+
+
+def pack(sizes, width=ATLAS_WIDTH):
+    """
+    Shelf packing, tallest first. Returns the top-left of every size, in
+    the order given, and the height used.
+    """
+    positions = [None] * len(sizes)
+    x = y = shelf = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        positions[i] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    return positions, y + shelf
+
+
+def build_atlas(entries):
+    """Bakes entries into one surface. Returns (surface, {entry: rect})."""
+    sprites = {}
+    for entry in entries:
+        sprite = bake(entry[0], entry[1], entry[2:])
+        if sprite is not None:
+            sprites[entry] = sprite
+    keys = list(sprites)
+    positions, height = pack([sprites[k].get_size() for k in keys])
+    surface = pygame.Surface((ATLAS_WIDTH, max(1, height)), pygame.SRCALPHA)
+    rects = {}
+    for key, pos in zip(keys, positions):
+        surface.blit(sprites[key], pos)
+        rects[key] = pygame.Rect(pos, sprites[key].get_size())
+    return surface, rects
+
+
+def atlas_key(entries):
+    """Hash of everything the baked atlas depends on."""
+    digest = hashlib.sha1(
+        f"{ATLAS_VERSION}:{pygame.version.ver}:{font_path(FONT_NAME)}".encode()
+    )
+    for image_file in sorted({entry[0] for entry in entries}):
+        try:
+            with open(os.path.join(ASSET_DIR, image_file), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+    digest.update(repr(entries).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_atlas():
+    """
+    Sprites of every registered graphic, as subsurfaces of one atlas. The
+    atlas is read from the disk cache, or baked and saved there on a miss.
+    """
+    entries = atlas_entries()
+    path = os.path.join(CACHE_DIR, f"atlas-{atlas_key(entries)}")
+    try:
+        surface = pygame.image.load(path + ".png")
+        with open(path + ".json", "r") as f:
+            rects = {tuple(e[:4]): pygame.Rect(e[4:]) for e in json.load(f)}
+    except (OSError, ValueError, pygame.error):
+        surface, rects = build_atlas(entries)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            pygame.image.save(surface, path + ".png")
+            with open(path + ".json", "w") as f:
+                json.dump([list(k) + list(r) for k, r in rects.items()], f)
+        except (OSError, pygame.error):
+            pass
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert_alpha()
+    return {key: surface.subsurface(rect) for key, rect in rects.items()}
+
+
+def gate_sprite(image_file, symbol, size):
+    """Surface to blit for a gate graphic at size (screen pixels), or None."""
+    global _SPRITES
+    if _SPRITES is None:
+        _SPRITES = load_atlas()
+    key = (image_file, symbol) + tuple(size)
+    sprite = _SPRITES.get(key)
+    if sprite is None:
+        if key not in _LOOSE:
+            if len(_LOOSE) >= MAX_LOOSE_SPRITES:
+                _LOOSE.clear()
+            _LOOSE[key] = bake(image_file, symbol, tuple(size))
+        sprite = _LOOSE[key]
+    return sprite
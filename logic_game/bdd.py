@@ -0,0 +1,337 @@
+from netlist import Netlist
+
+# Enumerating check_func into a BDD costs one call per combination, so it is
+# only done when neither a symbolic check nor a reference circuit is available.
+ENUMERATE_MAX_INPUTS = 20
+
+# Node budget after which a BDD gives up, leaving the proof to the SAT solver
+MAX_NODES = 200_000
+
+FALSE = 0
+TRUE = 1
+
+
+class BDDSizeLimit(Exception):
+    pass
+
+
+class BDD:
+    """
+    Reduced ordered BDD manager.
+
+    Nodes are ints: 0 and 1 are the terminals, every other node is an index
+    into self.nodes holding (level, low, high). The unique table keeps every
+    (level, low, high) triple canonical, so two functions are equivalent
+    exactly when they are the same node.
+    """
+
+    def __init__(self, var_count, order=None, max_nodes=None):
+        self.var_count = var_count
+        self.max_nodes = max_nodes
+        # order[level] -> input index tested at that level
+        self.order = list(order) if order is not None else list(range(var_count))
+        self.level_of = {var: level for level, var in enumerate(self.order)}
+        # Terminals sit below every variable level
+        self.nodes = [(var_count, FALSE, FALSE), (var_count, TRUE, TRUE)]
+        self.unique = {}
+        self.ite_cache = {}
+
+    def mk(self, level, low, high):
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            if self.max_nodes is not None and len(self.nodes) >= self.max_nodes:
+                raise BDDSizeLimit(f"BDD exceeded {self.max_nodes} nodes")
+            node = len(self.nodes)
+            self.nodes.append(key)
+            self.unique[key] = node
+        return node
+
+    def var(self, i):
+        return self.mk(self.level_of[i], FALSE, TRUE)
+
+    def constant(self, value):
+        return TRUE if value else FALSE
+
+    def _cofactors(self, f, level):
+        f_level, low, high = self.nodes[f]
+        if f_level == level:
+            return low, high
+        return f, f
+
+    def ite(self, f, g, h):
+        """If-then-else, the single operator every other operation reduces to."""
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+
+        key = (f, g, h)
+        result = self.ite_cache.get(key)
+        if result is not None:
+            return result
+
+        top = min(self.nodes[f][0], self.nodes[g][0], self.nodes[h][0])
+        f0, f1 = self._cofactors(f, top)
+        g0, g1 = self._cofactors(g, top)
+        h0, h1 = self._cofactors(h, top)
+        result = self.mk(top, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self.ite_cache[key] = result
+        return result
+
+    def not_(self, f):
+        return self.ite(f, FALSE, TRUE)
+
+    def and_(self, f, g):
+        return self.ite(f, g, FALSE)
+
+    def or_(self, f, g):
+        return self.ite(f, TRUE, g)
+
+    def xor(self, f, g):
+        return self.ite(f, self.not_(g), g)
+
+    def apply_op(self, op, values):
+        """Applies a netlist primitive op (see netlist.eval_op) to BDD nodes."""
+        if op == "BUF":
+            return values[0]
+        if op == "NOT":
+            return self.not_(values[0])
+        if op == "CONST0":
+            return FALSE
+        if op in ("AND", "NAND"):
+            result = TRUE
+            for v in values:
+                result = self.and_(result, v)
+        elif op in ("OR", "NOR"):
+            result = FALSE
+            for v in values:
+                result = self.or_(result, v)
+        elif op in ("XOR", "XNOR"):
+            result = FALSE
+            for v in values:
+                result = self.xor(result, v)
+        else:
+            raise ValueError(f"Unknown op: {op}")
+        if op in ("NAND", "NOR", "XNOR"):
+            result = self.not_(result)
+        return result
+
+    def restrict(self, f, var, value):
+        """f with input var fixed to value."""
+        level = self.level_of[var]
+        memo = {}
+
+        def go(node):
+            node_level, low, high = self.nodes[node]
+            if node_level > level:
+                return node  # terminals and nodes below var
+            if node_level == level:
+                return high if value else low
+            if node not in memo:
+                memo[node] = self.mk(node_level, go(low), go(high))
+            return memo[node]
+
+        return go(f)
+
+    def satisfy_one(self, f):
+        """
+        Returns the first satisfying assignment in itertools.product order
+        (input 0 decides first, False before True) whatever the variable
+        order, so it matches the first failing combination of an exhaustive
+        check. A tuple of bools per input; None if f is FALSE.
+        """
+        if f == FALSE:
+            return None
+        assignment = []
+        for var in range(self.var_count):
+            low = self.restrict(f, var, False)
+            if low != FALSE:
+                f = low
+                assignment.append(False)
+            else:
+                f = self.restrict(f, var, True)
+                assignment.append(True)
+        return tuple(assignment)
+
+    def evaluate(self, f, inputs):
+        while f > TRUE:
+            level, low, high = self.nodes[f]
+            f = high if inputs[self.order[level]] else low
+        return f == TRUE
+
+    def size(self, f):
+        seen = set()
+        stack = [f]
+        while stack:
+            node = stack.pop()
+            if node > TRUE and node not in seen:
+                seen.add(node)
+                stack.extend(self.nodes[node][1:])
+        return len(seen)
+
+
+class Symbol:
+    """
+    Proxy passed to check_func for symbolic evaluation.
+
+    Wraps a node of any algebra offering constant/and_/or_/xor/not_ (a BDD
+    manager or a CNF encoder). Supports &, |, ^, ~, == and != against other
+    symbols and bools. Python's `and`, `or`, `not`, `all()` and `if` need a
+    concrete truth value and raise TypeError, so callers can fall back.
+    """
+
+    __hash__ = None
+
+    def __init__(self, algebra, node):
+        self.algebra = algebra
+        self.node = node
+
+    def _wrap(self, other):
+        if isinstance(other, Symbol):
+            return other.node
+        if isinstance(other, (bool, int)):
+            return self.algebra.constant(other)
+        return NotImplemented
+
+    def __and__(self, other):
+        other = self._wrap(other)
+        if other is NotImplemented:
+            return other
+        return Symbol(self.algebra, self.algebra.and_(self.node, other))
+
+    def __or__(self, other):
+        other = self._wrap(other)
+        if other is NotImplemented:
+            return other
+        return Symbol(self.algebra, self.algebra.or_(self.node, other))
+
+    def __xor__(self, other):
+        other = self._wrap(other)
+        if other is NotImplemented:
+            return other
+        return Symbol(self.algebra, self.algebra.xor(self.node, other))
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
+    __ne__ = __xor__
+
+    def __eq__(self, other):
+        result = self.__xor__(other)
+        if result is NotImplemented:
+            return result
+        return ~result
+
+    def __invert__(self):
+        return Symbol(self.algebra, self.algebra.not_(self.node))
+
+    def __bool__(self):
+        raise TypeError("check_func is not symbolic")
+
+
+def symbolic_outputs(algebra, level, input_nodes):
+    """Runs check_func on Symbols; raises TypeError if it is not symbolic."""
+    inputs = tuple(Symbol(algebra, node) for node in input_nodes)
+    result = []
+    for value in level.expected_outputs(inputs):
+        if isinstance(value, Symbol):
+            result.append(value.node)
+        else:
+            result.append(algebra.constant(value))
+    return result
+
+
+def dfs_input_order(netlist):
+    """
+    Variable order from a depth-first walk of the output cones. This keeps
+    related inputs (e.g. A_i and B_i of an adder) adjacent, which keeps
+    arithmetic BDDs linear instead of exponential in the word width.
+    """
+    order = []
+    seen = set()
+    for out in netlist.outputs:
+        stack = [out]
+        while stack:
+            idx = stack.pop()
+            if idx in seen:
+                continue
+            seen.add(idx)
+            if idx < netlist.input_count:
+                order.append(idx)
+            else:
+                stack.extend(s for s in reversed(netlist.fanin[idx]) if s is not None)
+    order.extend(i for i in range(netlist.input_count) if i not in seen)
+    return order
+
+
+def netlist_bdds(bdd, netlist):
+    """Builds one BDD per output of an acyclic netlist."""
+    inputs = [bdd.var(i) for i in range(netlist.input_count)]
+    return netlist.compose(bdd.apply_op, inputs, FALSE)
+
+
+def _enumerated_bdds(bdd, level):
+    # Shannon expansion in BDD level order, one check_func call per leaf
+    n = level.input_count
+    assignment = [False] * n
+
+    def build(depth):
+        if depth == n:
+            return [TRUE if v else FALSE for v in level.expected_outputs(tuple(assignment))]
+        var = bdd.order[depth]
+        assignment[var] = False
+        lows = build(depth + 1)
+        assignment[var] = True
+        highs = build(depth + 1)
+        assignment[var] = False
+        return [bdd.mk(depth, lo, hi) for lo, hi in zip(lows, highs)]
+
+    return build(0)
+
+
+def reference_bdds(bdd, level):
+    """
+    Builds the reference BDDs of a level: from level.reference if given,
+    else by running check_func symbolically, else by enumeration.
+    """
+    if level.reference is not None:
+        reference = Netlist.from_solution(
+            level.input_count, level.output_count, level.reference
+        )
+        return netlist_bdds(bdd, reference)
+    try:
+        inputs = [bdd.var(i) for i in range(level.input_count)]
+        return symbolic_outputs(bdd, level, inputs)
+    except TypeError:
+        pass
+    if level.input_count > ENUMERATE_MAX_INPUTS:
+        raise ValueError(
+            f"Level {level.id} needs a reference circuit or a check_func "
+            "written with bitwise operators"
+        )
+    return _enumerated_bdds(bdd, level)
+
+
+def find_counterexample(level, netlist, max_nodes=MAX_NODES, outputs=None):
+    """
+    Proves a netlist equivalent to the level's reference on the given output
+    positions (default: all).
+    Returns None when equivalent, else a failing input tuple.
+    Raises BDDSizeLimit when the BDDs outgrow max_nodes.
+    """
+    bdd = BDD(level.input_count, dfs_input_order(netlist), max_nodes)
+    player = netlist_bdds(bdd, netlist)
+    reference = reference_bdds(bdd, level)
+    if outputs is None:
+        outputs = range(level.output_count)
+    diff = FALSE
+    for k in outputs:
+        diff = bdd.or_(diff, bdd.xor(player[k], reference[k]))
+    return bdd.satisfy_one(diff)
@@ -0,0 +1,255 @@
+import os
+
+# Before pygame opens a display; a real driver can still be forced
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import sys
+import tempfile
+from time import perf_counter_ns
+
+import pygame
+
+from event_log import load_event_log
+from generate import random_dag
+from main import Game
+from nodes import InputNode, OutputNode
+from profiler import percentile
+
+# Frames the synthetic scenarios spend idle between actions
+HOLD_FRAMES = 60
+# Random DAG loaded by the large scenario
+LARGE_GATES = 5000
+LARGE_WIDTH = 100
+
+
+def mouse(kind, pos, button=1):
+    return pygame.event.Event(kind, pos=pos, button=button)
+
+
+def click(pos, button=1):
+    """One frame: press and release at pos."""
+    return [
+        mouse(pygame.MOUSEBUTTONDOWN, pos, button),
+        mouse(pygame.MOUSEBUTTONUP, pos, button),
+    ]
+
+
+def drag(start, end, steps=10):
+    """Frames of a left-button drag from start to end."""
+    yield [mouse(pygame.MOUSEBUTTONDOWN, start)]
+    last = start
+    for i in range(1, steps + 1):
+        pos = (
+            round(start[0] + (end[0] - start[0]) * i / steps),
+            round(start[1] + (end[1] - start[1]) * i / steps),
+        )
+        rel = (pos[0] - last[0], pos[1] - last[1])
+        yield [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=rel, buttons=(1, 0, 0))]
+        last = pos
+    yield [mouse(pygame.MOUSEBUTTONUP, end)]
+
+
+def key(k):
+    return [pygame.event.Event(pygame.KEYDOWN, key=k, mod=0)]
+
+
+def idle(frames):
+    for _ in range(frames):
+        yield []
+
+
+def button_center(game, text):
+    for btn in game.buttons:
+        if btn.text == text:
+            return btn.rect.center
+    raise LookupError(f"no button {text!r} on screen")
+
+
+def on_screen(game, world_pos):
+    return game.camera.to_screen(world_pos)
+
+
+def menu_scenario(game, hold):
+    """Idle main menu with the pointer moving over the buttons."""
+    x, y = button_center(game, "Levels")
+    for i in range(hold):
+        pos = (x, y - 100 + i * 200 // max(1, hold))
+        yield [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 1), buttons=(0, 0, 0))]
+
+
+def build_scenario(game, hold):
+    """Solves level 1 by hand: spawn, drag, wire, toggle, simulate, verify."""
+    yield click(button_center(game, "New Game"))
+    yield click(button_center(game, "Add And"))
+    gate = game.nodes[-1]
+    yield from drag(on_screen(game, gate.rect.center), on_screen(game, (650, 320)))
+
+    inputs = sorted((n for n in game.nodes if isinstance(n, InputNode)), key=lambda n: n.rect.y)
+    output = next(n for n in game.nodes if isinstance(n, OutputNode))
+    for port, source in zip(gate.input_ports, inputs):
+        yield from drag(
+            on_screen(game, source.output_rect.center), on_screen(game, port.rect.center)
+        )
+    yield from drag(
+        on_screen(game, gate.output_rect.center),
+        on_screen(game, output.input_ports[0].rect.center),
+    )
+
+    yield click(button_center(game, "Play"))
+    for source in inputs:
+        yield click(on_screen(game, source.rect.center), button=3)
+        yield from idle(hold // 4)
+    yield from idle(hold)
+    yield click(button_center(game, "Stop"))
+    yield click(button_center(game, "Verify"))
+    yield from idle(hold // 4)
+
+
+def large_scenario(game, hold):
+    """A big imported circuit: framed, zoomed, panned, edited, simulated."""
+    yield key(pygame.K_HOME)
+    yield from idle(hold // 2)
+    w, h = game.screen.get_size()
+    for _ in range(12):
+        yield [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=1)]
+    for k in (pygame.K_LEFT, pygame.K_UP, pygame.K_RIGHT, pygame.K_DOWN) * 4:
+        yield key(k)
+    view = game.camera.view_rect((w, h))
+    node = next((n for n in game.nodes if view.contains(n.rect)), None)
+    if node is not None:
+        start = on_screen(game, node.rect.center)
+        yield from drag(start, (start[0] + 80, start[1] + 40), steps=20)
+    yield click(button_center(game, "Play"))
+    yield from idle(hold)
+    yield click(button_center(game, "Stop"))
+
+
+def replay_scenario(frames):
+    def scenario(game, hold):
+        yield from frames
+
+    return scenario
+
+
+SCENARIOS = {
+    "menu": menu_scenario,
+    "build": build_scenario,
+    "large": large_scenario,
+}
+
+
+def run_scenario(game, scenario, hold):
+    """
+    Plays a scenario on game by posting its events, one list per frame, and
+    runs every frame uncapped. Returns frame times in nanoseconds.
+    """
+    times = []
+    try:
+        for events in scenario(game, hold):
+            pygame.event.clear()
+            for event in events:
+                pygame.event.post(event)
+            start = perf_counter_ns()
+            game.run_frame(tick=False)
+            times.append(perf_counter_ns() - start)
+            if not game.running:
+                break
+    finally:
+        game.stop_sim()
+        game.cancel_verification()
+    return times
+
+
+def summarize(times):
+    """Frame time distribution in milliseconds."""
+    ordered = sorted(times)
+    return {
+        "frames": len(times),
+        "mean_ms": sum(times) / max(1, len(times)) / 1e6,
+        "p50_ms": percentile(ordered, 50) / 1e6,
+        "p95_ms": percentile(ordered, 95) / 1e6,
+        "p99_ms": percentile(ordered, 99) / 1e6,
+        "max_ms": (ordered[-1] if ordered else 0) / 1e6,
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """Scenarios whose p95 grew past tolerance times the baseline's."""
+    slow = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before and stats["p95_ms"] > before["p95_ms"] * tolerance:
+            slow.append(f"{name}: p95 {stats['p95_ms']:.2f} ms, baseline {before['p95_ms']:.2f} ms")
+    return slow
+
+
+def main(names, hold, gates, replay=None):
+    results = {}
+    home = os.getcwd()
+    # Games read and write save_game.json in the working directory
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            jobs = [(name, SCENARIOS[name]) for name in names]
+            if replay:
+                frames = load_event_log(os.path.join(home, replay))
+                jobs.append((f"replay:{os.path.basename(replay)}", replay_scenario(frames)))
+            for name, scenario in jobs:
+                load_path = None
+                if scenario is large_scenario:
+                    load_path = os.path.join(tmp, "large.v")
+                    depth = max(1, gates // LARGE_WIDTH)
+                    random_dag(32, 8, LARGE_WIDTH, depth, seed=1).save(load_path)
+                times = run_scenario(Game(load_path=load_path), scenario, hold)
+                results[name] = summarize(times)
+                # Every scenario starts from a fresh save
+                if os.path.exists("save_game.json"):
+                    os.remove("save_game.json")
+        finally:
+            os.chdir(home)
+        pygame.quit()
+
+    print(f"{'scenario':<24}{'frames':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, stats in results.items():
+        print(
+            f"{name:<24}{stats['frames']:>7}"
+            + "".join(
+                f"{stats[k]:>9.2f}" for k in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+            )
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless game loop benchmark")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="scenario to run (repeatable, default: all)",
+    )
+    parser.add_argument("--replay", metavar="FILE", help="also replay a recorded session")
+    parser.add_argument("--hold", type=int, default=HOLD_FRAMES, help="idle frames between actions")
+    parser.add_argument("--gates", type=int, default=LARGE_GATES, help="gates in the large scenario")
+    parser.add_argument("--json", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="JSON results to compare p95 against")
+    parser.add_argument(
+        "--tolerance", type=float, default=1.5, help="allowed p95 growth over the baseline"
+    )
+    args = parser.parse_args()
+    names = args.scenario or list(SCENARIOS)
+    if args.replay and not args.scenario:
+        names = []
+    results = main(names, args.hold, args.gates, args.replay)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            slow = regressions(results, json.load(f), args.tolerance)
+        for line in slow:
+            print(f"Regression: {line}")
+        if slow:
+            sys.exit(1)
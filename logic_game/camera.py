@@ -0,0 +1,102 @@
+import math
+
+import pygame
+
+MIN_ZOOM = 0.05
+MAX_ZOOM = 2.0
+ZOOM_STEP = 1.15
+# Below this zoom nodes are drawn as plain rects and wires as straight lines
+LOD_ZOOM = 0.5
+# Screen pixels per arrow key press
+PAN_STEP = 60
+FRAME_MARGIN = 40
+
+
+class Camera:
+    """
+    Pan and zoom over world space, where node rects live.
+
+    (x, y) is the world position shown at the top-left screen corner.
+    """
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom = 1.0
+
+    @property
+    def identity(self):
+        return self.zoom == 1 and self.x == 0 and self.y == 0
+
+    @property
+    def lod(self):
+        return self.zoom < LOD_ZOOM
+
+    def reset(self):
+        self.x = self.y = 0.0
+        self.zoom = 1.0
+
+    def to_screen(self, pos):
+        return (
+            round((pos[0] - self.x) * self.zoom),
+            round((pos[1] - self.y) * self.zoom),
+        )
+
+    def to_world(self, pos):
+        return (
+            math.floor(pos[0] / self.zoom + self.x),
+            math.floor(pos[1] / self.zoom + self.y),
+        )
+
+    def screen_rect(self, rect):
+        x, y = self.to_screen(rect.topleft)
+        return pygame.Rect(
+            x, y, max(1, round(rect.width * self.zoom)), max(1, round(rect.height * self.zoom))
+        )
+
+    def view_rect(self, size):
+        """World rect visible on a screen of the given size."""
+        return pygame.Rect(
+            int(self.x), int(self.y), int(size[0] / self.zoom) + 1, int(size[1] / self.zoom) + 1
+        )
+
+    def pan(self, dx, dy):
+        """Moves the view by screen pixels."""
+        self.x -= dx / self.zoom
+        self.y -= dy / self.zoom
+
+    def zoom_at(self, pos, factor):
+        """Zooms keeping the world point under screen position pos in place."""
+        wx = pos[0] / self.zoom + self.x
+        wy = pos[1] / self.zoom + self.y
+        self.zoom = min(MAX_ZOOM, max(MIN_ZOOM, self.zoom * factor))
+        self.x = wx - pos[0] / self.zoom
+        self.y = wy - pos[1] / self.zoom
+
+    def frame(self, rect, size):
+        """Fits a world rect on screen, never zooming in past 1."""
+        zoom = min(
+            (size[0] - 2 * FRAME_MARGIN) / max(1, rect.width),
+            (size[1] - 2 * FRAME_MARGIN) / max(1, rect.height),
+        )
+        self.zoom = min(1.0, max(MIN_ZOOM, zoom))
+        self.x = rect.centerx - size[0] / 2 / self.zoom
+        self.y = rect.centery - size[1] / 2 / self.zoom
+
+    def render_node(self, screen, node):
+        if self.identity:
+            node.render(screen)
+            return
+        if self.lod:
+            color = (150, 150, 180) if node.selected else node.color
+            pygame.draw.rect(screen, color, self.screen_rect(node.rect))
+            return
+        # Nodes draw themselves from their rect; lend them the screen rect
+        world = node.rect.copy()
+        node.rect.update(self.screen_rect(world))
+        node._update_ports()
+        try:
+            node.render(screen)
+        finally:
+            node.rect.update(world)
+            node._update_ports()
@@ -0,0 +1,63 @@
+from netlist import SETTLE_ROUNDS
+
+# Compiled evaluators keyed by structural hash
+_COMPILED = {}
+
+_JOIN = {"AND": " & ", "NAND": " & ", "OR": " | ", "NOR": " | ", "XOR": " ^ ", "XNOR": " ^ "}
+
+
+def _expression(op, operands):
+    if op == "CONST0":
+        return "0"
+    if op == "BUF":
+        return operands[0]
+    if op == "NOT":
+        return f"mask ^ {operands[0]}"
+    expr = _JOIN[op].join(operands)
+    if op in ("NAND", "NOR", "XNOR"):
+        return f"mask ^ ({expr})"
+    return expr
+
+
+def netlist_source(netlist, name="evaluate"):
+    """
+    Python source of a function evaluating a netlist over bit-parallel words,
+    like Netlist.simulate: name(inputs, mask) -> tuple of output words.
+    Every node is a local variable and every gate one bitwise expression.
+    """
+    netlist = netlist.bit_level()
+    order = netlist.topological_order()
+    lines = [f"def {name}(inputs, mask):"]
+    inputs = [f"v{i}" for i in range(netlist.input_count)]
+    if inputs:
+        lines.append(f"    {', '.join(inputs)}{',' if len(inputs) == 1 else ''} = inputs")
+
+    body = []
+    nodes = order if order is not None else range(netlist.input_count, len(netlist))
+    for idx in nodes:
+        op, srcs = netlist.primitive(idx)
+        operands = [f"v{s}" if s is not None else "0" for s in srcs]
+        body.append(f"v{idx} = {_expression(op, operands)}")
+
+    if order is not None:
+        lines += ["    " + line for line in body]
+    else:
+        # Feedback loops settle the same way Netlist.simulate does
+        for idx in nodes:
+            lines.append(f"    v{idx} = 0")
+        lines.append(f"    for _ in range({SETTLE_ROUNDS}):")
+        lines += ["        " + line for line in body]
+    outputs = [f"v{i}" for i in netlist.outputs]
+    lines.append(f"    return ({', '.join(outputs)}{',' if len(outputs) == 1 else ''})")
+    return "\n".join(lines) + "\n"
+
+
+def compile_netlist(netlist):
+    """Returns the generated evaluator of a netlist, built once per structure."""
+    key = netlist.structural_hash()
+    if key not in _COMPILED:
+        namespace = {}
+        code = compile(netlist_source(netlist), f"<netlist {key[:8]}>", "exec")
+        exec(code, namespace)
+        _COMPILED[key] = namespace["evaluate"]
+    return _COMPILED[key]
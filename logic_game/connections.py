@@ -0,0 +1,107 @@
+def pin_owner(pin):
+    """Node a source pin belongs to (macro pins belong to their macro)."""
+    return getattr(pin, "owner", pin)
+
+
+class ConnectionIndex:
+    """
+    Fan-out of the wiring between live nodes.
+
+    Fan-in lives only in port.connected_node, the one copy of every edge;
+    the index adds the fan-out of every source pin, so a node's consumers
+    are found without scanning every port of every node. Wire through
+    connect() and disconnect(), and use add() and remove() for spawned and
+    deleted nodes. After editing ports directly (loading, resizing a node),
+    call update() or rebuild(); fan-out entries whose port no longer holds
+    the pin are dropped when read.
+    """
+
+    def __init__(self):
+        self.fanout = {}  # pin -> {(node, port_idx): None}, in connection order
+        self.nodes = {}  # registered nodes
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def rebuild(self, nodes):
+        self.fanout.clear()
+        self.nodes.clear()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        """Registers a node and the connections already on its ports."""
+        self.nodes[node] = None
+        for pin in node.output_pins():
+            self.fanout.setdefault(pin, {})
+        self.update(node)
+
+    def update(self, node):
+        """Re-reads a node's ports after they were changed directly."""
+        for port_idx, port in enumerate(node.input_ports):
+            if port.connected_node is not None:
+                self.fanout.setdefault(port.connected_node, {})[(node, port_idx)] = None
+
+    def _live(self, pin):
+        # Prunes entries left behind by direct port edits
+        targets = self.fanout.get(pin)
+        if not targets:
+            return ()
+        stale = [
+            (node, port_idx)
+            for node, port_idx in targets
+            if port_idx >= len(node.input_ports)
+            or node.input_ports[port_idx].connected_node is not pin
+        ]
+        for key in stale:
+            del targets[key]
+        return targets
+
+    def connect(self, node, port_idx, pin):
+        """Wires pin into a free port. Returns False if the port is taken."""
+        port = node.input_ports[port_idx]
+        if port.connected_node is not None:
+            return False
+        port.connected_node = pin
+        self.fanout.setdefault(pin, {})[(node, port_idx)] = None
+        return True
+
+    def disconnect(self, node, port_idx):
+        """Clears a port. Returns the pin it was connected to, or None."""
+        port = node.input_ports[port_idx]
+        pin = port.connected_node
+        if pin is not None:
+            port.connected_node = None
+            targets = self.fanout.get(pin)
+            if targets is not None:
+                targets.pop((node, port_idx), None)
+        return pin
+
+    def remove(self, node):
+        """
+        Unregisters a deleted node, clearing every port its pins fed.
+        Costs its degree, not the circuit size. Returns the nodes that lost
+        an input.
+        """
+        for port_idx in range(len(node.input_ports)):
+            self.disconnect(node, port_idx)
+        self.nodes.pop(node, None)
+        affected = {}
+        for pin in node.output_pins():
+            for dst, port_idx in self._live(pin):
+                dst.input_ports[port_idx].connected_node = None
+                affected[dst] = None
+            self.fanout.pop(pin, None)
+        return list(affected)
+
+    def targets(self, pin):
+        """(node, port index) of every port wired to pin."""
+        return list(self._live(pin))
+
+    def readers(self, pin):
+        """Nodes reading pin, each once, in connection order."""
+        return list(dict.fromkeys(node for node, _ in self._live(pin)))
+
+    def consumers(self, node):
+        """Nodes fed by any output pin of node."""
+        return {dst for pin in node.output_pins() for dst, _ in self._live(pin)}
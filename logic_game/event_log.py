@@ -0,0 +1,62 @@
+import json
+
+import pygame
+
+# Events worth replaying; window and focus events depend on the machine
+RECORDED_TYPES = (
+    pygame.QUIT,
+    pygame.KEYDOWN,
+    pygame.KEYUP,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.MOUSEMOTION,
+    pygame.MOUSEWHEEL,
+)
+EVENT_FIELDS = ("pos", "rel", "button", "buttons", "key", "mod", "x", "y")
+
+_TYPES_BY_NAME = {pygame.event.event_name(t): t for t in RECORDED_TYPES}
+
+
+def event_to_dict(event):
+    record = {"type": pygame.event.event_name(event.type)}
+    for field in EVENT_FIELDS:
+        if hasattr(event, field):
+            value = getattr(event, field)
+            record[field] = list(value) if isinstance(value, tuple) else value
+    return record
+
+
+def event_from_dict(record):
+    attrs = {
+        field: tuple(value) if isinstance(value, list) else value
+        for field, value in record.items()
+        if field != "type"
+    }
+    return pygame.event.Event(_TYPES_BY_NAME[record["type"]], **attrs)
+
+
+class EventLog:
+    """
+    Input events handled by the game, one list per frame, for replay by
+    bench_gui. Record from a fresh save so the replay starts in the same
+    state.
+    """
+
+    def __init__(self):
+        self.frames = []
+
+    def record(self, events):
+        self.frames.append(
+            [event_to_dict(e) for e in events if e.type in RECORDED_TYPES]
+        )
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({"frames": self.frames}, f)
+
+
+def load_event_log(path):
+    """Recorded frames as lists of pygame events."""
+    with open(path, "r") as f:
+        frames = json.load(f)["frames"]
+    return [[event_from_dict(record) for record in frame] for frame in frames]
@@ -0,0 +1,174 @@
+import heapq
+
+from connections import ConnectionIndex
+from nodes import CLOCK_TICKS, ClockNode, InputNode
+
+# Slots of the timing wheel; events further ahead wait in an overflow heap
+WHEEL_SIZE = 256
+
+DEFAULT_CLOCK_HZ = 2
+MAX_CLOCK_HZ = 100_000
+
+# Work cap per advance() so a fast clock cannot stall the render loop;
+# simulated time falls behind wall time instead.
+MAX_EVENTS_PER_ADVANCE = 200_000
+
+
+def circuit_signature(nodes):
+    """Changes whenever nodes or connections are added or removed."""
+    return tuple(
+        (id(n), tuple(id(p.connected_node) for p in n.input_ports)) for n in nodes
+    )
+
+
+class EventSimulator:
+    """
+    Discrete-event simulation of the live nodes.
+
+    Every node output (or macro pin) changes only through scheduled events:
+    when an input of a node changes, the node is evaluated and its new output
+    is scheduled node.delay ticks later. Events within WHEEL_SIZE ticks of the
+    current time go into the timing wheel slot time % WHEEL_SIZE, later ones
+    (slow clocks) into a heap. Node values always hold the current simulated
+    state, so rendering only has to read them.
+    """
+
+    def __init__(self, nodes, clock_hz=DEFAULT_CLOCK_HZ, recorder=None, start_time=0):
+        self.nodes = list(nodes)
+        self.signature = circuit_signature(self.nodes)
+        self.clock_hz = clock_hz
+        # Optional waveform.WaveformRecorder fed with every applied change
+        self.recorder = recorder
+        self.time = start_time
+        # Fraction of a tick carried between advance() calls
+        self.tick_remainder = 0.0
+        self.wheel = [[] for _ in range(WHEEL_SIZE)]
+        self.wheel_count = 0
+        self.overflow = []
+        self.seq = 0
+        self.events = 0
+        # pin -> [last scheduled value, pending event count], to drop
+        # events that would not change anything
+        self.projected = {}
+
+        # Nodes to evaluate when a pin changes, read once from the wiring
+        connections = ConnectionIndex()
+        connections.rebuild(self.nodes)
+        self.fanout = {
+            pin: connections.readers(pin)
+            for node in self.nodes
+            for pin in node.output_pins()
+        }
+
+        self.inputs = [n for n in self.nodes if isinstance(n, InputNode)]
+        self.input_values = [n.value for n in self.inputs]
+        if recorder is not None:
+            recorder.watch_nodes(self.nodes, self.time)
+
+        for node in self.nodes:
+            if isinstance(node, ClockNode):
+                self.schedule(node, not node.value, node.half_period)
+            elif not isinstance(node, InputNode):
+                self.evaluate(node)
+
+    def is_stale(self, nodes):
+        return circuit_signature(nodes) != self.signature
+
+    def projected_value(self, pin):
+        entry = self.projected.get(pin)
+        return entry[0] if entry else pin.value
+
+    def schedule(self, pin, value, delay):
+        entry = self.projected.setdefault(pin, [value, 0])
+        entry[0] = value
+        entry[1] += 1
+        time = self.time + max(1, delay)
+        if time - self.time < WHEEL_SIZE:
+            self.wheel[time % WHEEL_SIZE].append((pin, value))
+            self.wheel_count += 1
+        else:
+            self.seq += 1
+            heapq.heappush(self.overflow, (time, self.seq, pin, value))
+
+    def evaluate(self, node):
+        """Runs a node's logic on current inputs and schedules changed outputs."""
+        pins = node.output_pins()
+        old = [pin.value for pin in pins]
+        # Stateful nodes hold their pending state, not the value still shown
+        for pin in pins:
+            pin.value = self.projected_value(pin)
+        node.process_logic()
+        new = [pin.value for pin in pins]
+        for pin, value in zip(pins, old):
+            pin.value = value
+        for pin, value in zip(pins, new):
+            if self.projected_value(pin) != value:
+                self.schedule(pin, value, node.delay)
+
+    def _poll_inputs(self):
+        # Inputs are toggled by the player between frames
+        for i, node in enumerate(self.inputs):
+            if node.value != self.input_values[i]:
+                self.input_values[i] = node.value
+                if self.recorder is not None:
+                    self.recorder.record(node, self.time, node.value)
+                for dst in self.fanout[node]:
+                    self.evaluate(dst)
+
+    def _pull_overflow(self):
+        while self.overflow and self.overflow[0][0] - self.time < WHEEL_SIZE:
+            time, _, pin, value = heapq.heappop(self.overflow)
+            self.wheel[time % WHEEL_SIZE].append((pin, value))
+            self.wheel_count += 1
+
+    def run_until(self, end_time, max_events=None):
+        """Processes every event up to end_time (inclusive). Returns events run."""
+        self._poll_inputs()
+        recorder = self.recorder
+        done = 0
+        while self.time < end_time:
+            if max_events is not None and done >= max_events:
+                break
+            if not self.wheel_count:
+                # Skip idle stretches straight to the next far event
+                if not self.overflow or self.overflow[0][0] > end_time:
+                    self.time = end_time
+                    break
+                self.time = self.overflow[0][0] - 1
+            self.time += 1
+            self._pull_overflow()
+
+            slot = self.wheel[self.time % WHEEL_SIZE]
+            if not slot:
+                continue
+            self.wheel[self.time % WHEEL_SIZE] = []
+            self.wheel_count -= len(slot)
+
+            # Nodes to re-evaluate once every change of this tick is applied
+            dirty = {}
+            for pin, value in slot:
+                entry = self.projected[pin]
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.projected[pin]
+                if pin.value == value:
+                    continue
+                pin.value = value
+                done += 1
+                if recorder is not None:
+                    recorder.record(pin, self.time, value)
+                if isinstance(pin, ClockNode):
+                    self.schedule(pin, not value, pin.half_period)
+                for dst in self.fanout[pin]:
+                    dirty[dst] = True
+            for node in dirty:
+                self.evaluate(node)
+        self.events += done
+        return done
+
+    def advance(self, seconds):
+        """Advances by wall-clock seconds at the configured clock rate."""
+        self.tick_remainder += seconds * self.clock_hz * CLOCK_TICKS
+        ticks = int(self.tick_remainder)
+        self.tick_remainder -= ticks
+        return self.run_until(self.time + ticks, MAX_EVENTS_PER_ADVANCE)
@@ -0,0 +1,69 @@
+import json
+import os
+
+import pygame
+
+FONT_NAME = "Arial"
+# Files derived from the installation (resolved fonts, the asset atlas)
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "logic_game",
+)
+# Resolved font files, kept between runs: finding a system font makes
+# pygame scan every font directory, which dominates a cold start
+FONT_CACHE_FILE = os.path.join(CACHE_DIR, "fonts.json")
+
+_FONTS = {}  # (size, bold) -> pygame.font.Font
+_PATHS = None  # "name:bold" -> [path or None, synthesize bold]
+
+
+def _cached_paths():
+    global _PATHS
+    if _PATHS is None:
+        _PATHS = {}
+        try:
+            with open(FONT_CACHE_FILE, "r") as f:
+                _PATHS = json.load(f)
+        except (OSError, ValueError):
+            pass
+    return _PATHS
+
+
+def font_path(name, bold=False):
+    """
+    Returns (path, fake_bold) for a system font, as pygame.font.SysFont
+    would pick it. A None path is pygame's default font; fake_bold means no
+    bold face exists and the bold style must be synthesized.
+    """
+    paths = _cached_paths()
+    key = f"{name}:{int(bold)}"
+    entry = paths.get(key)
+    if entry is None or (entry[0] is not None and not os.path.exists(entry[0])):
+        path = pygame.font.match_font(name, bold=bold)
+        fake_bold = bold and (path is None or path == pygame.font.match_font(name))
+        entry = [path, fake_bold]
+        paths[key] = entry
+        try:
+            os.makedirs(os.path.dirname(FONT_CACHE_FILE), exist_ok=True)
+            with open(FONT_CACHE_FILE, "w") as f:
+                json.dump(paths, f, indent=2)
+        except OSError:
+            pass
+    return tuple(entry)
+
+
+def get_font(size=24, bold=False):
+    """Shared font of the given size; the font module is initialized on first use."""
+    key = (size, bold)
+    if key not in _FONTS:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        path, fake_bold = font_path(FONT_NAME, bold)
+        try:
+            font = pygame.font.Font(path, size)
+        except OSError:
+            font, fake_bold = pygame.font.Font(None, size), bold
+        if fake_bold:
+            font.set_bold(True)
+        _FONTS[key] = font
+    return _FONTS[key]
@@ -0,0 +1,384 @@
+import argparse
+import functools
+import operator
+import random
+import time
+
+from levels import PLAYGROUND_LEVEL, Level
+from netlist import Netlist
+from netlist_io import CircuitBuilder, save_circuit
+from nodes import (
+    AndNode,
+    InputNode,
+    NandNode,
+    NorNode,
+    NotNode,
+    OrNode,
+    OutputNode,
+    XnorNode,
+    XorNode,
+)
+from verification import verify_solution
+
+GATE_TYPES = {
+    cls.__name__: cls
+    for cls in (AndNode, OrNode, NotNode, NandNode, NorNode, XorNode, XnorNode)
+}
+
+# Reference semantics of the gates random_dag picks from. Reference checks
+# use only & | ^ (negation is ^ True) so they also run symbolically, which
+# wide circuits need to be verified at all.
+_GATE_FUNCS = {
+    "AndNode": lambda vs: functools.reduce(operator.and_, vs),
+    "OrNode": lambda vs: functools.reduce(operator.or_, vs),
+    "XorNode": lambda vs: functools.reduce(operator.xor, vs),
+    "NandNode": lambda vs: functools.reduce(operator.and_, vs) ^ True,
+    "NorNode": lambda vs: functools.reduce(operator.or_, vs) ^ True,
+    "XnorNode": lambda vs: functools.reduce(operator.xor, vs) ^ True,
+    "NotNode": lambda vs: vs[0] ^ True,
+}
+
+
+class GateListCheck:
+    """Reference of random_dag: (gate type, source indices) in evaluation order."""
+
+    def __init__(self, gates, taps):
+        self.gates = gates
+        self.taps = taps
+
+    def __call__(self, in_values):
+        vals = list(in_values)
+        for node_type, srcs in self.gates:
+            vals.append(_GATE_FUNCS[node_type]([vals[s] for s in srcs]))
+        return [vals[s] for s in self.taps]
+
+
+class AdderCheck:
+    """a + b, both bits wide, least significant first, then the carry out."""
+
+    def __init__(self, bits):
+        self.bits = bits
+
+    def __call__(self, inputs):
+        a, b = inputs[: self.bits], inputs[self.bits :]
+        out, carry = [], False
+        for i in range(self.bits):
+            out.append(a[i] ^ b[i] ^ carry)
+            carry = (a[i] & b[i]) | (carry & (a[i] ^ b[i]))
+        return out + [carry]
+
+
+class MuxCheck:
+    """Data inputs, then select bits (LSB first); the selected data input."""
+
+    def __init__(self, count):
+        self.count = count
+
+    def __call__(self, inputs):
+        # Halve the data by each select bit: lo, or hi when the bit is set
+        level = list(inputs[: self.count])
+        for s in inputs[self.count :]:
+            level = [lo ^ ((lo ^ hi) & s) for lo, hi in zip(level[0::2], level[1::2])]
+        return level
+
+
+class ParityCheck:
+    """XOR of every input."""
+
+    def __call__(self, inputs):
+        return [functools.reduce(operator.xor, inputs)]
+
+
+class ComparatorCheck:
+    """lt, eq, gt of a and b, both bits wide, least significant first."""
+
+    def __init__(self, bits):
+        self.bits = bits
+
+    def __call__(self, inputs):
+        a, b = inputs[: self.bits], inputs[self.bits :]
+        lt, eq, gt = False, True, False
+        for i in reversed(range(self.bits)):
+            gt = gt | (eq & a[i] & (b[i] ^ True))
+            lt = lt | (eq & (a[i] ^ True) & b[i])
+            eq = eq & (a[i] ^ b[i] ^ True)
+        return [lt, eq, gt]
+
+
+class GeneratedCircuit:
+    """
+    A generated saved solution, laid out like an imported netlist, and the
+    check function it must satisfy; for stress tests and benchmarks.
+    """
+
+    def __init__(self, title, builder, check_func):
+        self.title = title
+        self.solution, self.input_names, self.output_names = builder.build()
+        self.check_func = check_func
+
+    @property
+    def input_count(self):
+        return len(self.input_names)
+
+    @property
+    def output_count(self):
+        return len(self.output_names)
+
+    @property
+    def gate_count(self):
+        return len(self.solution["user_nodes"])
+
+    def level(self):
+        """
+        A playground-style level whose check is the reference function. Its
+        id is derived from the circuit, so verification and score caches
+        never mix it up with the playground or another generated circuit.
+        """
+        return Level(
+            id=f"generated-{self.netlist().structural_hash()[:12]}",
+            title=self.title,
+            description=f"Generated circuit\n{self.gate_count} gates",
+            allowed_nodes=PLAYGROUND_LEVEL.allowed_nodes,
+            check_func=self.check_func,
+            input_count=self.input_count,
+            output_count=self.output_count,
+            input_labels=self.input_names,
+            output_labels=self.output_names,
+        )
+
+    def netlist(self):
+        return Netlist.from_solution(self.input_count, self.output_count, self.solution)
+
+    def nodes(self):
+        """Live Node graph, placed the way start_level places a level."""
+        inputs = [InputNode(250, 200 + i * 150) for i in range(self.input_count)]
+        outputs = [OutputNode(1000, 300 + i * 150) for i in range(self.output_count)]
+        for node, name in zip(inputs + outputs, self.input_names + self.output_names):
+            node.title = name
+        gates = []
+        for n_data in self.solution["user_nodes"]:
+            params = {k: v for k, v in n_data.items() if k not in ("type", "x", "y")}
+            gates.append(GATE_TYPES[n_data["type"]](n_data["x"], n_data["y"], **params))
+        ordered = inputs + outputs + gates
+        for conn in self.solution["connections"]:
+            port = ordered[conn["to_idx"]].input_ports[conn["port_idx"]]
+            port.connected_node = ordered[conn["from_idx"]]
+        return ordered
+
+    def save(self, path):
+        """Writes a .v, .blif or native netlist file (see netlist_io)."""
+        save_circuit(path, self.solution, self.input_names, self.output_names)
+
+
+def _bus(builder, name, width):
+    names = [f"{name}{i}" for i in range(width)]
+    for signal in names:
+        builder.add_input(signal)
+    return names
+
+
+def _outputs(builder, names, signals):
+    for name, signal in zip(names, signals):
+        builder.add_output(name)
+        builder.alias(name, signal)
+
+
+def random_dag(inputs=16, outputs=8, width=64, depth=16, fanout=4, seed=0):
+    """
+    Layered random gate DAG: depth layers of width gates. Every gate reads
+    the previous layer, and its other inputs come from signals still under
+    fanout readers, so fanout bounds how widely a signal is reused. Outputs
+    read the last layer.
+    """
+    rng = random.Random(seed)
+    builder = CircuitBuilder()
+    signals = _bus(builder, "i", inputs)
+    readers = [0] * inputs
+    # Signals that may still gain readers; full ones are dropped when drawn
+    free = list(range(inputs))
+    gates = []  # (gate type, source indices) in evaluation order
+    layer = list(range(inputs))
+
+    def pick_free():
+        while free:
+            k = rng.randrange(len(free))
+            s = free[k]
+            if readers[s] < fanout:
+                return s
+            free[k] = free[-1]
+            free.pop()
+        return rng.randrange(len(signals))
+
+    for _ in range(depth):
+        next_layer = []
+        for _ in range(width):
+            node_type = rng.choice(sorted(_GATE_FUNCS))
+            srcs = [rng.choice(layer)]
+            if node_type != "NotNode":
+                srcs.append(pick_free())
+            for s in srcs:
+                readers[s] += 1
+            name = builder.add_gate(node_type, [signals[s] for s in srcs])
+            gates.append((node_type, srcs))
+            next_layer.append(len(signals))
+            free.append(len(signals))
+            signals.append(name)
+            readers.append(0)
+        layer = next_layer
+    taps = (layer * outputs)[:outputs]
+    _outputs(builder, [f"y{k}" for k in range(outputs)], [signals[s] for s in taps])
+    return GeneratedCircuit(
+        f"Random DAG {width}x{depth}", builder, GateListCheck(gates, taps)
+    )
+
+
+def ripple_carry_adder(bits):
+    """a + b, both bits wide, least significant first; outputs s0.. and cout."""
+    builder = CircuitBuilder()
+    a, b = _bus(builder, "a", bits), _bus(builder, "b", bits)
+    sums, carry = [], None
+    for i in range(bits):
+        p = builder.add_gate("XorNode", [a[i], b[i]])
+        g = builder.add_gate("AndNode", [a[i], b[i]])
+        if carry is None:
+            sums.append(p)
+            carry = g
+        else:
+            sums.append(builder.add_gate("XorNode", [p, carry]))
+            pc = builder.add_gate("AndNode", [p, carry])
+            carry = builder.add_gate("OrNode", [g, pc])
+    _outputs(builder, [f"s{i}" for i in range(bits)] + ["cout"], sums + [carry])
+    return GeneratedCircuit(f"{bits}-bit ripple-carry adder", builder, AdderCheck(bits))
+
+
+def carry_lookahead_adder(bits, block=4):
+    """
+    a + b with carry lookahead inside blocks of block bits: every carry of
+    a block is a two-level AND/OR of the block's generate and propagate
+    signals and the block's carry-in, which ripples between blocks.
+    """
+    builder = CircuitBuilder()
+    a, b = _bus(builder, "a", bits), _bus(builder, "b", bits)
+    p = [builder.add_gate("XorNode", [a[i], b[i]]) for i in range(bits)]
+    g = [builder.add_gate("AndNode", [a[i], b[i]]) for i in range(bits)]
+    sums, carry_in = [], None
+    for start in range(0, bits, block):
+        carry = carry_in
+        for i in range(start, min(start + block, bits)):
+            sums.append(p[i] if carry is None else builder.add_gate("XorNode", [p[i], carry]))
+            # c(i+1) = g(i) | p(i)g(i-1) | ... | p(i)..p(start) carry_in
+            terms = [g[i]]
+            for j in range(i - 1, start - 1, -1):
+                terms.append(builder.add_gate("AndNode", p[j + 1 : i + 1] + [g[j]]))
+            if carry_in is not None:
+                terms.append(builder.add_gate("AndNode", p[start : i + 1] + [carry_in]))
+            carry = builder.add_gate("OrNode", terms)
+        carry_in = carry
+    _outputs(builder, [f"s{i}" for i in range(bits)] + ["cout"], sums + [carry_in])
+    return GeneratedCircuit(
+        f"{bits}-bit carry-lookahead adder", builder, AdderCheck(bits)
+    )
+
+
+def mux_tree(select_bits):
+    """2**select_bits data inputs d0.., then selects s0.. (LSB first); one output."""
+    builder = CircuitBuilder()
+    data = _bus(builder, "d", 1 << select_bits)
+    selects = _bus(builder, "s", select_bits)
+    level = data
+    for s in selects:
+        not_s = builder.inverted(s)
+        level = [
+            builder.add_gate(
+                "OrNode",
+                [
+                    builder.add_gate("AndNode", [lo, not_s]),
+                    builder.add_gate("AndNode", [hi, s]),
+                ],
+            )
+            for lo, hi in zip(level[0::2], level[1::2])
+        ]
+    _outputs(builder, ["y"], level)
+    return GeneratedCircuit(
+        f"{len(data)}:1 multiplexer tree", builder, MuxCheck(len(data))
+    )
+
+
+def parity_tree(inputs, arity=2):
+    """XOR tree of gates with arity inputs; output is 1 for an odd count."""
+    builder = CircuitBuilder()
+    level = _bus(builder, "i", inputs)
+    while len(level) > 1:
+        level = [
+            builder.add_gate("XorNode", level[i : i + arity])
+            for i in range(0, len(level), arity)
+        ]
+    _outputs(builder, ["parity"], level)
+    return GeneratedCircuit(f"{inputs}-input parity tree", builder, ParityCheck())
+
+
+def comparator(bits):
+    """Magnitude comparator of a and b (LSB first); outputs lt, eq, gt."""
+    builder = CircuitBuilder()
+    a, b = _bus(builder, "a", bits), _bus(builder, "b", bits)
+    lt_terms, gt_terms = [], []
+    equal = None  # every bit above i equal
+    for i in reversed(range(bits)):
+        above = [] if equal is None else [equal]
+        gt_terms.append(builder.add_gate("AndNode", [a[i], builder.inverted(b[i])] + above))
+        lt_terms.append(builder.add_gate("AndNode", [builder.inverted(a[i]), b[i]] + above))
+        same = builder.add_gate("XnorNode", [a[i], b[i]])
+        equal = same if equal is None else builder.add_gate("AndNode", [equal, same])
+    lt = builder.add_gate("OrNode", lt_terms)
+    gt = builder.add_gate("OrNode", gt_terms)
+    _outputs(builder, ["lt", "eq", "gt"], [lt, equal, gt])
+    return GeneratedCircuit(f"{bits}-bit comparator", builder, ComparatorCheck(bits))
+
+
+GENERATORS = {
+    "dag": lambda args: random_dag(
+        args.inputs, args.outputs, args.width, args.depth, args.fanout, args.seed
+    ),
+    "ripple": lambda args: ripple_carry_adder(args.bits),
+    "cla": lambda args: carry_lookahead_adder(args.bits, args.block),
+    "mux": lambda args: mux_tree(args.bits),
+    "parity": lambda args: parity_tree(args.bits, args.arity),
+    "compare": lambda args: comparator(args.bits),
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate benchmark circuits")
+    parser.add_argument("kind", choices=sorted(GENERATORS))
+    parser.add_argument(
+        "--bits", type=int, default=8, help="operand width, select bits or parity inputs"
+    )
+    parser.add_argument("--block", type=int, default=4, help="lookahead block size")
+    parser.add_argument("--arity", type=int, default=2, help="parity gate inputs")
+    parser.add_argument("--inputs", type=int, default=16)
+    parser.add_argument("--outputs", type=int, default=8)
+    parser.add_argument("--width", type=int, default=64)
+    parser.add_argument("--depth", type=int, default=16)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", metavar="FILE", help="save as .v, .blif or native")
+    parser.add_argument(
+        "--verify", action="store_true", help="check against the reference and time it"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    circuit = GENERATORS[args.kind](args)
+    print(
+        f"{circuit.title}: {circuit.input_count} inputs, {circuit.output_count} "
+        f"outputs, {circuit.gate_count} gates ({time.perf_counter() - start:.2f}s)"
+    )
+    if args.output:
+        circuit.save(args.output)
+    if args.verify:
+        start = time.perf_counter()
+        result = verify_solution(circuit.level(), circuit.solution)
+        print(
+            f"{'passed' if result.passed else result.message} "
+            f"({time.perf_counter() - start:.2f}s)"
+        )
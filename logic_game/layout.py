@@ -0,0 +1,192 @@
+from nodes import PORT_SPACING, InputNode, OutputNode
+
+# Node size assumed for saved solutions, matching Node's default rect
+NODE_WIDTH = 150
+NODE_HEIGHT = 80
+
+LAYER_SPACING = NODE_WIDTH + 100
+ROW_GAP = 30
+# Down and up sweeps of barycentric crossing reduction
+CROSSING_SWEEPS = 4
+
+# Where laid out circuits start; inputs keep the column start_level uses
+LAYOUT_X = 250
+LAYOUT_Y = 100
+
+
+def longest_path_layers(fanin):
+    """
+    Longest-path layer of every node of a graph given as source lists.
+
+    This is its own Kahn pass rather than Netlist.topological_order: it
+    works on plain source lists (live nodes as well as saved solutions) and
+    must still place circuits with loops, where the netlist gives up. Every
+    node lands one layer past its deepest source. When only loops remain,
+    the loop is cut at its lowest-index node, whose not yet placed sources
+    become back edges.
+    """
+    count = len(fanin)
+    indegree = [len(srcs) for srcs in fanin]
+    fanout = [[] for _ in fanin]
+    for dst, srcs in enumerate(fanin):
+        for src in srcs:
+            fanout[src].append(dst)
+    layers = [0] * count
+    placed = [False] * count
+    ready = [i for i in range(count) if indegree[i] == 0]
+    cut = 0
+    done = 0
+    while done < count:
+        if not ready:
+            while placed[cut]:
+                cut += 1
+            ready.append(cut)
+        idx = ready.pop()
+        if placed[idx]:
+            continue
+        placed[idx] = True
+        done += 1
+        for dst in fanout[idx]:
+            if placed[dst]:
+                continue  # back edge
+            layers[dst] = max(layers[dst], layers[idx] + 1)
+            indegree[dst] -= 1
+            if indegree[dst] == 0:
+                ready.append(dst)
+    return layers
+
+
+def _number(layer, pos):
+    for rank, idx in enumerate(layer):
+        pos[idx] = (rank + 0.5) / len(layer)
+
+
+def _reorder(layer, neighbours, pos):
+    def barycenter(idx):
+        adjacent = neighbours[idx]
+        if not adjacent:
+            return pos[idx]
+        return sum(pos[n] for n in adjacent) / len(adjacent)
+
+    layer.sort(key=barycenter)
+    _number(layer, pos)
+
+
+def layered_layout(fanin, first=(), last=(), heights=None):
+    """
+    Sugiyama-style layout of a graph given as source lists.
+
+    Nodes are layered by longest path, reordered within their layer by the
+    barycenter of their neighbours in alternating down and up sweeps, and
+    then placed top to bottom close to the mean height of their sources.
+    Nodes in `first` (inputs) form the leftmost layer and nodes in `last`
+    (outputs) the rightmost one, both keeping their given order.
+    Long edges get no dummy nodes; barycenters span layers directly, which
+    keeps every sweep linear in the number of edges.
+
+    Returns the top-left (x, y) of every node, starting at (0, 0).
+    """
+    count = len(fanin)
+    heights = heights or [NODE_HEIGHT] * count
+    layer_of = longest_path_layers(fanin)
+    first, last = list(first), list(last)
+    pinned = set(first) | set(last)
+    if first:
+        for idx in range(count):
+            if idx not in pinned:
+                layer_of[idx] = max(layer_of[idx], 1)
+        for idx in first:
+            layer_of[idx] = 0
+    if last:
+        end = max([layer_of[i] for i in range(count) if i not in pinned] + [0]) + 1
+        for idx in last:
+            layer_of[idx] = end
+
+    layers = [[] for _ in range(max(layer_of, default=-1) + 1)]
+    for idx in range(count):
+        if idx not in pinned:
+            layers[layer_of[idx]].append(idx)
+    if first:
+        layers[0] = first
+    if last:
+        layers[-1] = last
+
+    fanout = [[] for _ in fanin]
+    for dst, srcs in enumerate(fanin):
+        for src in srcs:
+            fanout[src].append(dst)
+    pos = [0.0] * count
+    for layer in layers:
+        _number(layer, pos)
+    movable = [bool(layer) and not set(layer) <= pinned for layer in layers]
+    for _ in range(CROSSING_SWEEPS):
+        for L in range(1, len(layers)):
+            if movable[L]:
+                _reorder(layers[L], fanin, pos)
+        for L in range(len(layers) - 2, -1, -1):
+            if movable[L]:
+                _reorder(layers[L], fanout, pos)
+
+    # Coordinates: each node as close to its sources as the layer order allows
+    y = [0.0] * count
+    for L, layer in enumerate(layers):
+        wanted = []
+        bottom = None
+        for idx in layer:
+            srcs = [s for s in fanin[idx] if layer_of[s] < L]
+            if srcs:
+                want = sum(y[s] + heights[s] / 2 for s in srcs) / len(srcs)
+                want -= heights[idx] / 2
+            else:
+                want = bottom if bottom is not None else 0
+            top = want if bottom is None else max(want, bottom)
+            wanted.append(want)
+            y[idx] = top
+            bottom = top + heights[idx] + ROW_GAP
+        if layer:
+            # Overlaps only push nodes down; recentre the layer on its targets
+            shift = sum(w - y[i] for w, i in zip(wanted, layer)) / len(layer)
+            for idx in layer:
+                y[idx] += shift
+
+    top = min(y, default=0)
+    return [(layer_of[i] * LAYER_SPACING, int(y[i] - top)) for i in range(count)]
+
+
+def layout_solution(input_count, output_count, solution, origin=(LAYOUT_X, LAYOUT_Y)):
+    """Rewrites the x/y of every user node of a saved solution in place."""
+    base = input_count + output_count
+    user_nodes = solution.get("user_nodes", [])
+    fanin = [[] for _ in range(base + len(user_nodes))]
+    for c in solution.get("connections", []):
+        if c["from_idx"] < len(fanin) and c["to_idx"] < len(fanin):
+            fanin[c["to_idx"]].append(c["from_idx"])
+    heights = [NODE_HEIGHT] * base + [
+        max(NODE_HEIGHT, PORT_SPACING * (n_data.get("inputs", 2) + 1))
+        for n_data in user_nodes
+    ]
+    positions = layered_layout(
+        fanin, range(input_count), range(input_count, base), heights
+    )
+    for n_data, (x, y) in zip(user_nodes, positions[base:]):
+        n_data["x"] = origin[0] + x
+        n_data["y"] = origin[1] + y
+
+
+def layout_nodes(nodes, origin=(LAYOUT_X, LAYOUT_Y)):
+    """Moves live nodes into a layered layout, keeping input and output order."""
+    ordered = sorted(nodes, key=lambda n: n.rect.y)
+    owner = {}
+    for idx, node in enumerate(ordered):
+        for pin in node.output_pins():
+            owner[pin] = idx
+    fanin = [
+        [owner[p.connected_node] for p in n.input_ports if p.connected_node in owner]
+        for n in ordered
+    ]
+    first = [i for i, n in enumerate(ordered) if isinstance(n, InputNode)]
+    last = [i for i, n in enumerate(ordered) if isinstance(n, OutputNode)]
+    positions = layered_layout(fanin, first, last, [n.rect.height for n in ordered])
+    for node, (x, y) in zip(ordered, positions):
+        node.rect.topleft = (origin[0] + x, origin[1] + y)
+        node.update()
@@ -8,6 +8,18 @@ from nodes import (
     XnorNode,
     InputNode,
     OutputNode,
+    BusMergeNode,
+    BusSplitNode,
+    BusAndNode,
+    BusOrNode,
+    BusXorNode,
+    BusNotNode,
+    BusAddNode,
+    BusMuxNode,
+    ClockNode,
+    DFlipFlopNode,
+    SRLatchNode,
+    RegisterNode,
 )
 
 
@@ -24,6 +36,8 @@ class Level:
         expect_output_on=True,
         hint=None,
         output_labels=None,
+        reference=None,
+        input_labels=None,
     ):
         self.id = id
         self.title = title
@@ -35,6 +49,15 @@ class Level:
         self.expect_output_on = expect_output_on
         self.hint = hint
         self.output_labels = output_labels
+        self.input_labels = input_labels
+        # Optional known-good circuit (saved-solution dict) for wide levels
+        self.reference = reference
+
+    def expected_outputs(self, inputs):
+        expected = self.check_func(inputs)
+        if not isinstance(expected, (list, tuple)):
+            return [expected]
+        return list(expected)
 
 
 # --- Phase 1: Axioms ---
@@ -302,6 +325,18 @@ PLAYGROUND_LEVEL = Level(
         NorNode,
         XorNode,
         XnorNode,
+        BusMergeNode,
+        BusSplitNode,
+        BusAndNode,
+        BusOrNode,
+        BusXorNode,
+        BusNotNode,
+        BusAddNode,
+        BusMuxNode,
+        ClockNode,
+        DFlipFlopNode,
+        SRLatchNode,
+        RegisterNode,
     ],
     check_func=None,
     input_count=0,
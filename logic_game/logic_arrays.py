@@ -0,0 +1,91 @@
+from array import array
+
+from netlist import SETTLE_ROUNDS
+
+# Op code of every node, one byte each
+OPS = ["CONST0", "BUF", "NOT", "AND", "NAND", "OR", "NOR", "XOR", "XNOR"]
+CONST0, BUF, NOT, AND, NAND, OR, NOR, XOR, XNOR = range(len(OPS))
+OP_CODES = {op: code for code, op in enumerate(OPS)}
+
+
+class LogicArrays:
+    """
+    Struct-of-arrays form of a netlist for evaluating one input combination
+    at a time.
+
+    Node i has op code ops[i] and reads fanin[starts[i]:starts[i + 1]];
+    values holds one byte per node. Unconnected ports read the extra last
+    value, which stays 0. A gate costs about a dozen bytes here against
+    hundreds as node objects, and evaluation walks the dense arrays in
+    topological order instead of following port references.
+
+    Only compiled macros too wide for a lookup table evaluate through it.
+    The live simulation (eventsim, simthread) still walks Node objects,
+    since it tracks a delay and pending events per node.
+    """
+
+    def __init__(self, netlist):
+        netlist = netlist.bit_level()
+        n = len(netlist)
+        self.input_count = netlist.input_count
+        self.outputs = array("i", netlist.outputs)
+        self.ops = array("B", bytes(n))
+        self.starts = array("i", [0])
+        self.fanin = array("i")
+        for idx in range(n):
+            if idx >= netlist.input_count:
+                op, srcs = netlist.primitive(idx)
+                self.ops[idx] = OP_CODES[op]
+                self.fanin.extend(n if s is None else s for s in srcs)
+            self.starts.append(len(self.fanin))
+
+        order = netlist.topological_order()
+        # Feedback loops settle the same way Netlist.simulate does
+        self.rounds = 1 if order is not None else SETTLE_ROUNDS
+        if order is None:
+            order = range(netlist.input_count, n)
+        self.order = array("i", order)
+        self.values = bytearray(n + 1)
+
+    def evaluate(self, inputs):
+        """Returns the output bools for one input combination."""
+        ops, starts, fanin = self.ops, self.starts, self.fanin
+        values = self.values
+        values[:] = bytes(len(values))
+        for i, v in enumerate(inputs):
+            values[i] = 1 if v else 0
+
+        for _ in range(self.rounds):
+            for idx in self.order:
+                op = ops[idx]
+                lo, hi = starts[idx], starts[idx + 1]
+                if op == BUF:
+                    v = values[fanin[lo]]
+                elif op == NOT:
+                    v = 1 - values[fanin[lo]]
+                elif op == AND or op == NAND:
+                    v = 1
+                    for j in range(lo, hi):
+                        if not values[fanin[j]]:
+                            v = 0
+                            break
+                    if op == NAND:
+                        v = 1 - v
+                elif op == OR or op == NOR:
+                    v = 0
+                    for j in range(lo, hi):
+                        if values[fanin[j]]:
+                            v = 1
+                            break
+                    if op == NOR:
+                        v = 1 - v
+                elif op == XOR or op == XNOR:
+                    v = 0
+                    for j in range(lo, hi):
+                        v ^= values[fanin[j]]
+                    if op == XNOR:
+                        v = 1 - v
+                else:
+                    v = 0
+                values[idx] = v
+        return [bool(values[i]) for i in self.outputs]
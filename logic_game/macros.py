@@ -0,0 +1,137 @@
+import pygame
+
+from logic_arrays import LogicArrays
+from netlist import Netlist, exhaustive_input_words, flatten_solution
+from nodes import PORT_SPACING, TEXT_COLOR, Node, get_font
+from optimize import optimize
+from vector_eval import netlist_evaluator
+
+MACRO_COLOR = (90, 60, 120)
+
+# Blocks with up to this many inputs are compiled to a lookup table,
+# wider ones keep the flattened gates of their netlist as dense arrays.
+LUT_MAX_INPUTS = 10
+
+# Compiled bodies shared by every instance, keyed by structural hash
+_COMPILED = {}
+
+
+class CompiledMacro:
+    """Body of a macro compiled once for evaluation as a single node."""
+
+    def __init__(self, netlist):
+        self.netlist = optimize(netlist)
+        netlist = self.netlist
+        self.table = None
+        self.arrays = None
+        if netlist.input_count <= LUT_MAX_INPUTS:
+            # One bit-parallel pass over every input combination
+            words, mask = exhaustive_input_words(netlist.input_count)
+            outputs = netlist_evaluator(netlist)(words, mask)
+            self.table = [
+                tuple(bool(w >> p & 1) for w in outputs)
+                for p in range(1 << netlist.input_count)
+            ]
+        else:
+            self.arrays = LogicArrays(netlist)
+
+    def __deepcopy__(self, memo):
+        # Read-only once built, so copies of a circuit can share it
+        return self
+
+    def evaluate(self, inputs):
+        if self.table is None:
+            return tuple(self.arrays.evaluate(inputs))
+        # First input is the most significant bit, as in exhaustive_input_words
+        p = 0
+        for v in inputs:
+            p = p << 1 | (1 if v else 0)
+        return self.table[p]
+
+
+def compile_macro(input_count, output_count, body):
+    netlist = Netlist.from_solution(input_count, output_count, body)
+    key = netlist.structural_hash()
+    if key not in _COMPILED:
+        _COMPILED[key] = CompiledMacro(netlist)
+    return _COMPILED[key]
+
+
+def make_macro(level, solution):
+    """Macro definition (MacroNode params) from a verified level solution."""
+    return {
+        "name": level.title,
+        "inputs": level.input_count,
+        "outputs": level.output_count,
+        "body": solution,
+    }
+
+
+def macro_gate_types(macro):
+    """Primitive node types a macro expands to, nested macros included."""
+    gate_types = flatten_solution(macro["inputs"], macro["outputs"], macro["body"])[0]
+    return set(gate_types)
+
+
+class MacroOutput:
+    """One output pin of a MacroNode; ports connect to it like to a node."""
+
+    __slots__ = ("owner", "value", "output_rect")
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.value = False
+        self.output_rect = pygame.Rect(0, 0, 20, 20)
+
+
+class MacroNode(Node):
+    """A saved circuit reused as a single block with its own inputs and outputs."""
+
+    __slots__ = ("pins", "name", "body", "compiled")
+    color = MACRO_COLOR
+
+    def __init__(self, x, y, name="Macro", inputs=1, outputs=1, body=None):
+        self.pins = [MacroOutput(self) for _ in range(outputs)]
+        super().__init__(x, y, w=180, title=name)
+        self.name = name
+        self.body = body or {"user_nodes": [], "connections": []}
+        self.base_height = max(self.base_height, PORT_SPACING * (outputs + 1))
+        self.setup_inputs(inputs)
+        self.compiled = compile_macro(inputs, outputs, self.body)
+
+    def params(self):
+        return {
+            "name": self.name,
+            "inputs": len(self.input_ports),
+            "outputs": len(self.pins),
+            "body": self.body,
+        }
+
+    def output_pins(self):
+        return self.pins
+
+    def _update_ports(self):
+        super()._update_ports()
+        step = self.rect.height / (len(self.pins) + 1)
+        for i, pin in enumerate(self.pins):
+            pin.output_rect.center = (self.rect.right, self.rect.top + step * (i + 1))
+
+    def process_logic(self):
+        outputs = self.compiled.evaluate(self.input_values())
+        for pin, value in zip(self.pins, outputs):
+            pin.value = value
+
+    def render(self, screen):
+        color = (150, 150, 180) if self.selected else self.color
+        pygame.draw.rect(screen, color, self.rect, border_radius=8)
+        pygame.draw.rect(screen, (200, 200, 200), self.rect, 2, border_radius=8)
+
+        text_surf = get_font().render(self.title, True, TEXT_COLOR)
+        screen.blit(text_surf, (self.rect.x + 10, self.rect.y + 10))
+
+        for pin in self.pins:
+            pin_color = (255, 255, 0) if pin.value else (100, 100, 0)
+            pygame.draw.circle(screen, pin_color, pin.output_rect.center, 8)
+
+        for port in self.input_ports:
+            pygame.draw.circle(screen, (0, 200, 255), port.rect.center, 8)
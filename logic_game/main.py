@@ -1,6 +1,13 @@
+import time
+
+# Taken before the heavy imports so the startup profile covers them
+STARTUP_NS = time.perf_counter_ns()
+
 import pygame
 import sys
+from fonts import get_font
 from nodes import (
+    CLOCK_TICKS,
     InputNode,
     OutputNode,
     AndNode,
@@ -10,12 +17,38 @@ from nodes import (
     NorNode,
     XorNode,
     XnorNode,
+    BusMergeNode,
+    BusSplitNode,
+    BusAndNode,
+    BusOrNode,
+    BusXorNode,
+    BusNotNode,
+    BusAddNode,
+    BusMuxNode,
+    ClockNode,
+    DFlipFlopNode,
+    SRLatchNode,
+    RegisterNode,
 )
 import levels
-import itertools
+import argparse
 import json
 import os
 from enum import Enum
+from camera import PAN_STEP, ZOOM_STEP, Camera
+from connections import ConnectionIndex
+from event_log import EventLog
+from eventsim import DEFAULT_CLOCK_HZ, MAX_CLOCK_HZ, circuit_signature
+from layout import layout_nodes
+from macros import MacroNode, macro_gate_types, make_macro
+from minimize import generate_hint, score_solution
+from netlist import Netlist, order_nodes, serialize_circuit
+from netlist_io import load_circuit, save_circuit
+from profiler import FrameProfiler, StartupProfiler
+from simthread import SimulationWorker, output_pins
+from spatial import SpatialIndex, link_bounds
+from verification import VerificationCache
+from waveform import WaveformRecorder, draw_waveforms, panel_signals
 
 # Constants
 SCREEN_WIDTH = 1200
@@ -23,6 +56,7 @@ SCREEN_HEIGHT = 800
 BG_COLOR = (30, 30, 30)
 TEXT_COLOR = (255, 255, 255)
 LINK_COLOR = (200, 200, 200)
+FPS_CHOICES = (30, 60, 120, 240)
 
 NODE_TYPES = {
     "AndNode": AndNode,
@@ -34,6 +68,19 @@ NODE_TYPES = {
     "XnorNode": XnorNode,
     "InputNode": InputNode,
     "OutputNode": OutputNode,
+    "BusMergeNode": BusMergeNode,
+    "BusSplitNode": BusSplitNode,
+    "BusAndNode": BusAndNode,
+    "BusOrNode": BusOrNode,
+    "BusXorNode": BusXorNode,
+    "BusNotNode": BusNotNode,
+    "BusAddNode": BusAddNode,
+    "BusMuxNode": BusMuxNode,
+    "MacroNode": MacroNode,
+    "ClockNode": ClockNode,
+    "DFlipFlopNode": DFlipFlopNode,
+    "SRLatchNode": SRLatchNode,
+    "RegisterNode": RegisterNode,
 }
 
 
@@ -118,48 +165,59 @@ class Button:
         screen.blit(text_surf, text_rect)
 
 
-def draw_grid(surface, color=(40, 40, 40), cell_size=40):
+def draw_grid(surface, color=(40, 40, 40), cell_size=40, camera=None):
     width, height = surface.get_size()
-    for x in range(0, width, cell_size):
+    step, (ox, oy) = cell_size, (0, 0)
+    if camera is not None:
+        step = cell_size * camera.zoom
+        if step < 8:
+            return  # Too dense to help when zoomed far out
+        ox, oy = camera.to_screen((0, 0))
+    x = ox % step
+    while x < width:
         pygame.draw.line(surface, color, (x, 0), (x, height))
-    for y in range(0, height, cell_size):
+        x += step
+    y = oy % step
+    while y < height:
         pygame.draw.line(surface, color, (0, y), (width, y))
+        y += step
 
 
-def try_connect_node(connecting_node, nodes, mouse_pos):
+def try_connect_node(connecting_node, nodes, mouse_pos, connections):
     """
     Attempts to connect the connecting_node to an input port of another node
     at the given mouse_pos.
-    Returns True if a drop happened (successful connection or blocked),
-    False if no port was targeted.
+    Returns the node whose port took the drop (connected, or blocked because
+    the port is occupied), or None if no port was targeted.
     """
     for node in nodes:
-        if node != connecting_node:
-            for port in node.input_ports:
-                if port["rect"].collidepoint(mouse_pos):
-                    # Rule: Only one connection per input
-                    if port["connected_node"] is None:
-                        port["connected_node"] = connecting_node
-                        return True
-                    else:
-                        # Port occupied, do not overwrite
-                        return True  # drop handled (rejected)
-    return False
+        if connecting_node not in node.output_pins():
+            for port_idx, port in enumerate(node.input_ports):
+                if port.rect.collidepoint(mouse_pos):
+                    # Rule: Only one connection per input; an occupied
+                    # port is not overwritten
+                    connections.connect(node, port_idx, connecting_node)
+                    return node
+    return None
 
 
 class Game:
-    def __init__(self):
-        pygame.init()
-        pygame.font.init()
+    def __init__(self, load_path=None, profile_startup=False, record_path=None):
+        self.startup = StartupProfiler(STARTUP_NS)
+        self.profile_startup = profile_startup
+        # Handled input events are logged for replay by bench_gui
+        self.record_path = record_path
+        self.event_log = EventLog() if record_path else None
+        self.startup.mark("imports")
+        # Only the display; fonts initialize on first use and the other
+        # subsystems (audio, joystick) are never needed
+        pygame.display.init()
         # Use (0,0) and FULLSCREEN to adapt to native resolution
         self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
         pygame.display.set_caption("Logic Nodes")
         self.clock = pygame.time.Clock()
         self.running = True
-
-        self.font = pygame.font.SysFont("Arial", 24)
-        self.large_font = pygame.font.SysFont("Arial", 36)
-        self.title_font = pygame.font.SysFont("Arial", 72, bold=True)
+        self.startup.mark("display")
 
         self.state = GameState.MENU
 
@@ -169,20 +227,71 @@ class Game:
         self.current_level_idx = 0
         self.max_unlocked_idx = 0
         self.solutions = {}  # { str(level_id): { 'user_nodes': [], 'connections': [] } }
+        self.verification_cache = VerificationCache()
+        self.macros = {}  # { name: MacroNode params } from verified levels
+        self.generated_hints = {}  # { level_id: hint derived from check_func }
+        # Circuit loaded from a netlist file, opened as a playground
+        self.imported_level = None
+        self.imported_solution = None
 
         self.simulating = False
+        # The simulation runs on a SimulationWorker thread; the game sends it
+        # copies of the circuit and reads back snapshots
+        self.sim_worker = None
+        self.sim_signature = None
+        self.sim_version = 0
+        self.sim_pins = []
+        self.sim_inputs = {}
+        self.sim_time = 0
+        self.target_fps = 60
+        self.clock_hz = DEFAULT_CLOCK_HZ
+        self.recorder = None  # WaveformRecorder while the waveform panel is on
+        self.profiler = FrameProfiler()
+        self.sim_events = 0
         self.message = ""
         self.message_color = (255, 255, 255)
+        # VerificationJob while a wide circuit is checked on a process pool
+        self.verification_job = None
+
+        # Node rects are world coordinates, shown through the camera; the
+        # spatial index finds what is on screen or under the mouse
+        self.camera = Camera()
+        # Fan-in lives on the ports; the connection index adds fan-out
+        self.connections = ConnectionIndex()
+        self.index = SpatialIndex(self.connections)
+        self.drawn_nodes = 0
 
         # Interaction state
+        self.panning = False
         self.active_node = None
         self.drag_offset = (0, 0)
         self.connecting_node = None
 
         self.save_file = "save_game.json"
         self.load_progress()
+        self.startup.mark("progress")
 
         self.setup_menu()
+        if load_path:
+            self.import_circuit(load_path)
+            self.startup.mark("import")
+
+    # Fonts are created when first drawn; the menu needs only two of them
+    @property
+    def font(self):
+        return get_font(24)
+
+    @property
+    def small_font(self):
+        return get_font(16)
+
+    @property
+    def large_font(self):
+        return get_font(36)
+
+    @property
+    def title_font(self):
+        return get_font(72, bold=True)
 
     def load_progress(self):
         if os.path.exists(self.save_file):
@@ -191,13 +300,22 @@ class Game:
                     data = json.load(f)
                     self.max_unlocked_idx = data.get("max_unlocked", 0)
                     self.solutions = data.get("solutions", {})
+                    self.verification_cache = VerificationCache(
+                        data.get("verified", {})
+                    )
+                    self.macros = data.get("macros", {})
             except:
                 pass
 
     def save_progress(self):
         with open(self.save_file, "w") as f:
             json.dump(
-                {"max_unlocked": self.max_unlocked_idx, "solutions": self.solutions},
+                {
+                    "max_unlocked": self.max_unlocked_idx,
+                    "solutions": self.solutions,
+                    "verified": self.verification_cache.to_dict(),
+                    "macros": self.macros,
+                },
                 f,
                 indent=2,
             )
@@ -211,49 +329,12 @@ class Game:
         if not level:
             return
 
-        input_nodes = [n for n in self.nodes if isinstance(n, InputNode)]
-        output_nodes = [n for n in self.nodes if isinstance(n, OutputNode)]
-        user_nodes = [
-            n for n in self.nodes if n not in input_nodes and n not in output_nodes
-        ]
-
-        # Sort fixed nodes to ensure consistent indices
-        input_nodes.sort(key=lambda n: n.rect.y)
-        output_nodes.sort(key=lambda n: n.rect.y)
-
-        all_ordered = input_nodes + output_nodes + user_nodes
-        node_to_idx = {n: i for i, n in enumerate(all_ordered)}
-
-        # Serialize User Nodes
-        serialized_nodes = []
-        for n in user_nodes:
-            serialized_nodes.append(
-                {"type": n.__class__.__name__, "x": n.rect.x, "y": n.rect.y}
-            )
-
-        # Serialize Connections
-        connections = []
-        for target_node in all_ordered:
-            for port_idx, port in enumerate(target_node.input_ports):
-                source_node = port["connected_node"]
-                if source_node:
-                    connections.append(
-                        {
-                            "from_idx": node_to_idx[source_node],
-                            "to_idx": node_to_idx[target_node],
-                            "port_idx": port_idx,
-                        }
-                    )
-
-        self.solutions[str(level.id)] = {
-            "user_nodes": serialized_nodes,
-            "connections": connections,
-        }
+        self.solutions[str(level.id)] = serialize_circuit(self.nodes)
         self.save_progress()
 
     def get_current_level(self):
         if self.current_level_idx == -1:
-            return levels.PLAYGROUND_LEVEL
+            return self.imported_level or levels.PLAYGROUND_LEVEL
         if 0 <= self.current_level_idx < len(levels.LEVELS):
             return levels.LEVELS[self.current_level_idx]
         return None
@@ -301,6 +382,7 @@ class Game:
 
     def action_playground(self):
         self.current_level_idx = -1
+        self.imported_level = None
         self.start_level()
 
     # --- Level Select Methods ---
@@ -351,8 +433,12 @@ class Game:
 
     # --- Gameplay Methods ---
     def start_level(self):
+        self.cancel_verification()
         self.state = GameState.PLAYING
-        self.simulating = False
+        self.stop_sim()
+        self.sim_time = 0
+        if self.recorder:
+            self.recorder = WaveformRecorder()
         self.nodes.clear()
         self.message = ""
         self.show_hint = False
@@ -367,7 +453,10 @@ class Game:
         inputs = []
         for i in range(level.input_count):
             node = InputNode(250, start_y + i * spacing)
-            node.title = f"In {chr(65 + i)}"
+            if level.input_labels and i < len(level.input_labels):
+                node.title = level.input_labels[i]
+            else:
+                node.title = f"In {chr(65 + i)}"
             inputs.append(node)
             self.nodes.append(node)
 
@@ -383,15 +472,21 @@ class Game:
             self.nodes.append(node)
 
         # Try Loading Solution
-        if str(level.id) in self.solutions:
-            sol = self.solutions[str(level.id)]
+        if level is self.imported_level:
+            sol = self.imported_solution
+        else:
+            sol = self.solutions.get(str(level.id))
+        if sol:
             user_nodes = []
 
             # Restore User Nodes
             for n_data in sol.get("user_nodes", []):
                 cls = NODE_TYPES.get(n_data["type"])
                 if cls:
-                    new_node = cls(n_data["x"], n_data["y"])
+                    params = {
+                        k: v for k, v in n_data.items() if k not in ("type", "x", "y")
+                    }
+                    new_node = cls(n_data["x"], n_data["y"], **params)
                     user_nodes.append(new_node)
                     self.nodes.append(new_node)
 
@@ -403,13 +498,29 @@ class Game:
                 port_idx = conn["port_idx"]
 
                 if 0 <= from_idx < len(all_ordered) and 0 <= to_idx < len(all_ordered):
-                    src = all_ordered[from_idx]
+                    pins = all_ordered[from_idx].output_pins()
+                    src = pins[min(conn.get("from_port", 0), len(pins) - 1)]
                     dst = all_ordered[to_idx]
                     if 0 <= port_idx < len(dst.input_ports):
-                        dst.input_ports[port_idx]["connected_node"] = src
+                        dst.input_ports[port_idx].connected_node = src
 
+        self.camera.reset()
+        self.connections.rebuild(self.nodes)
+        self.index.rebuild(self.nodes)
         self.update_game_buttons()
 
+    def get_hint(self, level):
+        if level.hint:
+            return level.hint
+        if not level.check_func:
+            return None
+        if level.id not in self.generated_hints:
+            try:
+                self.generated_hints[level.id] = generate_hint(level)
+            except ValueError:
+                self.generated_hints[level.id] = None
+        return self.generated_hints[level.id]
+
     def toggle_hint(self):
         self.show_hint = not self.show_hint
         self.update_game_buttons()
@@ -427,7 +538,7 @@ class Game:
         y_offset += 50
 
         # Hint Button
-        if level.hint:
+        if self.get_hint(level):
             hint_text = "Hide Hint" if self.show_hint else "Show Hint"
             self.buttons.append(
                 Button(
@@ -442,14 +553,24 @@ class Game:
             )
             y_offset += 50
 
-        # Node spawning buttons
-        for node_cls in level.allowed_nodes:
-            name = node_cls.__name__.replace("Node", "")
+        # Node spawning buttons, squeezed together when they would not fit
+        # above the sim controls and level navigation
+        spawners = [
+            (node_cls.__name__.replace("Node", ""), self.make_spawn_func(node_cls))
+            for node_cls in level.allowed_nodes
+        ]
+        for name, macro in self.available_macros(level):
+            spawners.append((name, self.make_spawn_func(MacroNode, **macro)))
+
+        h = self.screen.get_height()
+        available = h - y_offset - 290
+        spacing = max(30, min(50, available // max(1, len(spawners))))
+        for name, spawn in spawners:
             btn_text = f"Add {name}"
             self.buttons.append(
-                Button(20, y_offset, 140, 40, btn_text, self.make_spawn_func(node_cls))
+                Button(20, y_offset, 140, spacing - 10, btn_text, spawn)
             )
-            y_offset += 50
+            y_offset += spacing
 
         y_offset += 30
 
@@ -471,7 +592,6 @@ class Game:
         y_offset += 50
 
         # Level Nav
-        h = self.screen.get_height()
         self.buttons.append(
             Button(
                 20,
@@ -493,17 +613,174 @@ class Game:
             Button(100, h - 60, 60, 40, ">", self.next_level, disabled=next_disabled)
         )
 
-    def make_spawn_func(self, node_cls):
+    def make_spawn_func(self, node_cls, **params):
         def spawn():
-            self.nodes.append(node_cls(500, 500))
+            # Near the middle of the view
+            w, h = self.screen.get_size()
+            x, y = self.camera.to_world((w // 2 - 75, h // 2 - 40))
+            node = node_cls(x, y, **params)
+            self.nodes.append(node)
+            self.connections.add(node)
+            self.index.update(node)
 
         return spawn
 
+    def available_macros(self, level):
+        """Saved blocks buildable from the gates this level allows."""
+        allowed = {cls.__name__ for cls in level.allowed_nodes}
+        return [
+            (name, macro)
+            for name, macro in self.macros.items()
+            if name != level.title and macro_gate_types(macro) <= allowed
+        ]
+
     def start_sim(self):
         self.simulating = True
 
     def stop_sim(self):
         self.simulating = False
+        if self.sim_worker:
+            self.sim_worker.stop()
+            self.sim_worker = None
+        self.sim_signature = None
+
+    def sync_simulation(self):
+        """Sends wiring changes to the worker and shows its latest state."""
+        if self.sim_worker is None:
+            self.sim_worker = SimulationWorker(self.clock_hz)
+            self.sim_worker.start()
+
+        signature = circuit_signature(self.nodes)
+        if signature != self.sim_signature:
+            self.sim_signature = signature
+            self.sim_version += 1
+            self.sim_pins = output_pins(self.nodes)
+            self.sim_inputs = {n: i for i, n in enumerate(self.nodes)}
+            self.sim_worker.load(self.sim_version, self.nodes, self.recorder)
+
+        snapshot = self.sim_worker.snapshot
+        if snapshot and snapshot.version == self.sim_version:
+            for pin, value in zip(self.sim_pins, snapshot.values):
+                # Inputs belong to the player, the worker only mirrors them
+                if not isinstance(pin, InputNode):
+                    pin.value = value
+            self.sim_time = snapshot.time
+
+    def toggle_input(self, node):
+        node.value = not node.value
+        if self.sim_worker and node in self.sim_inputs:
+            self.sim_worker.set_input(self.sim_inputs[node], node.value)
+
+    def change_fps(self, step):
+        idx = FPS_CHOICES.index(self.target_fps) + step
+        self.target_fps = FPS_CHOICES[max(0, min(len(FPS_CHOICES) - 1, idx))]
+
+    def toggle_waveforms(self):
+        # Recording only happens while the panel is shown
+        self.recorder = None if self.recorder else WaveformRecorder()
+        self.sim_signature = None
+
+    def export_waveforms(self):
+        if not self.recorder:
+            self.message = "Press W to record waveforms first."
+            self.message_color = (255, 100, 100)
+            return
+        with open("waveform.vcd", "w") as f:
+            self.recorder.write_vcd(f)
+        self.message = "Waveforms saved to waveform.vcd"
+        self.message_color = (100, 255, 100)
+
+    def import_circuit(self, path):
+        """Opens a Verilog, BLIF or native netlist file as a playground."""
+        solution, input_names, output_names = load_circuit(path)
+        netlist = Netlist.from_solution(len(input_names), len(output_names), solution)
+        self.imported_level = levels.Level(
+            # Own id, so per-level caches never mix it up with the playground
+            id=f"imported-{netlist.structural_hash()[:12]}",
+            title=os.path.basename(path),
+            description=f"Imported circuit\n{len(solution['user_nodes'])} gates",
+            allowed_nodes=levels.PLAYGROUND_LEVEL.allowed_nodes,
+            check_func=None,
+            input_count=len(input_names),
+            output_count=len(output_names),
+            input_labels=input_names,
+            output_labels=output_names,
+        )
+        self.imported_solution = solution
+        self.current_level_idx = -1
+        self.start_level()
+        self.auto_layout()
+        self.frame_circuit()
+
+    def auto_layout(self):
+        # Tidy the circuit into layers; inputs and outputs keep their order
+        layout_nodes(self.nodes)
+        self.index.rebuild(self.nodes)
+
+    def frame_circuit(self):
+        if self.nodes:
+            bounds = self.nodes[0].rect.unionall([n.rect for n in self.nodes])
+            self.camera.frame(bounds, self.screen.get_size())
+
+    def nodes_at(self, world_pos):
+        """Nodes near a world position, in drawing order."""
+        return self.index.in_draw_order(self.index.at(world_pos))
+
+    def export_circuit(self, path="circuit.v"):
+        def net_name(node):
+            return "".join(c if c.isalnum() else "_" for c in node.title)
+
+        input_nodes, output_nodes, _ = order_nodes(self.nodes)
+        try:
+            save_circuit(
+                path,
+                serialize_circuit(self.nodes),
+                [net_name(n) for n in input_nodes],
+                [net_name(n) for n in output_nodes],
+            )
+        except ValueError as e:
+            self.message = str(e)
+            self.message_color = (255, 100, 100)
+            return
+        self.message = f"Circuit saved to {path}"
+        self.message_color = (100, 255, 100)
+
+    def profile_counters(self):
+        links = sum(
+            1 for n in self.nodes for p in n.input_ports if p.connected_node
+        )
+        cache = self.verification_cache
+        lookups = cache.hits + cache.misses
+        snapshot = self.sim_worker.snapshot if self.sim_worker else None
+        events = snapshot.events if snapshot else 0
+        counters = {
+            "Nodes": len(self.nodes),
+            "Drawn nodes": self.drawn_nodes,
+            "Links": links,
+            "Verify cache hits": f"{cache.hits}/{lookups}",
+            "Sim events/frame": events - self.sim_events,
+        }
+        self.sim_events = events
+        return counters
+
+    def dump_profile(self, chrome_trace):
+        if not self.profiler.frames:
+            self.message = "Press F3 to start profiling first."
+            self.message_color = (255, 100, 100)
+            return
+        path = "profile_trace.json" if chrome_trace else "profile.csv"
+        with open(path, "w", newline="") as f:
+            if chrome_trace:
+                self.profiler.write_chrome_trace(f)
+            else:
+                self.profiler.write_csv(f)
+        self.message = f"Profile saved to {path}"
+        self.message_color = (100, 255, 100)
+
+    def change_clock_rate(self, factor):
+        self.clock_hz = min(MAX_CLOCK_HZ, max(1, int(self.clock_hz * factor)))
+        if self.sim_worker:
+            self.sim_worker.set_clock_hz(self.clock_hz)
 
     def next_level(self):
         if self.current_level_idx < len(levels.LEVELS) - 1:
@@ -543,50 +820,47 @@ class Game:
             self.message_color = (255, 100, 100)
             return
 
-        # 0. Capture Current State
-        current_input_values = [n.value for n in input_nodes]
-
-        # 2. Run Exhaustive Verification
-        combinations = list(itertools.product([False, True], repeat=level.input_count))
+        # Unchanged circuits are answered from the cache instead of re-checked
+        self.cancel_verification()
+        self.verification_job = self.verification_cache.start(
+            level, Netlist.from_nodes(self.nodes)
+        )
+        self.message = "Verifying... 0%"
+        self.message_color = (255, 255, 255)
+        self.poll_verification()
 
-        for inputs in combinations:
-            for i, val in enumerate(inputs):
-                input_nodes[i].value = val
+    def poll_verification(self):
+        job = self.verification_job
+        result = job.poll()
+        if result is None:
+            self.message = f"Verifying... {job.progress:.0%}"
+            return
+        self.verification_job = None
+        level, netlist = job.level, job.netlist
+        if Netlist.from_nodes(self.nodes).structural_hash() != netlist.structural_hash():
+            self.message = "Circuit changed during verification; verify again."
+            self.message_color = (255, 100, 100)
+            return
+        self.finish_verification(level, netlist, result)
 
-            for _ in range(50):
-                for node in self.nodes:
-                    node.process_logic()
+    def cancel_verification(self):
+        if self.verification_job:
+            self.verification_job.cancel()
+            self.verification_job = None
 
-            actual_outputs = [n.value for n in output_nodes]
-            expected = level.check_func(inputs)
+    def finish_verification(self, level, netlist, result):
+        self.message = result.message
+        if not result.passed:
+            self.message_color = (255, 100, 100)
+            return
 
-            if not isinstance(expected, (list, tuple)):
-                expected = [expected]
-            else:
-                expected = list(expected)
-
-            if actual_outputs != expected:
-                self.message = f"Failed at inputs: {inputs}. Got {actual_outputs}, expected {expected}."
-                self.message_color = (255, 100, 100)
-                # Restore state before returning
-                for i, val in enumerate(current_input_values):
-                    input_nodes[i].value = val
-                for _ in range(50):
-                    for node in self.nodes:
-                        node.process_logic()
-                return
-
-        # Restore state after successful verification
-        for i, val in enumerate(current_input_values):
-            input_nodes[i].value = val
-        for _ in range(50):
-            for node in self.nodes:
-                node.process_logic()
-
-        self.message = "Level Complete! Logic Verified."
+        gates, minimal = score_solution(level, netlist)
+        if minimal is not None:
+            self.message += f" Gates: {gates} (minimized: {minimal})"
         self.message_color = (100, 255, 100)
 
-        # Save Solution
+        # Save Solution, also reusable as a block in other levels
+        self.macros[level.title] = make_macro(level, serialize_circuit(self.nodes))
         self.save_current_level_solution()
 
         if self.current_level_idx == self.max_unlocked_idx:
@@ -597,7 +871,15 @@ class Game:
     # --- Main Loop Methods ---
     def handle_events(self):
         mouse_pos = pygame.mouse.get_pos()
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if self.event_log is not None:
+            self.event_log.record(events)
+        for event in events:
+            # Mouse events carry their own position, so replayed events
+            # land where they were recorded
+            if hasattr(event, "pos"):
+                mouse_pos = event.pos
+            world_pos = self.camera.to_world(mouse_pos)
             if event.type == pygame.QUIT:
                 self.running = False
 
@@ -611,18 +893,87 @@ class Game:
                     else:
                         self.running = False
 
+                elif (
+                    event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS)
+                    and self.state == GameState.PLAYING
+                ):
+                    # Add an input to variadic gates, widen bus nodes
+                    for n in self.nodes:
+                        if n.selected:
+                            n.adjust(1)
+                            self.connections.update(n)
+                            self.index.moved(n)
+                    self.sim_signature = None  # widths are not in the signature
+
+                elif (
+                    event.key in (pygame.K_MINUS, pygame.K_KP_MINUS)
+                    and self.state == GameState.PLAYING
+                ):
+                    for n in self.nodes:
+                        if n.selected:
+                            n.adjust(-1)
+                            self.connections.update(n)
+                            self.index.moved(n)
+                    self.sim_signature = None  # widths are not in the signature
+
+                elif (
+                    event.key in (pygame.K_LEFTBRACKET, pygame.K_RIGHTBRACKET)
+                    and self.state == GameState.PLAYING
+                ):
+                    # Clock rate is independent of the frame rate
+                    self.change_clock_rate(
+                        2 if event.key == pygame.K_RIGHTBRACKET else 0.5
+                    )
+
+                elif event.key in (pygame.K_COMMA, pygame.K_PERIOD):
+                    # Frame rate cap, independent of the simulation speed
+                    self.change_fps(1 if event.key == pygame.K_PERIOD else -1)
+
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle()
+
+                elif event.key in (pygame.K_F4, pygame.K_F5):
+                    self.dump_profile(chrome_trace=event.key == pygame.K_F5)
+
+                elif event.key == pygame.K_w and self.state == GameState.PLAYING:
+                    self.toggle_waveforms()
+
+                elif event.key == pygame.K_v and self.state == GameState.PLAYING:
+                    self.export_waveforms()
+
+                elif event.key == pygame.K_e and self.state == GameState.PLAYING:
+                    self.export_circuit()
+
+                elif event.key == pygame.K_l and self.state == GameState.PLAYING:
+                    self.auto_layout()
+
+                elif event.key == pygame.K_HOME and self.state == GameState.PLAYING:
+                    self.frame_circuit()
+
+                elif (
+                    event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+                    and self.state == GameState.PLAYING
+                ):
+                    dx = {pygame.K_LEFT: PAN_STEP, pygame.K_RIGHT: -PAN_STEP}
+                    dy = {pygame.K_UP: PAN_STEP, pygame.K_DOWN: -PAN_STEP}
+                    self.camera.pan(dx.get(event.key, 0), dy.get(event.key, 0))
+
                 elif event.key == pygame.K_DELETE and self.state == GameState.PLAYING:
-                    to_remove = [
-                        n
+                    to_remove = {
+                        n: None
                         for n in self.nodes
                         if n.selected and not isinstance(n, (InputNode, OutputNode))
-                    ]
+                    }
+                    # Only the deleted nodes' own wires are touched
+                    affected = {}
                     for n in to_remove:
-                        self.nodes.remove(n)
-                        for other in self.nodes:
-                            for port in other.input_ports:
-                                if port["connected_node"] == n:
-                                    port["connected_node"] = None
+                        for dst in self.connections.remove(n):
+                            affected[dst] = None
+                        self.index.remove(n)
+                    self.nodes[:] = [n for n in self.nodes if n not in to_remove]
+                    for dst in affected:
+                        if dst not in to_remove:
+                            self.index.update(dst)
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
@@ -636,46 +987,65 @@ class Game:
                         continue
 
                     if self.state == GameState.PLAYING:
-                        self.handle_game_click(mouse_pos)
+                        self.handle_game_click(world_pos)
+
+                elif event.button == 2 and self.state == GameState.PLAYING:
+                    self.panning = True
 
                 elif event.button == 3 and self.state == GameState.PLAYING:
-                    for node in reversed(self.nodes):
-                        if node.rect.collidepoint(mouse_pos):
+                    for node in reversed(self.nodes_at(world_pos)):
+                        if node.rect.collidepoint(world_pos):
                             if isinstance(node, InputNode):
-                                node.value = not node.value
+                                self.toggle_input(node)
                             break
 
             elif event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 2:
+                    self.panning = False
+
                 if event.button == 1 and self.state == GameState.PLAYING:
                     if self.connecting_node:
-                        if try_connect_node(
-                            self.connecting_node, self.nodes, mouse_pos
-                        ):
-                            pass
+                        near = self.nodes_at(world_pos)
+                        node = try_connect_node(
+                            self.connecting_node, near, world_pos, self.connections
+                        )
+                        if node:
+                            self.index.update(node)
                         self.connecting_node = None
 
                     if self.active_node:
                         self.active_node.dragging = False
                         self.active_node = None
 
+            elif event.type == pygame.MOUSEWHEEL and self.state == GameState.PLAYING:
+                self.camera.zoom_at(mouse_pos, ZOOM_STEP**event.y)
+
             elif event.type == pygame.MOUSEMOTION:
                 for btn in self.buttons:
                     btn.check_hover(mouse_pos)
 
                 if self.state == GameState.PLAYING:
-                    if self.active_node and self.active_node.dragging:
-                        self.active_node.rect.x = mouse_pos[0] + self.drag_offset[0]
-                        self.active_node.rect.y = mouse_pos[1] + self.drag_offset[1]
+                    if self.panning:
+                        self.camera.pan(*event.rel)
+                    elif self.active_node and self.active_node.dragging:
+                        node = self.active_node
+                        node.rect.x = world_pos[0] + self.drag_offset[0]
+                        node.rect.y = world_pos[1] + self.drag_offset[1]
+                        node.update()
+                        self.index.moved(node)
 
     def handle_game_click(self, mouse_pos):
+        """Handles a left click at a world position."""
+        near = self.nodes_at(mouse_pos)
         # 1. Input Ports
         port_clicked = False
-        for node in self.nodes:
-            for port in node.input_ports:
-                if port["rect"].collidepoint(mouse_pos):
-                    if port["connected_node"]:
-                        self.connecting_node = port["connected_node"]
-                        port["connected_node"] = None
+        for node in near:
+            for port_idx, port in enumerate(node.input_ports):
+                if port.rect.collidepoint(mouse_pos):
+                    if port.connected_node:
+                        # Pick the wire up again from its source
+                        self.connecting_node = self.connections.disconnect(node, port_idx)
+                        self.index.update(node)
                         port_clicked = True
                         break
             if port_clicked:
@@ -683,15 +1053,16 @@ class Game:
 
         if not port_clicked:
             # 2. Output Ports
-            for node in self.nodes:
-                if node.output_rect.collidepoint(mouse_pos):
-                    self.connecting_node = node
+            for node in near:
+                pin = node.output_at(mouse_pos)
+                if pin:
+                    self.connecting_node = pin
                     port_clicked = True
                     break
 
         if not port_clicked:
             # 3. Bodies
-            for node in reversed(self.nodes):
+            for node in reversed(near):
                 if node.rect.collidepoint(mouse_pos):
                     self.active_node = node
                     self.active_node.dragging = True
@@ -702,6 +1073,7 @@ class Game:
                     )
                     self.nodes.remove(node)
                     self.nodes.append(node)
+                    self.index.raise_node(node)
                     break
             else:
                 # 4. BG Click
@@ -709,11 +1081,12 @@ class Game:
                     node.selected = False
 
     def update(self):
+        # Ports follow their node when it moves, so only the simulation runs here
         if self.state == GameState.PLAYING:
-            for node in self.nodes:
-                node.update()
-                if self.simulating:
-                    node.process_logic()
+            if self.simulating:
+                self.sync_simulation()
+            if self.verification_job:
+                self.poll_verification()
 
     def draw(self):
         self.screen.fill(BG_COLOR)
@@ -724,12 +1097,21 @@ class Game:
             self.draw_level_select()
         elif self.state == GameState.PLAYING:
             self.draw_game()
+        self.profiler.mark("text")
 
         # UI Buttons (Global for simplicity, but list is updated per state)
         for btn in self.buttons:
             btn.render(self.screen, self.font)
+        self.profiler.mark("text")
+
+        if self.profiler.enabled:
+            self.profiler.draw_overlay(
+                self.screen, self.small_font, self.clock.get_fps()
+            )
+            self.profiler.mark("overlay")
 
         pygame.display.flip()
+        self.profiler.mark("flip")
 
     def draw_menu(self):
         # Title
@@ -742,7 +1124,9 @@ class Game:
         self.screen.blit(title_surf, (self.screen.get_width() // 2 - 100, 50))
 
     def draw_game(self):
-        draw_grid(self.screen)
+        camera = self.camera
+        draw_grid(self.screen, camera=camera)
+        self.profiler.mark("grid")
 
         # Level Info
         level = self.get_current_level()
@@ -760,48 +1144,137 @@ class Game:
                 dy += 30
 
             # Draw Hint
-            if self.show_hint and level.hint:
+            hint = self.get_hint(level) if self.show_hint else None
+            if hint:
                 dy += 10
-                hint_lines = level.hint.split("\n")
+                hint_lines = hint.split("\n")
                 for line in hint_lines:
                     hint_surf = self.font.render(line, True, (255, 255, 100))
                     self.screen.blit(hint_surf, (200, dy))
                     dy += 30
+        self.profiler.mark("text")
+
+        # Only nodes and wires in view are drawn
+        view = camera.view_rect(self.screen.get_size())
+        visible = self.index.in_draw_order(self.index.query(view))
+        self.profiler.mark("cull")
 
         # Links
-        for node in self.nodes:
+        for node in visible:
             for port in node.input_ports:
-                if port["connected_node"]:
-                    start = port["connected_node"].output_rect.center
-                    end = port["rect"].center
-                    draw_bezier(self.screen, start, end)
+                if port.connected_node:
+                    start = port.connected_node.output_rect.center
+                    end = port.rect.center
+                    x0, y0, x1, y1 = link_bounds(start, end)
+                    if x1 < view.left or x0 > view.right or y1 < view.top or y0 > view.bottom:
+                        continue
+                    start, end = camera.to_screen(start), camera.to_screen(end)
+                    if camera.lod:
+                        pygame.draw.line(self.screen, LINK_COLOR, start, end)
+                    else:
+                        draw_bezier(self.screen, start, end)
 
         # Temp Link
         if self.connecting_node:
-            start = self.connecting_node.output_rect.center
+            start = camera.to_screen(self.connecting_node.output_rect.center)
             end = pygame.mouse.get_pos()
             draw_bezier(self.screen, start, end, color=(255, 255, 0))
+        self.profiler.mark("links")
 
         # Nodes
-        for node in self.nodes:
-            node.render(self.screen)
+        self.drawn_nodes = 0
+        for node in visible:
+            if node.rect.colliderect(view):
+                camera.render_node(self.screen, node)
+                self.drawn_nodes += 1
+        self.profiler.mark("nodes")
+
+        pins = panel_signals(self.recorder, self.nodes) if self.recorder else []
+        if pins:
+            w, h = self.screen.get_size()
+            rows = min(len(pins), 8)
+            rect = pygame.Rect(180, h - 90 - rows * 26, w - 200, rows * 26 + 10)
+            draw_waveforms(
+                self.screen,
+                rect,
+                self.recorder,
+                pins,
+                self.sim_time,
+                4 * CLOCK_TICKS,
+                self.small_font,
+            )
+            self.profiler.mark("waveforms")
+
+        if self.simulating:
+            clock_surf = self.font.render(
+                f"Clock: {self.clock_hz} Hz ([ ])  FPS cap: {self.target_fps} (, .)",
+                True,
+                (200, 200, 200),
+            )
+            self.screen.blit(
+                clock_surf,
+                (
+                    self.screen.get_width() - clock_surf.get_width() - 20,
+                    self.screen.get_height() - 40,
+                ),
+            )
 
         # Message
         if self.message:
             msg_surf = self.large_font.render(self.message, True, self.message_color)
             self.screen.blit(msg_surf, (300, self.screen.get_height() - 60))
 
+    def run_frame(self, tick=True):
+        """One pass of the main loop; tick=False skips the frame rate cap."""
+        profiler = self.profiler
+        profiler.start_frame()
+        self.handle_events()
+        profiler.mark("events")
+        self.update()
+        profiler.mark("logic")
+        self.draw()
+        if not self.startup.finished:
+            self.startup.mark("first frame")
+            self.startup.finish()
+            if self.profile_startup:
+                print("\n".join(self.startup.summary_lines()))
+        if tick:
+            self.clock.tick(self.target_fps)
+        profiler.mark("wait")
+        if profiler.enabled:
+            profiler.end_frame(self.profile_counters())
+
     def run(self):
         while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(60)
+            self.run_frame()
 
+        self.stop_sim()
+        self.cancel_verification()
+        if self.event_log is not None:
+            self.event_log.save(self.record_path)
         pygame.quit()
         sys.exit()
 
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Logic Nodes")
+    parser.add_argument(
+        "--load", metavar="FILE", help="open a .v, .blif or native netlist file"
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print the time spent in each startup phase",
+    )
+    parser.add_argument(
+        "--record-events",
+        metavar="FILE",
+        help="save the input events of this session for bench_gui.py --replay",
+    )
+    args = parser.parse_args()
+    game = Game(
+        load_path=args.load,
+        profile_startup=args.profile_startup,
+        record_path=args.record_events,
+    )
     game.run()
@@ -0,0 +1,527 @@
+import itertools
+
+from bdd import symbolic_outputs
+from netlist import Netlist, exhaustive_input_words
+from vector_eval import netlist_evaluator
+
+# Exact Quine-McCluskey up to this many inputs, Espresso-style heuristic above
+QM_MAX_INPUTS = 8
+
+# Safety cap on the REDUCE/EXPAND/IRREDUNDANT loop of the heuristic
+ESPRESSO_MAX_PASSES = 20
+
+# A cube is (ones, care): input i is a literal when bit (n - 1 - i) of care is
+# set, and it is positive when the same bit of ones is set. Minterm p is the
+# cube (p, full care), matching the packed truth table bit order.
+
+
+class WordAlgebra:
+    """bdd.Symbol algebra over bit-parallel words: bit p is one combination."""
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def constant(self, value):
+        return self.mask if value else 0
+
+    def and_(self, a, b):
+        return a & b
+
+    def or_(self, a, b):
+        return a | b
+
+    def xor(self, a, b):
+        return a ^ b
+
+    def not_(self, a):
+        return ~a & self.mask
+
+
+def packed_outputs(level, words, mask):
+    """
+    Runs level.check_func once on bit-parallel input words. Returns one word
+    per output, or None when check_func is not written with bitwise
+    operators and has to be called per combination.
+    """
+    try:
+        return symbolic_outputs(WordAlgebra(mask), level, words)
+    except TypeError:
+        return None
+
+
+def level_truth_tables(level):
+    """Packs level.check_func into one truth table int per output."""
+    words, mask = exhaustive_input_words(level.input_count)
+    tables = packed_outputs(level, words, mask)
+    if tables is not None:
+        return tables
+    tables = [0] * level.output_count
+    combos = itertools.product([False, True], repeat=level.input_count)
+    for p, inputs in enumerate(combos):
+        for k, value in enumerate(level.expected_outputs(inputs)):
+            if value:
+                tables[k] |= 1 << p
+    return tables
+
+
+def netlist_truth_tables(netlist):
+    """Packs a netlist's outputs by simulating all combinations bit-parallel."""
+    words, mask = exhaustive_input_words(netlist.input_count)
+    return list(netlist_evaluator(netlist)(words, mask))
+
+
+def cube_mask(cube, words, mask):
+    """Truth table of the minterms covered by a cube."""
+    ones, care = cube
+    n = len(words)
+    result = mask
+    for i in range(n):
+        bit = 1 << (n - 1 - i)
+        if care & bit:
+            result &= words[i] if ones & bit else ~words[i] & mask
+    return result
+
+
+def cover_cost(cubes):
+    return (len(cubes), sum(bin(care).count("1") for _, care in cubes))
+
+
+def _minterms(table):
+    p = 0
+    while table:
+        if table & 1:
+            yield p
+        table >>= 1
+        p += 1
+
+
+def prime_implicants(table, n):
+    full = (1 << n) - 1
+    current = {(p, full) for p in _minterms(table)}
+    primes = set()
+    while current:
+        merged = set()
+        used = set()
+        for ones, care in current:
+            bit = 1
+            while bit <= care:
+                if care & bit and not ones & bit:
+                    partner = (ones | bit, care)
+                    if partner in current:
+                        merged.add((ones, care & ~bit))
+                        used.add((ones, care))
+                        used.add(partner)
+                bit <<= 1
+        primes |= current - used
+        current = merged
+    return sorted(primes)
+
+
+def quine_mccluskey(table, n):
+    """Exact minimum SOP cover (fewest cubes, then fewest literals)."""
+    words, mask = exhaustive_input_words(n)
+    primes = prime_implicants(table, n)
+    masks = [cube_mask(c, words, mask) for c in primes]
+
+    # Essential primes are the only cover of some minterm
+    chosen = []
+    covered = 0
+    for p in _minterms(table):
+        bit = 1 << p
+        covering = [i for i, m in enumerate(masks) if m & bit]
+        if len(covering) == 1 and covering[0] not in chosen:
+            chosen.append(covering[0])
+            covered |= masks[covering[0]]
+
+    best = [None]
+
+    def search(selected, covered):
+        cost = cover_cost([primes[i] for i in selected])
+        if best[0] is not None and cost >= best[0][0]:
+            return
+        remaining = table & ~covered
+        if not remaining:
+            best[0] = (cost, list(selected))
+            return
+        # Branch on the uncovered minterm with the fewest candidate primes
+        candidates = None
+        for p in _minterms(remaining):
+            bit = 1 << p
+            covering = [i for i, m in enumerate(masks) if m & bit]
+            if candidates is None or len(covering) < len(candidates):
+                candidates = covering
+                if len(candidates) <= 1:
+                    break
+        for i in sorted(candidates, key=lambda i: -bin(masks[i] & remaining).count("1")):
+            selected.append(i)
+            search(selected, covered | masks[i])
+            selected.pop()
+
+    search(chosen, covered)
+    return [primes[i] for i in best[0][1]]
+
+
+def _expand(cube, table, words, mask, n, order):
+    ones, care = cube
+    for i in order:
+        bit = 1 << (n - 1 - i)
+        if care & bit:
+            raised = (ones & ~bit, care & ~bit)
+            if not cube_mask(raised, words, mask) & ~table:
+                ones, care = raised
+    return ones, care
+
+
+def _irredundant(cubes, masks):
+    keep = list(range(len(cubes)))
+    # Try dropping the most expensive cubes first
+    for i in sorted(keep, key=lambda i: -bin(cubes[i][1]).count("1")):
+        others = 0
+        for j in keep:
+            if j != i:
+                others |= masks[j]
+        if not masks[i] & ~others:
+            keep.remove(i)
+    return [cubes[i] for i in keep], [masks[i] for i in keep]
+
+
+def _reduce(cubes, masks, words, mask, n):
+    cubes, masks = list(cubes), list(masks)
+    for i, (ones, care) in enumerate(cubes):
+        others = 0
+        for j, m in enumerate(masks):
+            if j != i:
+                others |= m
+        unique = masks[i] & ~others
+        if not unique:
+            continue
+        # Shrink to the smallest cube still holding the uniquely covered minterms
+        for v in range(n):
+            bit = 1 << (n - 1 - v)
+            if not care & bit:
+                if not unique & ~words[v]:
+                    ones, care = ones | bit, care | bit
+                elif not unique & words[v]:
+                    care |= bit
+        # Later cubes must see the reduced cube so shared minterms stay covered
+        cubes[i] = (ones, care)
+        masks[i] = cube_mask(cubes[i], words, mask)
+    return cubes
+
+
+def espresso(table, n):
+    """Heuristic SOP cover via EXPAND / IRREDUNDANT / REDUCE iterations."""
+    words, mask = exhaustive_input_words(n)
+    forward = list(range(n))
+
+    cubes, masks = [], []
+    covered = 0
+    full = (1 << n) - 1
+    for p in _minterms(table):
+        if covered >> p & 1:
+            continue
+        cube = _expand((p, full), table, words, mask, n, forward)
+        cubes.append(cube)
+        masks.append(cube_mask(cube, words, mask))
+        covered |= masks[-1]
+    cubes, masks = _irredundant(cubes, masks)
+
+    best = list(cubes)
+    for passes in range(ESPRESSO_MAX_PASSES):
+        # Alternate the literal order so EXPAND can escape the previous optimum
+        order = forward if passes % 2 else forward[::-1]
+        cubes = _reduce(cubes, masks, words, mask, n)
+        cubes = list(dict.fromkeys(_expand(c, table, words, mask, n, order) for c in cubes))
+        masks = [cube_mask(c, words, mask) for c in cubes]
+        cubes, masks = _irredundant(cubes, masks)
+        if cover_cost(cubes) >= cover_cost(best):
+            break
+        best = list(cubes)
+    return best
+
+
+def minimize_table(table, n):
+    """Returns a minimal (or near-minimal for large n) SOP cover of a truth table."""
+    if not table:
+        return []
+    if n <= QM_MAX_INPUTS:
+        return quine_mccluskey(table, n)
+    return espresso(table, n)
+
+
+def input_names(count):
+    # Same names the level loader gives to input nodes
+    return [chr(65 + i) for i in range(count)]
+
+
+def format_sop(cubes, names):
+    if not cubes:
+        return "0"
+    n = len(names)
+    terms = []
+    for ones, care in cubes:
+        literals = []
+        for i, name in enumerate(names):
+            bit = 1 << (n - 1 - i)
+            if care & bit:
+                literals.append(name if ones & bit else f"NOT {name}")
+        if not literals:
+            return "1"
+        terms.append(literals)
+    if len(terms) == 1:
+        return " AND ".join(terms[0])
+    return " OR ".join(
+        f"({' AND '.join(t)})" if len(t) > 1 else t[0] for t in terms
+    )
+
+
+def format_pos(off_cubes, names):
+    if not off_cubes:
+        return "1"
+    n = len(names)
+    clauses = []
+    for ones, care in off_cubes:
+        literals = []
+        for i, name in enumerate(names):
+            bit = 1 << (n - 1 - i)
+            if care & bit:
+                literals.append(f"NOT {name}" if ones & bit else name)
+        if not literals:
+            return "0"
+        clauses.append(literals)
+    if len(clauses) == 1:
+        return " OR ".join(clauses[0])
+    return " AND ".join(
+        f"({' OR '.join(c)})" if len(c) > 1 else c[0] for c in clauses
+    )
+
+
+class _Synthesizer:
+    """Emits two-input gates restricted to a set of allowed node types."""
+
+    def __init__(self, input_count, output_count, allowed_nodes):
+        self.input_count = input_count
+        self.output_count = output_count
+        self.allowed = {cls.__name__ for cls in allowed_nodes}
+        self.gate_types = []
+        self.connections = []
+        self.memo = {}
+        self.inverse = {}
+
+    def _gate(self, node_type, srcs):
+        if node_type not in self.allowed:
+            raise ValueError(f"{node_type} is not allowed")
+        key = (node_type, tuple(sorted(srcs)))
+        if key not in self.memo:
+            idx = self.input_count + self.output_count + len(self.gate_types)
+            self.gate_types.append(node_type)
+            for port_idx, src in enumerate(srcs):
+                self.connections.append((src, idx, port_idx))
+            self.memo[key] = idx
+        return self.memo[key]
+
+    def not_(self, a):
+        if a in self.inverse:
+            return self.inverse[a]
+        if "NotNode" in self.allowed:
+            out = self._gate("NotNode", [a])
+        elif "NandNode" in self.allowed:
+            out = self._gate("NandNode", [a, a])
+        elif "NorNode" in self.allowed:
+            out = self._gate("NorNode", [a, a])
+        else:
+            raise ValueError("No inverting gate allowed")
+        self.inverse[a] = out
+        self.inverse[out] = a
+        return out
+
+    def and_(self, a, b):
+        if "AndNode" in self.allowed:
+            return self._gate("AndNode", [a, b])
+        if "NandNode" in self.allowed:
+            return self.not_(self._gate("NandNode", [a, b]))
+        if "NorNode" in self.allowed:
+            return self._gate("NorNode", [self.not_(a), self.not_(b)])
+        raise ValueError("No AND-capable gate allowed")
+
+    def or_(self, a, b):
+        if "OrNode" in self.allowed:
+            return self._gate("OrNode", [a, b])
+        if "NandNode" in self.allowed:
+            return self._gate("NandNode", [self.not_(a), self.not_(b)])
+        if "NorNode" in self.allowed:
+            return self.not_(self._gate("NorNode", [a, b]))
+        raise ValueError("No OR-capable gate allowed")
+
+    def _tree(self, op, items):
+        # Balanced tree keeps the emitted circuit shallow
+        while len(items) > 1:
+            paired = [op(items[i], items[i + 1]) for i in range(0, len(items) - 1, 2)]
+            if len(items) % 2:
+                paired.append(items[-1])
+            items = paired
+        return items[0]
+
+    def literal(self, i, positive):
+        return i if positive else self.not_(i)
+
+    def constant_one(self):
+        return self.or_(0, self.not_(0))
+
+    def sop(self, cubes):
+        """Returns the node driving the cover, or None for constant 0."""
+        n = self.input_count
+        terms = []
+        for ones, care in cubes:
+            lits = [
+                self.literal(i, ones >> (n - 1 - i) & 1)
+                for i in range(n)
+                if care >> (n - 1 - i) & 1
+            ]
+            if not lits:
+                return self.constant_one()
+            terms.append(self._tree(self.and_, lits))
+        if not terms:
+            return None
+        return self._tree(self.or_, terms)
+
+    def pos(self, off_cubes):
+        n = self.input_count
+        clauses = []
+        for ones, care in off_cubes:
+            lits = [
+                self.literal(i, not ones >> (n - 1 - i) & 1)
+                for i in range(n)
+                if care >> (n - 1 - i) & 1
+            ]
+            if not lits:
+                return None
+            clauses.append(self._tree(self.or_, lits))
+        if not clauses:
+            return self.constant_one()
+        return self._tree(self.and_, clauses)
+
+    def solution(self, drivers):
+        connections = list(self.connections)
+        for k, src in enumerate(drivers):
+            if src is not None:
+                connections.append((src, self.input_count + k, 0))
+        netlist = Netlist(
+            self.input_count, self.output_count, self.gate_types, connections
+        )
+        positions = _column_positions(netlist)
+        return {
+            "user_nodes": [
+                {"type": t, "x": positions[i][0], "y": positions[i][1]}
+                for i, t in enumerate(self.gate_types)
+            ],
+            "connections": [
+                {"from_idx": f, "to_idx": t, "port_idx": p}
+                for f, t, p in connections
+            ],
+        }
+
+
+def _column_positions(netlist):
+    # Place gates in columns by logic depth between the input and output nodes
+    base = netlist.input_count + netlist.output_count
+    depth = [0] * len(netlist)
+    for idx in netlist.topological_order():
+        srcs = [s for s in netlist.fanin[idx] if s is not None]
+        depth[idx] = 1 + max((depth[s] for s in srcs), default=0)
+    max_depth = max(depth[base:], default=1)
+    step = min(150, 550 // max_depth)
+    rows = {}
+    positions = []
+    for idx in range(base, len(netlist)):
+        row = rows.get(depth[idx], 0)
+        rows[depth[idx]] = row + 1
+        positions.append((350 + (depth[idx] - 1) * step, 150 + row * 100))
+    return positions
+
+
+class MinimizedCircuit:
+    def __init__(self, level, sop, pos, solution):
+        self.level = level
+        self.sop = sop  # SOP cube cover per output
+        self.pos = pos  # OFF-set cube cover per output, read as a POS
+        self.solution = solution
+        self.netlist = Netlist.from_solution(
+            level.input_count, level.output_count, solution
+        )
+
+    @property
+    def gate_count(self):
+        return self.netlist.gate_count
+
+    def expressions(self):
+        """Returns the shorter of the SOP and POS forms for every output."""
+        names = input_names(self.level.input_count)
+        result = []
+        for sop, pos in zip(self.sop, self.pos):
+            if cover_cost(pos) < cover_cost(sop):
+                result.append(format_pos(pos, names))
+            else:
+                result.append(format_sop(sop, names))
+        return result
+
+
+def minimize_level(level, allowed_nodes=None):
+    """
+    Derives a small circuit for a level from its check_func.
+    Tries SOP, POS and a per-output mix and keeps the one with fewest gates.
+    Raises ValueError when the allowed nodes cannot express the logic.
+    """
+    allowed_nodes = allowed_nodes if allowed_nodes is not None else level.allowed_nodes
+    n = level.input_count
+    mask = (1 << (1 << n)) - 1
+    tables = level_truth_tables(level)
+    sop = [minimize_table(t, n) for t in tables]
+    pos = [minimize_table(~t & mask, n) for t in tables]
+
+    best = None
+    last_error = None
+    for forms in (
+        ["sop"] * len(tables),
+        ["pos"] * len(tables),
+        ["pos" if cover_cost(p) < cover_cost(s) else "sop" for s, p in zip(sop, pos)],
+    ):
+        synth = _Synthesizer(n, level.output_count, allowed_nodes)
+        try:
+            drivers = [
+                synth.sop(s) if form == "sop" else synth.pos(p)
+                for form, s, p in zip(forms, sop, pos)
+            ]
+        except ValueError as e:
+            last_error = e
+            continue
+        if best is None or len(synth.gate_types) < len(best.gate_types):
+            best = synth
+            best_drivers = drivers
+
+    if best is None:
+        raise last_error
+    return MinimizedCircuit(level, sop, pos, best.solution(best_drivers))
+
+
+def generate_hint(level):
+    """Builds a hint line per output from the minimized expressions."""
+    circuit = minimize_level(level)
+    expressions = circuit.expressions()
+    if len(expressions) == 1:
+        return f"Logic: {expressions[0]}"
+    labels = level.output_labels or [f"Out {i}" for i in range(len(expressions))]
+    return "\n".join(f"{label}: {expr}" for label, expr in zip(labels, expressions))
+
+
+_REFERENCE_GATES = {}
+
+
+def score_solution(level, netlist):
+    """Returns (gates used, gates in the minimized reference circuit or None)."""
+    if level.id not in _REFERENCE_GATES:
+        try:
+            _REFERENCE_GATES[level.id] = minimize_level(level).gate_count
+        except ValueError:
+            _REFERENCE_GATES[level.id] = None
+    return netlist.gate_count, _REFERENCE_GATES[level.id]
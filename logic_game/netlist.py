@@ -0,0 +1,602 @@
+import hashlib
+import json
+
+from nodes import DEFAULT_BUS_WIDTH, InputNode, OutputNode
+
+# Number of settle rounds used for circuits with feedback loops,
+# matching the fixed iteration cap of the interactive simulation.
+SETTLE_ROUNDS = 50
+
+# Primitive operation and input port count of every node class,
+# keyed by the type name used in saved solutions.
+NODE_OPS = {
+    "InputNode": ("INPUT", 0),
+    "OutputNode": ("BUF", 1),
+    "AndNode": ("AND", 2),
+    "OrNode": ("OR", 2),
+    "NotNode": ("NOT", 1),
+    "NandNode": ("NAND", 2),
+    "NorNode": ("NOR", 2),
+    "XorNode": ("XOR", 2),
+    "XnorNode": ("XNOR", 2),
+    # Bus nodes are lowered to single-bit gates by Netlist.bit_level()
+    "BusMergeNode": ("BUS_MERGE", DEFAULT_BUS_WIDTH),
+    "BusSplitNode": ("BUS_BIT", 1),
+    "BusAndNode": ("BUS_AND", 2),
+    "BusOrNode": ("BUS_OR", 2),
+    "BusXorNode": ("BUS_XOR", 2),
+    "BusNotNode": ("BUS_NOT", 1),
+    "BusAddNode": ("BUS_ADD", 2),
+    "BusMuxNode": ("BUS_MUX", 3),
+    # Macros are expanded into their body by Netlist.from_solution()
+    "MacroNode": ("MACRO", 0),
+    # State elements, simulated by eventsim; see SEQUENTIAL_OPS
+    "ClockNode": ("CLOCK", 0),
+    "DFlipFlopNode": ("DFF", 2),
+    "SRLatchNode": ("LATCH", 2),
+    "RegisterNode": ("BUS_REG", 2),
+}
+
+# The combinational engines (verification, BDD, SAT) see state elements as
+# constants holding their reset value 0, which also breaks feedback through them.
+SEQUENTIAL_OPS = {"CLOCK", "DFF", "LATCH", "BUS_REG"}
+
+
+def port_count(node_type, params):
+    if "inputs" in params:
+        return params["inputs"]
+    if node_type == "BusMergeNode":
+        return params.get("width", DEFAULT_BUS_WIDTH)
+    return NODE_OPS[node_type][1]
+
+
+def is_bus(node_type):
+    return NODE_OPS[node_type][0].startswith("BUS_")
+
+
+def order_nodes(nodes):
+    """
+    Splits nodes into (inputs, outputs, user_nodes) in the order used for
+    saved solutions: fixed nodes sorted top to bottom, user nodes in list order.
+    """
+    input_nodes = [n for n in nodes if isinstance(n, InputNode)]
+    output_nodes = [n for n in nodes if isinstance(n, OutputNode)]
+    user_nodes = [
+        n for n in nodes if not isinstance(n, (InputNode, OutputNode))
+    ]
+
+    # Sort fixed nodes to ensure consistent indices
+    input_nodes.sort(key=lambda n: n.rect.y)
+    output_nodes.sort(key=lambda n: n.rect.y)
+    return input_nodes, output_nodes, user_nodes
+
+
+def serialize_circuit(nodes):
+    """Returns the saved-solution dict ({'user_nodes', 'connections'}) of nodes."""
+    input_nodes, output_nodes, user_nodes = order_nodes(nodes)
+    all_ordered = input_nodes + output_nodes + user_nodes
+    node_to_idx = {n: i for i, n in enumerate(all_ordered)}
+
+    # Serialize User Nodes
+    serialized_nodes = []
+    for n in user_nodes:
+        serialized_nodes.append(
+            {"type": n.__class__.__name__, "x": n.rect.x, "y": n.rect.y, **n.params()}
+        )
+
+    # Every output pin a port can connect to, as (node index, output index)
+    sources = {}
+    for idx, n in enumerate(all_ordered):
+        for pin_idx, pin in enumerate(n.output_pins()):
+            sources[pin] = (idx, pin_idx)
+
+    # Serialize Connections
+    connections = []
+    for target_node in all_ordered:
+        for port_idx, port in enumerate(target_node.input_ports):
+            source_node = port.connected_node
+            if source_node in sources:
+                from_idx, from_port = sources[source_node]
+                conn = {
+                    "from_idx": from_idx,
+                    "to_idx": node_to_idx[target_node],
+                    "port_idx": port_idx,
+                }
+                # Only multi-output nodes (macros) need the output index
+                if from_port:
+                    conn["from_port"] = from_port
+                connections.append(conn)
+
+    return {"user_nodes": serialized_nodes, "connections": connections}
+
+
+def exhaustive_input_words(input_count):
+    """
+    Returns (words, mask) packing every input combination into one bit-parallel
+    word per input. Bit p holds the p-th combination of itertools.product,
+    so the first input is the most significant bit of the pattern index.
+    """
+    patterns = 1 << input_count
+    mask = (1 << patterns) - 1
+    words = []
+    for i in range(input_count):
+        half = 1 << (input_count - 1 - i)
+        # One period: `half` zeros followed by `half` ones, repeated across the word
+        unit = ((1 << half) - 1) << half
+        words.append(unit * (mask // ((1 << (2 * half)) - 1)))
+    return words, mask
+
+
+def eval_op(op, values, mask):
+    """Evaluates a primitive op over bit-parallel words (bools work with mask=1)."""
+    if op == "BUF":
+        return values[0]
+    if op in ("AND", "NAND"):
+        result = mask
+        for v in values:
+            result &= v
+    elif op in ("OR", "NOR"):
+        result = 0
+        for v in values:
+            result |= v
+    elif op in ("XOR", "XNOR"):
+        result = 0
+        for v in values:
+            result ^= v
+    elif op == "NOT":
+        return ~values[0] & mask
+    elif op == "CONST0":
+        return 0
+    else:
+        raise ValueError(f"Unknown op: {op}")
+
+    if op in ("NAND", "NOR", "XNOR"):
+        result = ~result & mask
+    return result
+
+
+class Netlist:
+    """
+    Position-free view of a circuit: gate types plus wiring.
+
+    Node indices follow the saved-solution order (inputs, outputs, user nodes),
+    so a live circuit and its saved form compile to the same netlist.
+    """
+
+    def __init__(
+        self, input_count, output_count, gate_types, connections, gate_params=None
+    ):
+        self.input_count = input_count
+        self.output_count = output_count
+        self.types = (
+            ["InputNode"] * input_count + ["OutputNode"] * output_count + gate_types
+        )
+        # Extra constructor arguments (input count, bus width, ...) per node
+        self.params = [{} for _ in range(input_count + output_count)] + list(
+            gate_params or [{} for _ in gate_types]
+        )
+        # fanin[node][port] -> source node index, or None when unconnected
+        self.fanin = [
+            [None] * port_count(t, p) for t, p in zip(self.types, self.params)
+        ]
+        for from_idx, to_idx, port_idx in connections:
+            if 0 <= from_idx < len(self.types) and 0 <= to_idx < len(self.types):
+                ports = self.fanin[to_idx]
+                if 0 <= port_idx < len(ports):
+                    ports[port_idx] = from_idx
+        self.has_buses = any(is_bus(t) for t in gate_types)
+        self._order = None
+        self._hash = None
+        self._cones = None
+        self._bits = None
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        input_nodes, output_nodes, _ = order_nodes(nodes)
+        solution = serialize_circuit(nodes)
+        return cls.from_solution(len(input_nodes), len(output_nodes), solution)
+
+    @classmethod
+    def from_solution(cls, input_count, output_count, solution):
+        """Compiles a saved solution, expanding macros into their bodies."""
+        gate_types, gate_params, gate_fanin, output_fanin = flatten_solution(
+            input_count, output_count, solution
+        )
+        base = input_count + output_count
+        offsets = {"in": 0, "out": input_count, "gate": base}
+        targets = [(base + i, srcs) for i, srcs in enumerate(gate_fanin)]
+        targets += [(input_count + k, [ref]) for k, ref in enumerate(output_fanin)]
+        connections = []
+        for to_idx, srcs in targets:
+            for port_idx, ref in enumerate(srcs):
+                if ref is not None:
+                    connections.append((offsets[ref[0]] + ref[1], to_idx, port_idx))
+        return cls(input_count, output_count, gate_types, connections, gate_params)
+
+    def __len__(self):
+        return len(self.types)
+
+    @property
+    def outputs(self):
+        return range(self.input_count, self.input_count + self.output_count)
+
+    @property
+    def gate_count(self):
+        return len(self.types) - self.input_count - self.output_count
+
+    def primitive(self, idx):
+        """Returns (op, sources) of a node; unconnected sources are None."""
+        op = NODE_OPS[self.types[idx]][0]
+        srcs = self.fanin[idx]
+        # An unconnected NOT gate reads as False rather than inverting it
+        if op == "NOT" and srcs[0] is None:
+            return "CONST0", ()
+        if op in SEQUENTIAL_OPS:
+            return "CONST0", ()
+        return op, srcs
+
+    def structural_hash(self):
+        """Canonical hash of gate types and connection topology."""
+        if self._hash is None:
+            payload = json.dumps(
+                [
+                    self.input_count,
+                    self.output_count,
+                    self.types[self.input_count + self.output_count :],
+                    self.params[self.input_count + self.output_count :],
+                    self.fanin,
+                ],
+                separators=(",", ":"),
+            )
+            self._hash = hashlib.sha1(payload.encode()).hexdigest()
+        return self._hash
+
+    def cone_hashes(self):
+        """
+        Canonical hash of every output's transitive fan-in cone, in output
+        order. An edit outside an output's cone leaves its hash unchanged.
+        """
+        if self._cones is None:
+            self._cones = [self._cone_hash(idx) for idx in self.outputs]
+        return self._cones
+
+    def _cone_hash(self, root):
+        # Gates are numbered in DFS pre-order from the output, so the same
+        # cone gets the same numbering wherever its gates sit in the netlist
+        local = {}
+        stack = [root]
+        while stack:
+            idx = stack.pop()
+            if idx in local or idx < self.input_count:
+                continue
+            local[idx] = len(local)
+            stack.extend(s for s in reversed(self.fanin[idx]) if s is not None)
+
+        def ref(src):
+            if src is None:
+                return None
+            return -1 - src if src < self.input_count else local[src]
+
+        payload = json.dumps(
+            [
+                [self.types[idx], self.params[idx], [ref(s) for s in self.fanin[idx]]]
+                for idx in local
+            ],
+            separators=(",", ":"),
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def bit_level(self):
+        """
+        Returns an equivalent netlist with every bus node lowered to single-bit
+        gates. Input and output indices are unchanged.
+        """
+        if not self.has_buses:
+            return self
+        if self._bits is None:
+            self._bits = _BitBlaster(self).run()
+        return self._bits
+
+    def topological_order(self):
+        """Returns non-input node indices in dependency order, or None if cyclic."""
+        if self._order is None:
+            indegree = [0] * len(self.types)
+            fanout = [[] for _ in self.types]
+            for idx in range(self.input_count, len(self.types)):
+                for src in self.primitive(idx)[1]:
+                    if src is not None:
+                        indegree[idx] += 1
+                        fanout[src].append(idx)
+
+            ready = [i for i in range(len(self.types)) if indegree[i] == 0]
+            order = []
+            while ready:
+                idx = ready.pop()
+                order.append(idx)
+                for dst in fanout[idx]:
+                    indegree[dst] -= 1
+                    if indegree[dst] == 0:
+                        ready.append(dst)
+
+            if len(order) != len(self.types):
+                self._order = False
+            else:
+                self._order = [i for i in order if i >= self.input_count]
+        return self._order if self._order is not False else None
+
+    def compose(self, apply_op, input_values, zero):
+        """
+        Folds an acyclic netlist over any value domain (BDD nodes, CNF
+        literals, ...). apply_op(op, values) mirrors eval_op, and zero stands
+        in for unconnected ports. Returns the value of every output.
+        """
+        if self.has_buses:
+            return self.bit_level().compose(apply_op, input_values, zero)
+        order = self.topological_order()
+        if order is None:
+            raise ValueError("Circuits with feedback loops cannot be composed")
+        values = [zero] * len(self.types)
+        values[: self.input_count] = input_values
+        for idx in order:
+            op, srcs = self.primitive(idx)
+            values[idx] = apply_op(op, [values[s] if s is not None else zero for s in srcs])
+        return [values[i] for i in self.outputs]
+
+    def simulate(self, input_words, mask=1):
+        """
+        Evaluates every node for bit-parallel input words.
+        Returns the list of node values indexed like the netlist (like
+        bit_level() for netlists containing buses).
+        """
+        if self.has_buses:
+            return self.bit_level().simulate(input_words, mask)
+        values = [0] * len(self.types)
+        values[: self.input_count] = input_words
+
+        order = self.topological_order()
+        rounds = 1
+        if order is None:
+            # Feedback loops settle the same way the interactive simulation does
+            order = range(self.input_count, len(self.types))
+            rounds = SETTLE_ROUNDS
+
+        for _ in range(rounds):
+            for idx in order:
+                op, srcs = self.primitive(idx)
+                values[idx] = eval_op(
+                    op, [values[s] if s is not None else 0 for s in srcs], mask
+                )
+        return values
+
+    def evaluate(self, inputs):
+        """Evaluates a single input combination and returns the output bools."""
+        values = self.simulate([1 if v else 0 for v in inputs])
+        return [bool(values[i]) for i in self.outputs]
+
+
+def flatten_solution(input_count, output_count, solution):
+    """
+    Expands MacroNodes of a saved solution into primitive gates.
+
+    Returns (gate_types, gate_params, gate_fanin, output_fanin). Sources are
+    given as ("in", i), ("out", i) or ("gate", i) references, or None for
+    unconnected ports. A macro port wired to nothing reads as a constant 0
+    gate, like the pin of a compiled macro does in the interactive simulation.
+    """
+    base = input_count + output_count
+    gate_types, gate_params, gate_fanin = [], [], []
+    # One entry per kept user node: ("gate", idx) or ("macro", output refs)
+    kept = []
+    drivers = {}
+    for c in solution.get("connections", []):
+        drivers[(c["to_idx"], c["port_idx"])] = (c["from_idx"], c.get("from_port", 0))
+
+    def add_gate(node_type, params, srcs):
+        gate_types.append(node_type)
+        gate_params.append(params)
+        gate_fanin.append(srcs)
+        return ("gate", len(gate_types) - 1)
+
+    zero = []
+
+    def constant_zero():
+        if not zero:
+            zero.append(add_gate("AndNode", {}, [None, None]))
+        return zero[0]
+
+    # Unknown types are skipped when a level is loaded, shifting indices
+    for n_data in solution.get("user_nodes", []):
+        node_type = n_data["type"]
+        if node_type not in NODE_OPS:
+            continue
+        params = {k: v for k, v in n_data.items() if k not in ("type", "x", "y")}
+        saved_idx = base + len(kept)
+        if node_type != "MacroNode":
+            ports = [("port", saved_idx, p) for p in range(port_count(node_type, params))]
+            kept.append(add_gate(node_type, params, ports))
+            continue
+
+        b_types, b_params, b_fanin, b_outputs = flatten_solution(
+            params["inputs"], params["outputs"], params["body"]
+        )
+        offset = len(gate_types)
+
+        def lift(ref, depth=0):
+            # Body references rewritten into this scope
+            if ref is None or depth > len(b_outputs):
+                return None
+            kind, i = ref
+            if kind == "gate":
+                return ("gate", offset + i)
+            if kind == "in":
+                return ("port", saved_idx, i)
+            return lift(b_outputs[i], depth + 1)
+
+        for b_type, b_param, srcs in zip(b_types, b_params, b_fanin):
+            add_gate(b_type, b_param, [lift(ref) for ref in srcs])
+        kept.append(("macro", [lift(ref) for ref in b_outputs]))
+
+    def source(idx, pin, seen):
+        if idx < input_count:
+            return ("in", idx)
+        if idx < base:
+            return ("out", idx - input_count)
+        if idx - base >= len(kept):
+            return None
+        kind, refs = kept[idx - base]
+        if kind == "gate":
+            return kept[idx - base]
+        if pin >= len(refs):
+            return None
+        # Unconnected macro outputs still drive a 0
+        return resolve(refs[pin], seen) or constant_zero()
+
+    def resolve(ref, seen=()):
+        # ("port", node, p) stands for whatever drives port p of a saved node
+        if ref is None or ref[0] != "port":
+            return ref
+        if ref in seen:
+            return None
+        driver = drivers.get(ref[1:])
+        if driver is None:
+            # Only primitive gates and LEDs see unconnected ports as None
+            if ref[1] >= base and kept[ref[1] - base][0] == "macro":
+                return constant_zero()
+            return None
+        return source(*driver, seen + (ref,))
+
+    for idx in range(len(gate_fanin)):
+        gate_fanin[idx] = [resolve(ref) for ref in gate_fanin[idx]]
+    output_fanin = [
+        resolve(("port", input_count + k, 0)) for k in range(output_count)
+    ]
+    return gate_types, gate_params, gate_fanin, output_fanin
+
+
+class _BitBlaster:
+    """Lowers bus nodes into single-bit gates for Netlist.bit_level()."""
+
+    def __init__(self, netlist):
+        self.netlist = netlist
+        self.base = netlist.input_count + netlist.output_count
+        self.gate_types = []
+        self.gate_params = []
+        self.connections = []
+        # bits[idx] -> lowered node per bit (a single entry for bit nodes)
+        self.bits = {}
+        self.memo = {}
+
+    def emit(self, node_type, srcs):
+        idx = self.base + len(self.gate_types)
+        self.gate_types.append(node_type)
+        self.gate_params.append({"inputs": len(srcs)} if len(srcs) > 2 else {})
+        for port_idx, src in enumerate(srcs):
+            if src is not None:
+                self.connections.append((src, idx, port_idx))
+        return idx
+
+    def constant(self, value):
+        # Gates with nothing connected: AND reads 0, NAND reads 1
+        key = ("const", value)
+        if key not in self.memo:
+            self.memo[key] = self.emit("NandNode" if value else "AndNode", [])
+        return self.memo[key]
+
+    def truth(self, src):
+        """Single-bit view of a source: a bus reads True when any bit is set."""
+        if src is None:
+            return None
+        bits = self.bits[src]
+        if len(bits) == 1:
+            return bits[0]
+        key = ("any", src)
+        if key not in self.memo:
+            self.memo[key] = self.emit("OrNode", bits)
+        return self.memo[key]
+
+    def word(self, src, width):
+        """Bus view of a source, zero-extended or truncated to width."""
+        bits = self.bits[src] if src is not None else []
+        zero = self.constant(False) if len(bits) < width else None
+        return (bits + [zero] * width)[:width]
+
+    def full_adder(self, a, b, carry):
+        half = self.emit("XorNode", [a, b])
+        total = self.emit("XorNode", [half, carry])
+        carry = self.emit(
+            "OrNode", [self.emit("AndNode", [a, b]), self.emit("AndNode", [half, carry])]
+        )
+        return total, carry
+
+    def lower(self, idx):
+        netlist = self.netlist
+        node_type = netlist.types[idx]
+        params = netlist.params[idx]
+        srcs = netlist.fanin[idx]
+        op = NODE_OPS[node_type][0]
+        width = params.get("width", DEFAULT_BUS_WIDTH)
+
+        if op in SEQUENTIAL_OPS and not is_bus(node_type):
+            # Constant anyway, and its inputs may not be lowered yet
+            return [self.emit(node_type, [])]
+        if not is_bus(node_type):
+            lowered = [self.truth(s) for s in srcs]
+            if idx < self.base:
+                for port_idx, src in enumerate(lowered):
+                    if src is not None:
+                        self.connections.append((src, idx, port_idx))
+                return [idx]
+            return [self.emit(node_type, lowered)]
+
+        if op == "BUS_REG":
+            return [self.constant(False)] * width
+        if op == "BUS_MERGE":
+            return [
+                self.truth(s) if s is not None else self.constant(False) for s in srcs
+            ]
+        if op == "BUS_BIT":
+            return [self.word(srcs[0], params.get("bit", 0) + 1)[-1]]
+        if op == "BUS_NOT":
+            return [self.emit("NotNode", [bit]) for bit in self.word(srcs[0], width)]
+        if op in ("BUS_AND", "BUS_OR", "BUS_XOR"):
+            gate = {"BUS_AND": "AndNode", "BUS_OR": "OrNode", "BUS_XOR": "XorNode"}[op]
+            a, b = self.word(srcs[0], width), self.word(srcs[1], width)
+            return [self.emit(gate, [x, y]) for x, y in zip(a, b)]
+        if op == "BUS_ADD":
+            a, b = self.word(srcs[0], width), self.word(srcs[1], width)
+            carry = self.constant(False)
+            out = []
+            for x, y in zip(a, b):
+                total, carry = self.full_adder(x, y, carry)
+                out.append(total)
+            return out
+        if op == "BUS_MUX":
+            a, b = self.word(srcs[0], width), self.word(srcs[1], width)
+            sel = self.truth(srcs[2])
+            sel = sel if sel is not None else self.constant(False)
+            nsel = self.emit("NotNode", [sel])
+            return [
+                self.emit(
+                    "OrNode",
+                    [self.emit("AndNode", [x, nsel]), self.emit("AndNode", [y, sel])],
+                )
+                for x, y in zip(a, b)
+            ]
+        raise ValueError(f"Unknown op: {op}")
+
+    def run(self):
+        netlist = self.netlist
+        order = netlist.topological_order()
+        if order is None:
+            raise ValueError("Bus circuits with feedback loops cannot be lowered")
+        for idx in range(netlist.input_count):
+            self.bits[idx] = [idx]
+        for idx in order:
+            self.bits[idx] = self.lower(idx)
+        return Netlist(
+            netlist.input_count,
+            netlist.output_count,
+            self.gate_types,
+            self.connections,
+            self.gate_params,
+        )
@@ -0,0 +1,628 @@
+import itertools
+import json
+import os
+import re
+import sys
+
+from layout import layout_solution
+from netlist import Netlist
+from nodes import MAX_GATE_INPUTS
+
+NATIVE_FORMAT = "logic-nodes"
+
+VERILOG_GATES = {
+    "and": "AndNode",
+    "or": "OrNode",
+    "nand": "NandNode",
+    "nor": "NorNode",
+    "xor": "XorNode",
+    "xnor": "XnorNode",
+    "not": "NotNode",
+    "buf": "BUF",
+}
+
+# Inverting gate types and the gate they invert
+INVERTED = {"NandNode": "AndNode", "NorNode": "OrNode", "XnorNode": "XorNode"}
+COMPLEMENT = {
+    "BUF": "NotNode",
+    "NotNode": "BUF",
+    "AndNode": "NandNode",
+    "NandNode": "AndNode",
+    "OrNode": "NorNode",
+    "NorNode": "OrNode",
+    "XorNode": "XnorNode",
+    "XnorNode": "XorNode",
+}
+
+
+class CircuitBuilder:
+    """
+    Collects a netlist of named signals and turns it into a saved solution.
+
+    Signals may be used before they are driven, as netlist files allow, so
+    everything is resolved in one pass in build(), which also lays the
+    gates out. Gates wider than MAX_GATE_INPUTS are split into trees.
+    """
+
+    def __init__(self):
+        self.inputs = []
+        self.outputs = []
+        self.gates = []  # [node type, source names]
+        # name -> ("in", i), ("gate", i) or ("alias", name)
+        self.drivers = {}
+        self.constants = {}
+        self.inverters = {}
+
+    def _drive(self, name, driver):
+        if name in self.drivers:
+            raise ValueError(f"Signal {name} has more than one driver")
+        self.drivers[name] = driver
+
+    def _fresh(self):
+        return f"$n{len(self.drivers)}"
+
+    def add_input(self, name):
+        self._drive(name, ("in", len(self.inputs)))
+        self.inputs.append(name)
+
+    def add_output(self, name):
+        self.outputs.append(name)
+
+    def alias(self, name, src):
+        self._drive(name, ("alias", src))
+        return name
+
+    def constant(self, value):
+        # Gates with nothing connected: AND reads 0, NAND reads 1
+        if value not in self.constants:
+            self.constants[value] = self.add_gate(
+                "NandNode" if value else "AndNode", []
+            )
+        return self.constants[value]
+
+    def inverted(self, src):
+        if src not in self.inverters:
+            self.inverters[src] = self.add_gate("NotNode", [src])
+        return self.inverters[src]
+
+    def add_gate(self, node_type, srcs, out=None):
+        """Drives out (or a fresh name) with a gate; returns the signal name."""
+        srcs = list(srcs)
+        if node_type == "BUF" or (len(srcs) == 1 and node_type != "NotNode"):
+            if node_type in INVERTED:
+                node_type = "NotNode"
+            else:
+                return self.alias(out, srcs[0]) if out is not None else srcs[0]
+        while len(srcs) > MAX_GATE_INPUTS:
+            base = INVERTED.get(node_type, node_type)
+            srcs = [
+                self.add_gate(base, srcs[i : i + MAX_GATE_INPUTS])
+                for i in range(0, len(srcs), MAX_GATE_INPUTS)
+            ]
+        name = out if out is not None else self._fresh()
+        self._drive(name, ("gate", len(self.gates)))
+        self.gates.append([node_type, srcs])
+        return name
+
+    def add_cover(self, srcs, out, rows):
+        """
+        Drives out with a single-output cover, as in BLIF .names: rows of
+        (pattern, bit) with one '0'/'1'/'-' per source. Common gate covers
+        map to one gate, anything else to a sum of products.
+        """
+        if not rows:
+            return self.alias(out, self.constant(False))
+        on_set = rows[0][1] == "1"
+        if not srcs:
+            return self.alias(out, self.constant(on_set))
+        node_type, args = self._match_cover(srcs, [p for p, _ in rows])
+        if not on_set:
+            node_type = COMPLEMENT[node_type]
+        return self.add_gate(node_type, args, out)
+
+    def _match_cover(self, srcs, patterns):
+        n = len(srcs)
+        if len(patterns) == 1 and set(patterns[0]) <= {"0", "1"}:
+            if patterns[0] == "1" * n:
+                return "AndNode", srcs
+            if patterns[0] == "0" * n:
+                return ("NotNode" if n == 1 else "NorNode"), srcs
+        singles = [p for p in patterns if p.count("-") == n - 1]
+        if n > 1 and len(singles) == len(patterns) == n:
+            positions = {p.index("1") if "1" in p else p.index("0") for p in singles}
+            if len(positions) == n and len({c for p in singles for c in p} - {"-"}) == 1:
+                return ("OrNode" if "1" in singles[0] else "NandNode"), srcs
+        if (
+            n > 1
+            and len(patterns) == 1 << (n - 1)
+            and len(set(patterns)) == len(patterns)
+            and all(set(p) <= {"0", "1"} for p in patterns)
+        ):
+            parities = {p.count("1") % 2 for p in patterns}
+            if len(parities) == 1:
+                return ("XorNode" if parities.pop() else "XnorNode"), srcs
+
+        terms = []
+        for pattern in patterns:
+            literals = [
+                src if c == "1" else self.inverted(src)
+                for c, src in zip(pattern, srcs)
+                if c != "-"
+            ]
+            if not literals:
+                return "BUF", [self.constant(True)]
+            terms.append(self.add_gate("AndNode", literals))
+        return "OrNode", terms
+
+    def _resolve(self, name):
+        for _ in range(len(self.drivers) + 1):
+            driver = self.drivers.get(name)
+            if driver is None or driver[0] != "alias":
+                return driver
+            name = driver[1]
+        return None  # alias loop
+
+    def build(self):
+        """Returns (solution, input_names, output_names)."""
+        input_count = len(self.inputs)
+        base = input_count + len(self.outputs)
+        refs = {}
+
+        def index(name):
+            if name not in refs:
+                driver = self._resolve(name)
+                if driver is None:
+                    refs[name] = None
+                elif driver[0] == "in":
+                    refs[name] = driver[1]
+                else:
+                    refs[name] = base + driver[1]
+            return refs[name]
+
+        connections = []
+        for i, (_, srcs) in enumerate(self.gates):
+            for port_idx, src in enumerate(srcs):
+                from_idx = index(src)
+                if from_idx is not None:
+                    connections.append(
+                        {"from_idx": from_idx, "to_idx": base + i, "port_idx": port_idx}
+                    )
+        for k, name in enumerate(self.outputs):
+            from_idx = index(name)
+            if from_idx is not None:
+                connections.append(
+                    {"from_idx": from_idx, "to_idx": input_count + k, "port_idx": 0}
+                )
+
+        user_nodes = []
+        for node_type, srcs in self.gates:
+            n_data = {"type": node_type, "x": 0, "y": 0}
+            if len(srcs) > 2:
+                n_data["inputs"] = len(srcs)
+            user_nodes.append(n_data)
+        solution = {"user_nodes": user_nodes, "connections": connections}
+        layout_solution(input_count, len(self.outputs), solution)
+        return solution, list(self.inputs), list(self.outputs)
+
+
+# --- Structural Verilog ---
+
+_VERILOG_TOKEN = re.compile(
+    r"\s*(\\\S+|\d+'[bBdDhH][0-9a-fA-F_xXzZ]+|[A-Za-z_][\w$]*(?:\s*\[\s*\d+\s*\])?"
+    r"|\d+|[~!&|^()])"
+)
+
+
+def _verilog_tokens(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _VERILOG_TOKEN.match(text, pos)
+        if not m:
+            raise ValueError(f"Unsupported Verilog expression: {text}")
+        tokens.append(m.group(1))
+        pos = m.end()
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+    return tokens
+
+
+def _verilog_signal(builder, token):
+    token = token.strip()
+    if token.isdigit():
+        return builder.constant(int(token) != 0)
+    if "'" in token:
+        digits = token.split("'")[-1][1:].replace("_", "")
+        return builder.constant(digits.strip("0") not in ("", "x", "z"))
+    if token.startswith("\\"):
+        return token[1:]
+    return re.sub(r"\s+", "", token)
+
+
+class _ExpressionParser:
+    """Builds gates for an assign expression of ~ & ^ | and parentheses."""
+
+    def __init__(self, builder, tokens):
+        self.builder = builder
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        self.pos += 1
+        return self.tokens[self.pos - 1]
+
+    def parse(self):
+        result = self.binary(0)
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected token in assign: {self.peek()}")
+        return result
+
+    def binary(self, level):
+        ops = (("|", "OrNode"), ("^", "XorNode"), ("&", "AndNode"))
+        if level == len(ops):
+            return self.unary()
+        op, node_type = ops[level]
+        terms = [self.binary(level + 1)]
+        while self.peek() == op:
+            self.take()
+            terms.append(self.binary(level + 1))
+        return self.builder.add_gate(node_type, terms) if len(terms) > 1 else terms[0]
+
+    def unary(self):
+        token = self.take() if self.peek() is not None else None
+        if token in ("~", "!"):
+            return self.builder.inverted(self.unary())
+        if token == "(":
+            result = self.binary(0)
+            if self.take() != ")":
+                raise ValueError("Missing ) in assign")
+            return result
+        if token in (None, "&", "|", "^", ")"):
+            raise ValueError(f"Unexpected token in assign: {token}")
+        return _verilog_signal(self.builder, token)
+
+
+def _verilog_statements(lines):
+    """Yields the ;-terminated statements of a Verilog stream without comments."""
+    buffer = []
+    in_comment = False
+    for line in lines:
+        if line.lstrip().startswith("`"):
+            continue  # compiler directives
+        text = ""
+        while line:
+            if in_comment:
+                end = line.find("*/")
+                if end < 0:
+                    line = ""
+                    continue
+                line = line[end + 2 :]
+                in_comment = False
+            start = line.find("/*")
+            cut = line.find("//")
+            if cut >= 0 and (start < 0 or cut < start):
+                text += line[:cut]
+                line = ""
+            elif start >= 0:
+                text += line[:start] + " "
+                line = line[start + 2 :]
+                in_comment = True
+            else:
+                text += line
+                line = ""
+        parts = text.split(";")
+        buffer.append(parts[0])
+        for part in parts[1:]:
+            statement = " ".join(buffer).strip()
+            if statement.startswith("endmodule"):
+                yield "endmodule"
+                statement = statement[len("endmodule") :].strip()
+            yield statement
+            buffer = [part]
+    statement = " ".join(buffer).strip()
+    if statement:
+        yield statement
+
+
+def _split_names(text):
+    return [n.strip() for n in text.split(",") if n.strip()]
+
+
+def _declared_names(text):
+    """Names of a declaration body like '[3:0] a, b' (vectors MSB first)."""
+    m = re.match(r"(?:wire\s+|reg\s+)?(?:\[\s*(\d+)\s*:\s*(\d+)\s*\])?(.*)", text, re.S)
+    msb, lsb, rest = m.groups()
+    names = []
+    for name in _split_names(rest):
+        name = name[1:] if name.startswith("\\") else name
+        if msb is None:
+            names.append(name)
+        else:
+            step = -1 if int(msb) >= int(lsb) else 1
+            for bit in range(int(msb), int(lsb) + step, step):
+                names.append(f"{name}[{bit}]")
+    return names
+
+
+def read_verilog(lines):
+    """
+    Reads the first module of a structural Verilog stream: scalar or vector
+    input/output/wire declarations, gate primitives (and, or, nand, nor, xor,
+    xnor, not, buf) and continuous assigns of bitwise expressions.
+    Returns (solution, input_names, output_names).
+    """
+    builder = CircuitBuilder()
+
+    def declare(kind, body):
+        for name in _declared_names(body):
+            if kind == "input":
+                builder.add_input(name)
+            elif kind == "output":
+                builder.add_output(name)
+
+    for statement in _verilog_statements(lines):
+        if not statement:
+            continue
+        keyword = re.match(r"[\w$]*", statement).group(0)
+        rest = statement[len(keyword) :].strip()
+        if keyword == "endmodule":
+            break
+        if keyword == "module":
+            ports = rest[rest.find("(") + 1 : rest.rfind(")")] if "(" in rest else ""
+            # ANSI headers declare directions in the port list
+            kind, vector = None, ""
+            for item in _split_names(ports):
+                m = re.match(r"(input|output)\b\s*(?:wire\s+)?(\[[^\]]*\])?", item)
+                if m:
+                    kind, vector = m.group(1), m.group(2) or ""
+                    item = item[m.end() :]
+                if kind:
+                    declare(kind, f"{vector} {item}")
+        elif keyword in ("input", "output"):
+            declare(keyword, rest)
+        elif keyword == "wire":
+            continue
+        elif keyword == "assign":
+            for target, expr in (a.split("=", 1) for a in _split_names(rest)):
+                parser = _ExpressionParser(builder, _verilog_tokens(expr))
+                builder.alias(_verilog_signal(builder, target), parser.parse())
+        elif keyword in VERILOG_GATES:
+            node_type = VERILOG_GATES[keyword]
+            rest = re.sub(r"^#\s*(\(\s*[^)]*\)|\d+)", "", rest).strip()
+            for _, terminals in re.findall(r"(\\\S+|[\w$]*)\s*\(([^()]*)\)", rest):
+                signals = [_verilog_signal(builder, t) for t in _split_names(terminals)]
+                if node_type in ("BUF", "NotNode"):
+                    # buf and not may drive several outputs from one input
+                    for out in signals[:-1]:
+                        builder.add_gate(node_type, signals[-1:], out)
+                else:
+                    builder.add_gate(node_type, signals[1:], signals[0])
+        else:
+            raise ValueError(f"Unsupported Verilog statement: {statement[:40]}")
+    return builder.build()
+
+
+def _verilog_name(name):
+    if re.fullmatch(r"[A-Za-z_][\w$]*", name):
+        return name
+    return f"\\{name} "
+
+
+def _signal_names(netlist, input_names, output_names):
+    """Unique net names: given (or default) names for the fixed nodes, nN for gates."""
+    input_names = input_names or [f"in{i}" for i in range(netlist.input_count)]
+    output_names = output_names or [f"out{k}" for k in range(netlist.output_count)]
+    names = []
+    taken = set()
+    for name in list(input_names) + list(output_names):
+        unique, k = name, 1
+        while unique in taken:
+            unique, k = f"{name}_{k}", k + 1
+        names.append(unique)
+        taken.add(unique)
+    for idx in range(len(names), len(netlist)):
+        name = f"n{idx}"
+        while name in taken:
+            name = "_" + name
+        names.append(name)
+    return names
+
+
+def _write_list(f, keyword, names, per_line=8):
+    for i in range(0, len(names), per_line):
+        f.write(f"  {keyword} {', '.join(names[i : i + per_line])};\n")
+
+
+def write_verilog(f, solution, input_names, output_names, name="circuit"):
+    """Writes a circuit as a structural Verilog module of gate primitives."""
+    netlist = Netlist.from_solution(
+        len(input_names), len(output_names), solution
+    ).bit_level()
+    names = [_verilog_name(n) for n in _signal_names(netlist, input_names, output_names)]
+    base = netlist.input_count + netlist.output_count
+
+    def src(s):
+        return names[s] if s is not None else "1'b0"
+
+    f.write("// Logic Nodes netlist\n")
+    f.write(f"module {_verilog_name(name)} ({', '.join(names[:base])});\n")
+    _write_list(f, "input", names[: netlist.input_count])
+    _write_list(f, "output", names[netlist.input_count : base])
+    _write_list(f, "wire", names[base:])
+    for idx in range(base, len(netlist)):
+        op, srcs = netlist.primitive(idx)
+        if op == "CONST0":
+            f.write(f"  assign {names[idx]} = 1'b0;\n")
+        else:
+            terminals = ", ".join([names[idx]] + [src(s) for s in srcs])
+            f.write(f"  {op.lower()} ({terminals});\n")
+    for idx in netlist.outputs:
+        f.write(f"  assign {names[idx]} = {src(netlist.fanin[idx][0])};\n")
+    f.write("endmodule\n")
+
+
+# --- BLIF ---
+
+
+def _blif_lines(lines):
+    """Yields logical BLIF lines: comments dropped, continuations joined."""
+    pending = ""
+    for line in lines:
+        line = line.split("#", 1)[0].rstrip()
+        if line.endswith("\\"):
+            pending += line[:-1] + " "
+            continue
+        line = (pending + line).strip()
+        pending = ""
+        if line:
+            yield line
+    if pending.strip():
+        yield pending.strip()
+
+
+def read_blif(lines):
+    """
+    Reads the first model of a combinational BLIF stream (.inputs, .outputs,
+    .names). Returns (solution, input_names, output_names).
+    """
+    builder = CircuitBuilder()
+    cover = None  # (signals, rows) of the current .names
+
+    def flush():
+        if cover is not None:
+            signals, rows = cover
+            builder.add_cover(signals[:-1], signals[-1], rows)
+
+    for line in _blif_lines(lines):
+        if not line.startswith("."):
+            if cover is None:
+                raise ValueError(f"Cover row outside .names: {line}")
+            parts = line.split()
+            cover[1].append((parts[0], parts[1]) if len(parts) > 1 else ("", parts[0]))
+            continue
+        flush()
+        cover = None
+        command, *args = line.split()
+        if command == ".names":
+            cover = (args, [])
+        elif command == ".inputs":
+            for name in args:
+                builder.add_input(name)
+        elif command == ".outputs":
+            for name in args:
+                builder.add_output(name)
+        elif command == ".end":
+            break
+        elif command != ".model":
+            raise ValueError(f"Unsupported BLIF command: {command}")
+    flush()
+    return builder.build()
+
+
+def _cover_rows(op, n):
+    if op in ("AND", "NAND"):
+        return ["1" * n + (" 1" if op == "AND" else " 0")]
+    if op in ("OR", "NOR"):
+        bit = " 1" if op == "OR" else " 0"
+        return ["-" * i + "1" + "-" * (n - 1 - i) + bit for i in range(n)]
+    if op == "NOT":
+        return ["0 1"]
+    if op in ("XOR", "XNOR"):
+        parity = 1 if op == "XOR" else 0
+        return [
+            "".join(bits) + " 1"
+            for bits in itertools.product("01", repeat=n)
+            if bits.count("1") % 2 == parity
+        ]
+    return []  # CONST0
+
+
+def write_blif(f, solution, input_names, output_names, name="circuit"):
+    """Writes a circuit as a BLIF model with one .names cover per gate."""
+    netlist = Netlist.from_solution(
+        len(input_names), len(output_names), solution
+    ).bit_level()
+    names = _signal_names(netlist, input_names, output_names)
+    base = netlist.input_count + netlist.output_count
+    zero = "$false"
+    while zero in names:
+        zero = "_" + zero
+    gates = [netlist.primitive(idx) for idx in range(base, len(netlist))]
+    drivers = [srcs for _, srcs in gates] + [netlist.fanin[i] for i in netlist.outputs]
+
+    def src(s):
+        return names[s] if s is not None else zero
+
+    f.write(f".model {name}\n")
+    f.write(f".inputs {' '.join(names[: netlist.input_count])}\n")
+    f.write(f".outputs {' '.join(names[netlist.input_count : base])}\n")
+    if any(s is None for srcs in drivers for s in srcs):
+        f.write(f".names {zero}\n")
+    for idx, (op, srcs) in enumerate(gates, base):
+        f.write(f".names {' '.join([src(s) for s in srcs] + [names[idx]])}\n")
+        for row in _cover_rows(op, len(srcs)):
+            f.write(row + "\n")
+    for idx in netlist.outputs:
+        f.write(f".names {src(netlist.fanin[idx][0])} {names[idx]}\n1 1\n")
+    f.write(".end\n")
+
+
+# --- Native format ---
+
+
+def read_native(f):
+    """
+    Reads the native format: a saved solution plus input and output names.
+    Unlike Verilog and BLIF it keeps positions, macros, buses and state elements.
+    """
+    data = json.load(f)
+    if data.get("format") != NATIVE_FORMAT:
+        raise ValueError("Not a Logic Nodes netlist")
+    solution = {
+        "user_nodes": data.get("user_nodes", []),
+        "connections": data.get("connections", []),
+    }
+    return solution, data["inputs"], data["outputs"]
+
+
+def write_native(f, solution, input_names, output_names, name="circuit"):
+    json.dump(
+        {
+            "format": NATIVE_FORMAT,
+            "name": name,
+            "inputs": list(input_names),
+            "outputs": list(output_names),
+            "user_nodes": solution.get("user_nodes", []),
+            "connections": solution.get("connections", []),
+        },
+        f,
+        separators=(",", ":"),
+    )
+
+
+READERS = {".v": read_verilog, ".blif": read_blif}
+WRITERS = {".v": write_verilog, ".blif": write_blif}
+
+
+def load_circuit(path):
+    """Reads a .v, .blif or native file. Returns (solution, input_names, output_names)."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r") as f:
+        return READERS.get(ext, read_native)(f)
+
+
+def save_circuit(path, solution, input_names, output_names):
+    ext = os.path.splitext(path)[1].lower()
+    name = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+    with open(path, "w") as f:
+        WRITERS.get(ext, write_native)(f, solution, input_names, output_names, name)
+
+
+if __name__ == "__main__":
+    # Converts between formats: python netlist_io.py adder.blif adder.v
+    src_path, dst_path = sys.argv[1:3]
+    save_circuit(dst_path, *load_circuit(src_path))
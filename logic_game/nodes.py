@@ -1,59 +1,104 @@
 import pygame
-import os
+
+from atlas import gate_sprite, register_graphic
+from fonts import get_font
 
 NODE_COLOR = (100, 100, 100)
+BUS_COLOR = (60, 110, 90)
 TEXT_COLOR = (255, 255, 255)
 
-_FONT = None
-_IMAGES = {}
+# Vertical space reserved per input port when a node grows extra inputs
+PORT_SPACING = 25
+MAX_GATE_INPUTS = 8
+DEFAULT_BUS_WIDTH = 4
+MAX_BUS_WIDTH = 32
 
+# Propagation delay of a gate, in event simulator ticks
+GATE_DELAY = 1
+# Ticks per cycle of a clock with period 1
+CLOCK_TICKS = 100
+MAX_CLOCK_PERIOD = 16
 
-def get_font():
-    global _FONT
-    if _FONT is None:
-        if not pygame.font.get_init():
-            pygame.font.init()
-        _FONT = pygame.font.SysFont("Arial", 24)
-    return _FONT
+class Port:
+    """An input port: where it is drawn and the output pin wired into it."""
 
+    __slots__ = ("rect", "connected_node")
 
-def load_image(filename):
-    if filename not in _IMAGES:
-        path = os.path.join(os.path.dirname(__file__), "assets", filename)
-        try:
-            image = pygame.image.load(path)
-            _IMAGES[filename] = image
-        except Exception as e:
-            print(f"Error loading image {filename}: {e}")
-            _IMAGES[filename] = None
-    return _IMAGES[filename]
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, 20, 20)
+        self.connected_node = None
 
 
 class Node:
-    def __init__(self, x, y, w=150, h=80, title="Node", image_file=None, symbol=None):
+    # Nodes are numerous in big circuits, so they carry no __dict__; every
+    # subclass lists its own extra fields in __slots__
+    __slots__ = (
+        "rect",
+        "base_height",
+        "title",
+        "input_ports",
+        "value",
+        "selected",
+        "dragging",
+        "output_rect",
+    )
+    delay = GATE_DELAY
+    # Presentation is the same for every node of a class
+    color = NODE_COLOR
+    image_file = None
+    symbol = None
+
+    def __init__(self, x, y, w=150, h=80, title="Node"):
         self.rect = pygame.Rect(x, y, w, h)
+        self.base_height = h
         self.title = title
-        self.color = NODE_COLOR
-        # List of dicts: {'rect': pygame.Rect, 'connected_node': None}
         self.input_ports = []
         self.value = 0
         self.selected = False
         self.dragging = False
-        self.image_file = image_file
-        self.symbol = symbol
 
         # Output Port (only one usually)
         self.output_rect = pygame.Rect(0, 0, 20, 20)
         self._update_ports()
 
     def setup_inputs(self, count):
-        self.input_ports = []
-        for _ in range(count):
-            self.input_ports.append(
-                {"rect": pygame.Rect(0, 0, 20, 20), "connected_node": None}
-            )
+        self.input_ports = [Port() for _ in range(count)]
+        # Grow taller so many ports stay clickable
+        self.rect.height = max(self.base_height, PORT_SPACING * (count + 1))
         self._update_ports()
 
+    def set_input_count(self, count):
+        """Changes the number of input ports, keeping existing connections."""
+        old_ports = self.input_ports
+        self.setup_inputs(count)
+        for port, old_port in zip(self.input_ports, old_ports):
+            port.connected_node = old_port.connected_node
+
+    def adjust(self, delta):
+        """Grows or shrinks a resizable node (+/- keys). No-op by default."""
+        pass
+
+    def params(self):
+        """Extra constructor arguments persisted in saved solutions."""
+        return {}
+
+    def output_pins(self):
+        """Sources other nodes can connect to; multi-output nodes return several."""
+        return [self]
+
+    def output_at(self, pos):
+        for pin in self.output_pins():
+            if pin.output_rect.collidepoint(pos):
+                return pin
+        return None
+
+    def input_values(self):
+        # Unconnected inputs read as False
+        return [
+            port.connected_node.value if port.connected_node else False
+            for port in self.input_ports
+        ]
+
     def _update_ports(self):
         # Output on right
         self.output_rect.center = (self.rect.right, self.rect.centery)
@@ -66,7 +111,7 @@ class Node:
             step = self.rect.height / (len(self.input_ports) + 1)
             for i, port in enumerate(self.input_ports):
                 cy = self.rect.top + step * (i + 1)
-                port["rect"].center = (self.rect.left, cy)
+                port.rect.center = (self.rect.left, cy)
 
     def update(self):
         self._update_ports()
@@ -75,27 +120,18 @@ class Node:
         pass
 
     def render(self, screen):
-        # Draw Image if available
-        image = load_image(self.image_file) if self.image_file else None
+        # Draw the gate graphic (symbol included) from the asset atlas
+        image = (
+            gate_sprite(self.image_file, self.symbol, self.rect.size)
+            if self.image_file
+            else None
+        )
 
         if image:
-            # Scale image to rect
-            scaled_image = pygame.transform.scale(
-                image, (self.rect.width, self.rect.height)
-            )
-            screen.blit(scaled_image, self.rect.topleft)
+            screen.blit(image, self.rect.topleft)
             # Draw selection border
             if self.selected:
                 pygame.draw.rect(screen, (200, 200, 255), self.rect, 3, border_radius=8)
-
-            # Manually render symbol
-            if self.symbol:
-                # Use a larger font for the symbol
-                symbol_font = pygame.font.SysFont("Arial", 32)
-                symbol_surf = symbol_font.render(self.symbol, True, (0, 0, 0))
-                # Center the symbol
-                symbol_rect = symbol_surf.get_rect(center=self.rect.center)
-                screen.blit(symbol_surf, symbol_rect)
         else:
             # Fallback to rect
             color = (150, 150, 180) if self.selected else self.color
@@ -113,14 +149,16 @@ class Node:
 
         # Render Input Ports (Blue)
         for port in self.input_ports:
-            pygame.draw.circle(screen, (0, 200, 255), port["rect"].center, 8)
+            pygame.draw.circle(screen, (0, 200, 255), port.rect.center, 8)
 
 
 class InputNode(Node):
+    __slots__ = ()
+    color = (50, 100, 150)
+
     def __init__(self, x, y, value=False):
         super().__init__(x, y, title="Input")
         self.value = value
-        self.color = (50, 100, 150)
 
     def update(self):
         super().update()
@@ -145,184 +183,137 @@ class InputNode(Node):
         pygame.draw.circle(screen, port_color, self.output_rect.center, 8)
 
 
-class AndNode(Node):
-    def __init__(self, x, y):
-        super().__init__(
-            x, y, title="AND", image_file="IEC_2in_1out_neg0.svg", symbol="&"
-        )
-        self.color = (150, 100, 50)
-        self.setup_inputs(2)
+class GateNode(Node):
+    """Logic gate with a variable number of inputs (2 by default)."""
 
-    def update(self):
-        super().update()
+    __slots__ = ()
+    color = (150, 100, 50)
 
-    def process_logic(self):
-        if not self.input_ports:
-            self.value = False
-            return
+    def __init__(self, x, y, inputs=2, **kwargs):
+        super().__init__(x, y, **kwargs)
+        self.setup_inputs(inputs)
 
-        input_node_1 = self.input_ports[0]["connected_node"]
-        input_node_2 = self.input_ports[1]["connected_node"]
+    def adjust(self, delta):
+        count = len(self.input_ports) + delta
+        if 2 <= count <= MAX_GATE_INPUTS:
+            self.set_input_count(count)
 
-        val1 = input_node_1.value if input_node_1 else False
-        val2 = input_node_2.value if input_node_2 else False
+    def params(self):
+        if len(self.input_ports) != 2:
+            return {"inputs": len(self.input_ports)}
+        return {}
 
-        self.value = val1 and val2
+
+class AndNode(GateNode):
+    __slots__ = ()
+    image_file = "IEC_2in_1out_neg0.svg"
+    symbol = "&"
+
+    def __init__(self, x, y, inputs=2):
+        super().__init__(x, y, inputs, title="AND")
+
+    def process_logic(self):
+        self.value = all(self.input_values())
 
 
 class NotNode(Node):
+    __slots__ = ()
+    color = (150, 100, 50)
+    image_file = "IEC_1in_1out_neg1.svg"
+    symbol = "1"
+
     def __init__(self, x, y):
-        super().__init__(
-            x, y, title="NOT", image_file="IEC_1in_1out_neg1.svg", symbol="1"
-        )
-        self.color = (150, 100, 50)
+        super().__init__(x, y, title="NOT")
         self.setup_inputs(1)
 
     def update(self):
         super().update()
 
     def process_logic(self):
-        input = self.input_ports[0]["connected_node"]
+        input = self.input_ports[0].connected_node
         self.value = not input.value if input else False
 
 
-class OrNode(Node):
-    def __init__(self, x, y):
-        super().__init__(
-            x, y, title="OR", image_file="IEC_2in_1out_neg0.svg", symbol="≥1"
-        )
-        self.color = (150, 100, 50)
-        self.setup_inputs(2)
+class OrNode(GateNode):
+    __slots__ = ()
+    image_file = "IEC_2in_1out_neg0.svg"
+    symbol = "≥1"
 
-    def update(self):
-        super().update()
+    def __init__(self, x, y, inputs=2):
+        super().__init__(x, y, inputs, title="OR")
 
     def process_logic(self):
-        if not self.input_ports:
-            self.value = False
-            return
-
-        input_node_1 = self.input_ports[0]["connected_node"]
-        input_node_2 = self.input_ports[1]["connected_node"]
-
-        val1 = input_node_1.value if input_node_1 else False
-        val2 = input_node_2.value if input_node_2 else False
-
-        self.value = val1 or val2
+        self.value = any(self.input_values())
 
 
-class NandNode(Node):
-    def __init__(self, x, y):
-        super().__init__(
-            x, y, title="NAND", image_file="IEC_2in_1out_neg1.svg", symbol="&"
-        )
-        self.color = (150, 100, 50)
-        self.setup_inputs(2)
+class NandNode(GateNode):
+    __slots__ = ()
+    image_file = "IEC_2in_1out_neg1.svg"
+    symbol = "&"
 
-    def update(self):
-        super().update()
+    def __init__(self, x, y, inputs=2):
+        super().__init__(x, y, inputs, title="NAND")
 
     def process_logic(self):
-        if not self.input_ports:
-            self.value = False
-            return
-
-        input_node_1 = self.input_ports[0]["connected_node"]
-        input_node_2 = self.input_ports[1]["connected_node"]
-
-        val1 = input_node_1.value if input_node_1 else False
-        val2 = input_node_2.value if input_node_2 else False
+        self.value = not all(self.input_values())
 
-        self.value = not (val1 and val2)
 
+class NorNode(GateNode):
+    __slots__ = ()
+    image_file = "IEC_2in_1out_neg1.svg"
+    symbol = "≥1"
 
-class NorNode(Node):
-    def __init__(self, x, y):
-        super().__init__(
-            x, y, title="NOR", image_file="IEC_2in_1out_neg1.svg", symbol="≥1"
-        )
-        self.color = (150, 100, 50)
-        self.setup_inputs(2)
-
-    def update(self):
-        super().update()
+    def __init__(self, x, y, inputs=2):
+        super().__init__(x, y, inputs, title="NOR")
 
     def process_logic(self):
-        if not self.input_ports:
-            self.value = False
-            return
-
-        input_node_1 = self.input_ports[0]["connected_node"]
-        input_node_2 = self.input_ports[1]["connected_node"]
+        self.value = not any(self.input_values())
 
-        val1 = input_node_1.value if input_node_1 else False
-        val2 = input_node_2.value if input_node_2 else False
 
-        self.value = not (val1 or val2)
+class XorNode(GateNode):
+    __slots__ = ()
+    image_file = "IEC_2in_1out_neg0.svg"
+    symbol = "=1"
 
-
-class XorNode(Node):
-    def __init__(self, x, y):
-        super().__init__(
-            x, y, title="XOR", image_file="IEC_2in_1out_neg0.svg", symbol="=1"
-        )
-        self.color = (150, 100, 50)
-        self.setup_inputs(2)
-
-    def update(self):
-        super().update()
+    def __init__(self, x, y, inputs=2):
+        super().__init__(x, y, inputs, title="XOR")
 
     def process_logic(self):
-        if not self.input_ports:
-            self.value = False
-            return
+        # Odd parity, which is A != B for two inputs
+        self.value = sum(map(bool, self.input_values())) % 2 == 1
 
-        input_node_1 = self.input_ports[0]["connected_node"]
-        input_node_2 = self.input_ports[1]["connected_node"]
 
-        val1 = input_node_1.value if input_node_1 else False
-        val2 = input_node_2.value if input_node_2 else False
+class XnorNode(GateNode):
+    __slots__ = ()
+    image_file = "IEC_2in_1out_neg1.svg"
+    symbol = "=1"
 
-        self.value = val1 != val2
-
-
-class XnorNode(Node):
-    def __init__(self, x, y):
-        super().__init__(
-            x, y, title="XNOR", image_file="IEC_2in_1out_neg1.svg", symbol="=1"
-        )
-        self.color = (150, 100, 50)
-        self.setup_inputs(2)
-
-    def update(self):
-        super().update()
+    def __init__(self, x, y, inputs=2):
+        super().__init__(x, y, inputs, title="XNOR")
 
     def process_logic(self):
-        if not self.input_ports:
-            self.value = False
-            return
-
-        input_node_1 = self.input_ports[0]["connected_node"]
-        input_node_2 = self.input_ports[1]["connected_node"]
+        self.value = sum(map(bool, self.input_values())) % 2 == 0
 
-        val1 = input_node_1.value if input_node_1 else False
-        val2 = input_node_2.value if input_node_2 else False
 
-        self.value = val1 == val2
+# Gate graphics baked into the asset atlas, at each type's default size
+for _gate in (AndNode, OrNode, NandNode, NorNode, XorNode, XnorNode, NotNode):
+    register_graphic(_gate.image_file, _gate.symbol, _gate(0, 0).rect.size)
 
 
 class OutputNode(Node):
+    __slots__ = ()
+    color = (50, 50, 50)
+
     def __init__(self, x, y):
         super().__init__(x, y, title="LED")
-        self.color = (50, 50, 50)
         self.setup_inputs(1)
 
     def update(self):
         super().update()
 
     def process_logic(self):
-        if self.input_ports and self.input_ports[0]["connected_node"]:
-            self.value = self.input_ports[0]["connected_node"].value
+        if self.input_ports and self.input_ports[0].connected_node:
+            self.value = self.input_ports[0].connected_node.value
         else:
             self.value = False
 
@@ -348,4 +339,249 @@ class OutputNode(Node):
 
         # Render Input Ports (Blue)
         for port in self.input_ports:
-            pygame.draw.circle(screen, (0, 200, 255), port["rect"].center, 8)
+            pygame.draw.circle(screen, (0, 200, 255), port.rect.center, 8)
+
+
+# --- Bus Nodes ---
+# Bus nodes carry an integer word of `width` bits instead of a single bool.
+# A single-bit source feeding a bus port reads as 0 or 1, and a bus feeding a
+# single-bit port reads as True when any bit is set.
+
+
+class BusNode(Node):
+    __slots__ = ("width",)
+    color = BUS_COLOR
+
+    def __init__(self, x, y, width=DEFAULT_BUS_WIDTH, title="BUS", inputs=2):
+        super().__init__(x, y, title=title)
+        self.width = width
+        self.value = 0
+        self.setup_inputs(inputs)
+
+    @property
+    def mask(self):
+        return (1 << self.width) - 1
+
+    def adjust(self, delta):
+        width = self.width + delta
+        if 1 <= width <= MAX_BUS_WIDTH:
+            self.width = width
+            self.value &= self.mask
+
+    def params(self):
+        return {"width": self.width}
+
+    def input_words(self):
+        return [int(v) & self.mask for v in self.input_values()]
+
+    def render(self, screen):
+        super().render(screen)
+        # Thicker output port marks a bus
+        pygame.draw.circle(screen, (255, 200, 0), self.output_rect.center, 8, 3)
+
+
+class BusMergeNode(BusNode):
+    """Packs `width` single-bit inputs into a word, input 0 is bit 0."""
+
+    __slots__ = ()
+
+    def __init__(self, x, y, width=DEFAULT_BUS_WIDTH):
+        super().__init__(x, y, width, title="MERGE", inputs=width)
+
+    def adjust(self, delta):
+        super().adjust(delta)
+        if self.width != len(self.input_ports):
+            self.set_input_count(self.width)
+
+    def process_logic(self):
+        word = 0
+        for i, v in enumerate(self.input_values()):
+            if v:
+                word |= 1 << i
+        self.value = word
+
+
+class BusSplitNode(Node):
+    """Selects a single bit of a bus word."""
+
+    __slots__ = ("bit",)
+    color = BUS_COLOR
+
+    def __init__(self, x, y, bit=0):
+        super().__init__(x, y, title=f"BIT {bit}")
+        self.bit = bit
+        self.setup_inputs(1)
+
+    def adjust(self, delta):
+        bit = self.bit + delta
+        if 0 <= bit < MAX_BUS_WIDTH:
+            self.bit = bit
+            self.title = f"BIT {bit}"
+
+    def params(self):
+        return {"bit": self.bit}
+
+    def process_logic(self):
+        self.value = bool(int(self.input_values()[0]) >> self.bit & 1)
+
+
+class BusAndNode(BusNode):
+    __slots__ = ()
+
+    def __init__(self, x, y, width=DEFAULT_BUS_WIDTH):
+        super().__init__(x, y, width, title="AND[]")
+
+    def process_logic(self):
+        a, b = self.input_words()
+        self.value = a & b
+
+
+class BusOrNode(BusNode):
+    __slots__ = ()
+
+    def __init__(self, x, y, width=DEFAULT_BUS_WIDTH):
+        super().__init__(x, y, width, title="OR[]")
+
+    def process_logic(self):
+        a, b = self.input_words()
+        self.value = a | b
+
+
+class BusXorNode(BusNode):
+    __slots__ = ()
+
+    def __init__(self, x, y, width=DEFAULT_BUS_WIDTH):
+        super().__init__(x, y, width, title="XOR[]")
+
+    def process_logic(self):
+        a, b = self.input_words()
+        self.value = a ^ b
+
+
+class BusNotNode(BusNode):
+    __slots__ = ()
+
+    def __init__(self, x, y, width=DEFAULT_BUS_WIDTH):
+        super().__init__(x, y, width, title="NOT[]", inputs=1)
+
+    def process_logic(self):
+        self.value = ~self.input_words()[0] & self.mask
+
+
+class BusAddNode(BusNode):
+    """Adds two words modulo 2**width."""
+
+    __slots__ = ()
+
+    def __init__(self, x, y, width=DEFAULT_BUS_WIDTH):
+        super().__init__(x, y, width, title="ADD[]")
+
+    @property
+    def delay(self):
+        # The carry ripples through every bit
+        return GATE_DELAY * self.width
+
+    def process_logic(self):
+        a, b = self.input_words()
+        self.value = (a + b) & self.mask
+
+
+class BusMuxNode(BusNode):
+    """Inputs A, B, Select: outputs A when Select is off, B when it is on."""
+
+    __slots__ = ()
+
+    def __init__(self, x, y, width=DEFAULT_BUS_WIDTH):
+        super().__init__(x, y, width, title="MUX[]", inputs=3)
+
+    def process_logic(self):
+        a, b, _ = self.input_words()
+        sel = self.input_values()[2]
+        self.value = b if sel else a
+
+
+# --- Sequential Nodes ---
+# State elements only change on events: they keep their value between
+# process_logic() calls, which the event simulator makes whenever an input
+# changes.
+
+
+class ClockNode(Node):
+    """Square wave source driven by the event simulator."""
+
+    __slots__ = ("period",)
+    color = (50, 100, 150)
+
+    def __init__(self, x, y, period=1):
+        super().__init__(x, y, title="CLK")
+        self.period = period
+        self.value = False
+
+    @property
+    def half_period(self):
+        return CLOCK_TICKS * self.period // 2
+
+    def adjust(self, delta):
+        period = self.period + delta
+        if 1 <= period <= MAX_CLOCK_PERIOD:
+            self.period = period
+
+    def params(self):
+        if self.period != 1:
+            return {"period": self.period}
+        return {}
+
+
+class DFlipFlopNode(Node):
+    """Inputs D, Clock: stores D on the rising edge of the clock."""
+
+    __slots__ = ("last_clock",)
+    color = (120, 70, 110)
+
+    def __init__(self, x, y):
+        super().__init__(x, y, title="DFF")
+        self.value = False
+        self.last_clock = False
+        self.setup_inputs(2)
+
+    def process_logic(self):
+        d, clock = self.input_values()
+        if clock and not self.last_clock:
+            self.value = bool(d)
+        self.last_clock = bool(clock)
+
+
+class SRLatchNode(Node):
+    """Inputs Set, Reset: Set wins over Reset, neither holds the value."""
+
+    __slots__ = ()
+    color = (120, 70, 110)
+
+    def __init__(self, x, y):
+        super().__init__(x, y, title="SR")
+        self.value = False
+        self.setup_inputs(2)
+
+    def process_logic(self):
+        s, r = self.input_values()
+        if s:
+            self.value = True
+        elif r:
+            self.value = False
+
+
+class RegisterNode(BusNode):
+    """Inputs D (bus), Clock: stores the word on the rising edge."""
+
+    __slots__ = ("last_clock",)
+
+    def __init__(self, x, y, width=DEFAULT_BUS_WIDTH):
+        super().__init__(x, y, width, title="REG")
+        self.last_clock = False
+
+    def process_logic(self):
+        d = self.input_words()[0]
+        clock = self.input_values()[1]
+        if clock and not self.last_clock:
+            self.value = d
+        self.last_clock = bool(clock)
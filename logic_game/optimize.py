@@ -0,0 +1,157 @@
+from netlist import Netlist
+
+# Constant signals; every other signal is a node index of the optimized netlist
+ZERO = -1
+ONE = -2
+
+GATE_TYPES = {
+    "AND": "AndNode",
+    "NAND": "NandNode",
+    "OR": "OrNode",
+    "NOR": "NorNode",
+    "XOR": "XorNode",
+    "XNOR": "XnorNode",
+    "NOT": "NotNode",
+}
+
+
+def optimize(netlist):
+    """
+    Returns an equivalent netlist that is cheaper to simulate and verify.
+
+    Runs constant propagation (unconnected ports read 0), double negation
+    and x & ~x style elimination, structural hashing so identical gates are
+    built once, and removal of gates no output depends on. Input and output
+    indices are unchanged; gate indices are not. Circuits with feedback
+    loops are returned as they are.
+    """
+    netlist = netlist.bit_level()
+    if netlist.topological_order() is None:
+        return netlist
+    return _Optimizer(netlist).run()
+
+
+class _Optimizer:
+    def __init__(self, netlist):
+        self.netlist = netlist
+        self.base = netlist.input_count + netlist.output_count
+        self.ops = []  # (op, operands) per emitted gate
+        self.hashed = {}  # (op, operands) -> signal
+        self.negated = {}  # signal of a NOT gate -> its operand
+
+    def emit(self, op, operands):
+        operands = tuple(operands)
+        if op != "NOT":
+            # Every remaining op is commutative
+            operands = tuple(sorted(operands))
+        key = (op, operands)
+        if key not in self.hashed:
+            self.hashed[key] = self.base + len(self.ops)
+            self.ops.append(key)
+            if op == "NOT":
+                self.negated[self.hashed[key]] = operands[0]
+        return self.hashed[key]
+
+    def invert(self, signal):
+        if signal == ZERO:
+            return ONE
+        if signal == ONE:
+            return ZERO
+        if signal in self.negated:
+            return self.negated[signal]
+        return self.emit("NOT", [signal])
+
+    def complementary(self, operands):
+        present = set(operands)
+        return any(self.negated.get(s) in present for s in operands)
+
+    def gate(self, op, values):
+        if op == "CONST0":
+            return ZERO
+        if op in ("BUF", "NOT"):
+            return values[0] if op == "BUF" else self.invert(values[0])
+
+        inverted = op in ("NAND", "NOR", "XNOR")
+        if op in ("XOR", "XNOR"):
+            # x ^ x cancels, constants fold into the inversion
+            odd = {}
+            for v in values:
+                if v == ONE:
+                    inverted = not inverted
+                elif v != ZERO:
+                    odd[v] = not odd.get(v, False)
+            operands = [v for v, keep in odd.items() if keep]
+            base = "XOR"
+            if not operands:
+                return ONE if inverted else ZERO
+        else:
+            # AND: 0 dominates, 1 drops out; OR the other way round
+            dominant, neutral = (ZERO, ONE) if op in ("AND", "NAND") else (ONE, ZERO)
+            operands = list(dict.fromkeys(v for v in values if v != neutral))
+            if dominant in operands or self.complementary(operands):
+                result = dominant
+            elif not operands:
+                result = neutral
+            else:
+                result = None
+            if result is not None:
+                return self.invert(result) if inverted else result
+            base = "AND" if op in ("AND", "NAND") else "OR"
+
+        if len(operands) == 1:
+            return self.invert(operands[0]) if inverted else operands[0]
+        if inverted:
+            base = {"AND": "NAND", "OR": "NOR", "XOR": "XNOR"}[base]
+        return self.emit(base, operands)
+
+    def run(self):
+        netlist = self.netlist
+        signal = [ZERO] * len(netlist)
+        signal[: netlist.input_count] = range(netlist.input_count)
+        for idx in netlist.topological_order():
+            op, srcs = netlist.primitive(idx)
+            values = [signal[s] if s is not None else ZERO for s in srcs]
+            # Outputs pass their source through to any gate they feed
+            signal[idx] = self.gate(op, values)
+
+        # Dead-cone removal: keep only gates an output depends on
+        live = set()
+        stack = [signal[idx] for idx in netlist.outputs]
+        while stack:
+            s = stack.pop()
+            if s >= self.base and s not in live:
+                live.add(s)
+                stack.extend(self.ops[s - self.base][1])
+
+        gate_types, gate_params, connections = [], [], []
+        renumber = {}
+        for s in sorted(live):
+            renumber[s] = self.base + len(gate_types)
+            op, operands = self.ops[s - self.base]
+            gate_types.append(GATE_TYPES[op])
+            gate_params.append({"inputs": len(operands)} if len(operands) > 2 else {})
+            for port_idx, operand in enumerate(operands):
+                connections.append(
+                    (renumber.get(operand, operand), renumber[s], port_idx)
+                )
+
+        constants = {}
+        for idx in netlist.outputs:
+            s = signal[idx]
+            if s in (ZERO, ONE):
+                # Unconnected AND reads 0, NAND reads 1
+                if s not in constants:
+                    constants[s] = self.base + len(gate_types)
+                    gate_types.append("NandNode" if s == ONE else "AndNode")
+                    gate_params.append({})
+                src = constants[s]
+            else:
+                src = renumber.get(s, s)
+            connections.append((src, idx, 0))
+        return Netlist(
+            netlist.input_count,
+            netlist.output_count,
+            gate_types,
+            connections,
+            gate_params,
+        )
@@ -0,0 +1,175 @@
+import itertools
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import verification
+from netlist import exhaustive_input_words
+from vector_eval import netlist_evaluator
+
+# Each block enumerates the last BLOCK_INPUTS inputs with the others fixed
+BLOCK_INPUTS = 12
+# Below this many inputs starting the pool costs more than it saves
+PARALLEL_MIN_INPUTS = 14
+
+# Set in each worker process by _init_worker
+_level = None
+_evaluator = None
+_outputs = None
+
+
+def _init_worker(level, netlist, outputs):
+    global _level, _evaluator, _outputs
+    _level = level
+    _evaluator = netlist_evaluator(netlist)
+    _outputs = outputs
+
+
+def block_words(input_count, block, low):
+    """
+    Bit-parallel input words of one block: the first input_count - low inputs
+    are the bits of block, the last low inputs take every combination.
+    """
+    words, mask = exhaustive_input_words(low)
+    high = input_count - low
+    fixed = [mask if block >> (high - 1 - i) & 1 else 0 for i in range(high)]
+    return fixed + words, mask
+
+
+def verify_block(level, evaluator, block, low, outputs=None):
+    """
+    Checks one block of input combinations on the given output positions
+    (default: all). Returns None when it passes, else (inputs, actual,
+    expected) of its first failing combination.
+    """
+    n = level.input_count
+    if outputs is None:
+        outputs = range(level.output_count)
+    words, mask = block_words(n, block, low)
+    actual_tables = evaluator(words, mask)
+    prefix = tuple(w == mask for w in words[: n - low])
+    combos = itertools.product([False, True], repeat=low)
+    for p, combo in enumerate(combos):
+        inputs = prefix + combo
+        actual = [bool(w >> p & 1) for w in actual_tables]
+        expected = level.expected_outputs(inputs)
+        if any(actual[k] != expected[k] for k in outputs):
+            return inputs, actual, expected
+    return None
+
+
+def _run_block(block, low):
+    return verify_block(_level, _evaluator, block, low, _outputs)
+
+
+def can_pickle(level):
+    """Whether worker processes can receive level (and its check_func)."""
+    try:
+        pickle.dumps(level)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+class ParallelVerification:
+    """
+    Exhaustive verification split into contiguous blocks of the input space
+    and spread over a process pool. Every worker compiles its own copy of the
+    netlist. Call poll() from the game loop: it never blocks, tracks
+    `progress` in [0, 1] and returns the VerificationResult once done.
+    No block after the first failing one is started, and the reported
+    failure is the same first combination the serial check finds.
+    Levels that cannot be sent to the workers (a check_func that is a
+    closure or lambda) are verified serially instead.
+    """
+
+    def __init__(self, level, netlist, workers=None, outputs=None):
+        self.level = level
+        self.outputs = list(outputs if outputs is not None else range(level.output_count))
+        self.low = min(BLOCK_INPUTS, level.input_count)
+        self.block_count = 1 << (level.input_count - self.low)
+        self.done = 0
+        self.failure = None  # (block, (inputs, actual, expected))
+        self.result = None
+        self.netlist = netlist
+        self.executor = None
+        self.pending = {}  # future -> block
+        if not can_pickle(level):
+            self._verify_serially()
+            return
+        workers = min(workers or os.cpu_count() or 1, self.block_count)
+        # Spawned rather than forked: the game runs other threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(level, netlist.bit_level(), self.outputs),
+        )
+        # Blocks are handed out in order, a few per worker at a time
+        self.in_flight = 2 * workers
+        self.next_block = 0
+        self._submit()
+
+    def _verify_serially(self):
+        self.cancel()
+        self.pending = {}
+        self.result = verification.verify_netlist(
+            self.level, self.netlist, self.outputs
+        )
+        self.done = self.block_count
+
+    def _submit(self):
+        limit = self.failure[0] if self.failure else self.block_count
+        while len(self.pending) < self.in_flight and self.next_block < limit:
+            future = self.executor.submit(_run_block, self.next_block, self.low)
+            self.pending[future] = self.next_block
+            self.next_block += 1
+
+    @property
+    def progress(self):
+        return self.done / self.block_count
+
+    def poll(self, timeout=0):
+        """Collects finished blocks; returns the result once known, else None."""
+        if self.result is not None:
+            return self.result
+        finished, _ = wait(self.pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in finished:
+            block = self.pending.pop(future)
+            self.done += 1
+            try:
+                failure = future.result()
+            except BrokenProcessPool:
+                # A worker died, e.g. it could not unpickle the level
+                self._verify_serially()
+                return self.result
+            if failure is not None and (self.failure is None or block < self.failure[0]):
+                self.failure = (block, failure)
+        self._submit()
+
+        # Done once no block that could fail earlier is still running
+        first = self.failure[0] if self.failure else self.block_count
+        if any(block < first for block in self.pending.values()):
+            return None
+        self.cancel()
+        if self.failure is None:
+            self.result = verification.VerificationResult(True, proven=self.outputs)
+        else:
+            self.result = verification.VerificationResult(False, *self.failure[1])
+        return self.result
+
+    def wait(self):
+        while self.poll(timeout=None) is None:
+            pass
+        return self.result
+
+    def cancel(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def verify_parallel(level, netlist, workers=None, outputs=None):
+    """Blocking exhaustive verification over a process pool."""
+    return ParallelVerification(level, netlist, workers, outputs).wait()
@@ -0,0 +1,186 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter_ns
+
+import pygame
+
+# Frames kept for percentiles and dumps (10 seconds at 60 FPS)
+HISTORY_FRAMES = 600
+
+OVERLAY_BG = (0, 0, 0, 180)
+OVERLAY_TEXT = (200, 255, 200)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    idx = min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))
+    return sorted_values[idx]
+
+
+class FrameProfiler:
+    """
+    Splits every frame into named phases with perf_counter_ns.
+
+    mark(name) charges the time since the previous mark to `name`, so the
+    main loop only calls mark() between phases. A phase may be marked more
+    than once per frame and accumulates. While disabled, start_frame(),
+    mark() and end_frame() return immediately.
+    """
+
+    def __init__(self, history=HISTORY_FRAMES):
+        self.enabled = False
+        # One entry per finished frame: (start_ns, [(phase, start_ns, dur_ns), ...])
+        self.frames = deque(maxlen=history)
+        self.spans = None
+        self.last = 0
+        self.counters = {}
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self.last = perf_counter_ns()
+        self.spans = []
+
+    def mark(self, name):
+        if not self.enabled or self.spans is None:
+            return
+        now = perf_counter_ns()
+        self.spans.append((name, self.last, now - self.last))
+        self.last = now
+
+    def end_frame(self, counters=None):
+        """Closes the frame; counters ({name: value}) are shown as latest values."""
+        if not self.enabled or self.spans is None:
+            return
+        if self.spans:
+            self.frames.append((self.spans[0][1], self.spans))
+        self.spans = None
+        self.counters = counters or {}
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frames.clear()
+        self.spans = None
+
+    def phase_names(self):
+        names = []
+        for _, spans in self.frames:
+            for name, _, _ in spans:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def frame_totals(self):
+        return [sum(dur for _, _, dur in spans) for _, spans in self.frames]
+
+    def phase_means(self):
+        """Mean milliseconds per frame of every phase."""
+        totals = {}
+        for _, spans in self.frames:
+            for name, _, dur in spans:
+                totals[name] = totals.get(name, 0) + dur
+        count = max(1, len(self.frames))
+        return {name: total / count / 1e6 for name, total in totals.items()}
+
+    def summary_lines(self, fps):
+        totals = sorted(self.frame_totals())
+        lines = [
+            f"FPS: {fps:.1f}",
+            "Frame ms p50/p95/p99: "
+            + "/".join(f"{percentile(totals, q) / 1e6:.2f}" for q in (50, 95, 99)),
+        ]
+        for name, ms in self.phase_means().items():
+            lines.append(f"  {name}: {ms:.3f} ms")
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        return lines
+
+    def write_csv(self, f):
+        """One row per frame with the milliseconds spent in each phase."""
+        names = self.phase_names()
+        writer = csv.writer(f)
+        writer.writerow(["frame", "total_ms"] + [f"{n}_ms" for n in names])
+        for i, (_, spans) in enumerate(self.frames):
+            per_phase = dict.fromkeys(names, 0)
+            for name, _, dur in spans:
+                per_phase[name] += dur
+            total = sum(per_phase.values())
+            writer.writerow(
+                [i, f"{total / 1e6:.4f}"]
+                + [f"{per_phase[n] / 1e6:.4f}" for n in names]
+            )
+
+    def write_chrome_trace(self, f):
+        """Chrome trace event JSON (chrome://tracing, Perfetto), one slice per phase."""
+        events = []
+        origin = self.frames[0][0] if self.frames else 0
+        for i, (start, spans) in enumerate(self.frames):
+            total = sum(dur for _, _, dur in spans)
+            events.append(
+                {
+                    "name": f"frame {i}",
+                    "ph": "X",
+                    "ts": (start - origin) / 1000,
+                    "dur": total / 1000,
+                    "pid": 1,
+                    "tid": 1,
+                }
+            )
+            for name, span_start, dur in spans:
+                events.append(
+                    {
+                        "name": name,
+                        "ph": "X",
+                        "ts": (span_start - origin) / 1000,
+                        "dur": dur / 1000,
+                        "pid": 1,
+                        "tid": 2,
+                    }
+                )
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def draw_overlay(self, surface, font, fps):
+        lines = self.summary_lines(fps)
+        line_h = font.get_linesize()
+        width = max(font.size(line)[0] for line in lines) + 20
+        panel = pygame.Surface((width, line_h * len(lines) + 10), pygame.SRCALPHA)
+        panel.fill(OVERLAY_BG)
+        for i, line in enumerate(lines):
+            panel.blit(font.render(line, True, OVERLAY_TEXT), (10, 5 + i * line_h))
+        surface.blit(panel, (surface.get_width() - width - 10, 10))
+
+
+class StartupProfiler:
+    """
+    Phases of a cold start, up to the first presented frame.
+
+    Uses the same mark() convention as FrameProfiler, starting from start_ns
+    (taken before the heavy imports). finish() closes the profile; later
+    marks are ignored.
+    """
+
+    def __init__(self, start_ns=None):
+        self.start = perf_counter_ns() if start_ns is None else start_ns
+        self.last = self.start
+        self.spans = []
+        self.finished = False
+
+    def mark(self, name):
+        if self.finished:
+            return
+        now = perf_counter_ns()
+        self.spans.append((name, now - self.last))
+        self.last = now
+
+    def finish(self):
+        self.finished = True
+
+    def first_frame_ms(self):
+        return (self.last - self.start) / 1e6
+
+    def summary_lines(self):
+        lines = [f"  {name}: {dur / 1e6:.1f} ms" for name, dur in self.spans]
+        lines.append(f"Time to first frame: {self.first_frame_ms():.1f} ms")
+        return lines
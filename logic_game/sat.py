@@ -0,0 +1,417 @@
+import heapq
+
+from bdd import symbolic_outputs
+from netlist import Netlist
+
+# Conflicts before the first restart; later restarts follow the Luby sequence
+RESTART_BASE = 100
+ACTIVITY_DECAY = 0.95
+
+
+def luby(i):
+    """i-th element (from 0) of the Luby restart sequence 1,1,2,1,1,2,4,..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i %= size
+    return 1 << seq
+
+
+class Solver:
+    """
+    Small CDCL SAT solver: two watched literals, first-UIP clause learning
+    with non-chronological backjumping, VSIDS-style activities, phase saving
+    and Luby restarts.
+
+    Variables are ints from 1, literals are +var / -var as in DIMACS.
+    Learnt clauses only depend on the clause database, so they are kept
+    between solve() calls with different assumptions.
+    """
+
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+        self.watches = {}
+        # Per-variable state, index 0 unused
+        self.assigns = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.order_heap = []
+        self.bump = 1.0
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+
+    def new_var(self):
+        self.num_vars += 1
+        var = self.num_vars
+        self.assigns.append(None)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        self.watches[var] = []
+        self.watches[-var] = []
+        heapq.heappush(self.order_heap, (0.0, var))
+        return var
+
+    def value(self, lit):
+        v = self.assigns[abs(lit)]
+        if v is None:
+            return None
+        return v if lit > 0 else not v
+
+    def add_clause(self, lits):
+        """Adds a clause at decision level 0. Returns False once unsatisfiable."""
+        if not self.ok:
+            return False
+        clause = []
+        for lit in lits:
+            if -lit in clause:
+                return True  # tautology
+            value = self.value(lit)
+            if value is True:
+                return True  # already satisfied at level 0
+            if value is None and lit not in clause:
+                clause.append(lit)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._enqueue(clause[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self._attach(clause)
+        return self.ok
+
+    def _attach(self, clause):
+        idx = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(idx)
+        self.watches[clause[1]].append(idx)
+        return idx
+
+    def _enqueue(self, lit, reason):
+        var = abs(lit)
+        self.assigns[var] = lit > 0
+        self.levels[var] = len(self.trail_lim)
+        self.reasons[var] = reason
+        self.trail.append(lit)
+
+    def _propagate(self):
+        """Unit propagation; returns a conflicting clause index or None."""
+        while self.qhead < len(self.trail):
+            false_lit = -self.trail[self.qhead]
+            self.qhead += 1
+            watchers = self.watches[false_lit]
+            kept = []
+            for pos, ci in enumerate(watchers):
+                clause = self.clauses[ci]
+                # Keep the falsified watch in slot 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(ci)
+                    continue
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(ci)
+                        break
+                else:
+                    kept.append(ci)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watchers[pos + 1 :])
+                        self.watches[false_lit] = kept
+                        return ci
+                    self._enqueue(clause[0], ci)
+            self.watches[false_lit] = kept
+        return None
+
+    def _bump(self, var):
+        self.activity[var] += self.bump
+        if self.activity[var] > 1e100:
+            # Rescale everything to keep activities finite
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.bump *= 1e-100
+            self.order_heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1)]
+            heapq.heapify(self.order_heap)
+        elif self.assigns[var] is None:
+            heapq.heappush(self.order_heap, (-self.activity[var], var))
+
+    def _analyze(self, conflict):
+        """First-UIP learning; returns (learnt clause, backjump level)."""
+        level = len(self.trail_lim)
+        learnt = [None]
+        seen = set()
+        counter = 0
+        lit = None
+        idx = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for q in clause:
+                var = abs(q)
+                if q == lit or var in seen or self.levels[var] == 0:
+                    continue
+                seen.add(var)
+                self._bump(var)
+                if self.levels[var] == level:
+                    counter += 1
+                else:
+                    learnt.append(q)
+            while abs(self.trail[idx]) not in seen:
+                idx -= 1
+            lit = self.trail[idx]
+            idx -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.clauses[self.reasons[abs(lit)]]
+        learnt[0] = -lit
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal with the highest remaining level in slot 1
+        best = max(range(1, len(learnt)), key=lambda i: self.levels[abs(learnt[i])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def _backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.phase[var] = lit > 0
+            self.assigns[var] = None
+            self.reasons[var] = None
+            heapq.heappush(self.order_heap, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def _pick_branch_var(self):
+        while self.order_heap:
+            _, var = heapq.heappop(self.order_heap)
+            if self.assigns[var] is None:
+                return var
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True and fills self.model (model[var] -> bool) if satisfiable
+        under the assumption literals, else False.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        if self._propagate() is not None:
+            self.ok = False
+            return False
+
+        restarts = 0
+        budget = RESTART_BASE * luby(0)
+        conflicts_here = 0
+        try:
+            while True:
+                conflict = self._propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    conflicts_here += 1
+                    if not self.trail_lim:
+                        self.ok = False
+                        return False
+                    learnt, back_level = self._analyze(conflict)
+                    self._backtrack(back_level)
+                    if len(learnt) == 1:
+                        self._enqueue(learnt[0], None)
+                    else:
+                        self._enqueue(learnt[0], self._attach(learnt))
+                    self.bump /= ACTIVITY_DECAY
+                    continue
+
+                if conflicts_here >= budget:
+                    restarts += 1
+                    budget = RESTART_BASE * luby(restarts)
+                    conflicts_here = 0
+                    self._backtrack(0)
+                    continue
+
+                level = len(self.trail_lim)
+                if level < len(assumptions):
+                    # Assumptions are decided first, one per level
+                    lit = assumptions[level]
+                    value = self.value(lit)
+                    if value is False:
+                        return False
+                    self.trail_lim.append(len(self.trail))
+                    if value is None:
+                        self._enqueue(lit, None)
+                    continue
+
+                var = self._pick_branch_var()
+                if var is None:
+                    self.model = [None] + [bool(v) for v in self.assigns[1:]]
+                    return True
+                self.trail_lim.append(len(self.trail))
+                self._enqueue(var if self.phase[var] else -var, None)
+        finally:
+            self._backtrack(0)
+
+
+class CNFBuilder:
+    """
+    Tseitin encoder on top of a Solver. Values are literals; structurally
+    identical gates are encoded once. Offers the same constant/and_/or_/xor/
+    not_/apply_op interface as the BDD manager.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = solver or Solver()
+        self.false = self.solver.new_var()
+        self.solver.add_clause([-self.false])
+        self.true = -self.false
+        self.memo = {}
+
+    def new_var(self):
+        return self.solver.new_var()
+
+    def constant(self, value):
+        return self.true if value else self.false
+
+    def not_(self, a):
+        return -a
+
+    def and_all(self, lits):
+        unique = set()
+        for lit in lits:
+            if lit == self.false or -lit in unique:
+                return self.false
+            if lit != self.true:
+                unique.add(lit)
+        if not unique:
+            return self.true
+        if len(unique) == 1:
+            return unique.pop()
+        key = ("AND", tuple(sorted(unique)))
+        if key not in self.memo:
+            y = self.new_var()
+            for lit in unique:
+                self.solver.add_clause([-y, lit])
+            self.solver.add_clause([y] + [-lit for lit in unique])
+            self.memo[key] = y
+        return self.memo[key]
+
+    def and_(self, a, b):
+        return self.and_all([a, b])
+
+    def or_(self, a, b):
+        return -self.and_all([-a, -b])
+
+    def xor(self, a, b):
+        if a == self.false:
+            return b
+        if b == self.false:
+            return a
+        if a == self.true:
+            return -b
+        if b == self.true:
+            return -a
+        if a == b:
+            return self.false
+        if a == -b:
+            return self.true
+        key = ("XOR", min(a, b), max(a, b))
+        if key not in self.memo:
+            y = self.new_var()
+            self.solver.add_clause([-a, -b, -y])
+            self.solver.add_clause([a, b, -y])
+            self.solver.add_clause([a, -b, y])
+            self.solver.add_clause([-a, b, y])
+            self.memo[key] = y
+        return self.memo[key]
+
+    def apply_op(self, op, values):
+        """Encodes a netlist primitive op (see netlist.eval_op) as clauses."""
+        if op == "BUF":
+            return values[0]
+        if op == "NOT":
+            return -values[0]
+        if op == "CONST0":
+            return self.false
+        if op in ("AND", "NAND"):
+            result = self.and_all(values)
+        elif op in ("OR", "NOR"):
+            result = -self.and_all([-v for v in values])
+        elif op in ("XOR", "XNOR"):
+            result = self.false
+            for v in values:
+                result = self.xor(result, v)
+        else:
+            raise ValueError(f"Unknown op: {op}")
+        if op in ("NAND", "NOR", "XNOR"):
+            result = -result
+        return result
+
+
+def build_miter(level, netlist, outputs=None):
+    """
+    Encodes netlist XOR reference for the given output positions (default:
+    all) into one CNF whose models are exactly the failing input assignments.
+    Returns (builder, input literals).
+    """
+    cnf = CNFBuilder()
+    inputs = [cnf.new_var() for _ in range(level.input_count)]
+    player = netlist.compose(cnf.apply_op, inputs, cnf.false)
+
+    if level.reference is not None:
+        reference = Netlist.from_solution(
+            level.input_count, level.output_count, level.reference
+        ).compose(cnf.apply_op, inputs, cnf.false)
+    else:
+        try:
+            reference = symbolic_outputs(cnf, level, inputs)
+        except TypeError:
+            raise ValueError(
+                f"Level {level.id} needs a reference circuit or a check_func "
+                "written with bitwise operators"
+            )
+
+    if outputs is None:
+        outputs = range(level.output_count)
+    diffs = [cnf.xor(player[k], reference[k]) for k in outputs]
+    cnf.solver.add_clause(diffs)
+    return cnf, inputs
+
+
+def find_counterexample(level, netlist, outputs=None):
+    """
+    Returns the first failing input combination in itertools.product order,
+    as a tuple of bools, or None when the netlist matches the reference.
+    """
+    cnf, inputs = build_miter(level, netlist, outputs)
+    solver = cnf.solver
+    if not solver.solve():
+        return None
+
+    # Fix inputs from the first one on, preferring False while still failing
+    model = solver.model
+    prefix = []
+    for lit in inputs:
+        if not model[lit]:
+            prefix.append(-lit)
+        elif solver.solve(prefix + [-lit]):
+            prefix.append(-lit)
+            model = solver.model
+        else:
+            prefix.append(lit)
+    return tuple(lit > 0 for lit in prefix)
@@ -0,0 +1,81 @@
+import hashlib
+import random
+
+from minimize import packed_outputs
+from vector_eval import netlist_evaluator
+
+# Random input combinations simulated per signature, one bit each
+SIGNATURE_PATTERNS = 2048
+
+# Random words per input count; fixed seeds keep signatures comparable
+# across runs and machines
+_PATTERNS = {}
+# Expected signature words keyed by (check_func, input count, output count)
+_EXPECTED = {}
+
+
+def signature_patterns(input_count):
+    """Returns (words, mask): SIGNATURE_PATTERNS random combinations bit-parallel."""
+    if input_count not in _PATTERNS:
+        rng = random.Random(f"signature:{input_count}")
+        words = [rng.getrandbits(SIGNATURE_PATTERNS) for _ in range(input_count)]
+        _PATTERNS[input_count] = (words, (1 << SIGNATURE_PATTERNS) - 1)
+    return _PATTERNS[input_count]
+
+
+def pattern_inputs(words, p):
+    """Input combination held in bit p of the pattern words."""
+    return tuple(bool(w >> p & 1) for w in words)
+
+
+def netlist_signature(netlist):
+    """One word per output: the netlist's outputs on the random patterns."""
+    words, mask = signature_patterns(netlist.input_count)
+    return tuple(netlist_evaluator(netlist)(words, mask))
+
+
+def level_signature(level):
+    """What netlist_signature must be for a correct circuit."""
+    key = (level.check_func, level.input_count, level.output_count)
+    if key not in _EXPECTED:
+        words, mask = signature_patterns(level.input_count)
+        tables = packed_outputs(level, words, mask)
+        if tables is None:
+            tables = [0] * level.output_count
+            for p in range(SIGNATURE_PATTERNS):
+                outputs = level.expected_outputs(pattern_inputs(words, p))
+                for k, value in enumerate(outputs):
+                    if value:
+                        tables[k] |= 1 << p
+        _EXPECTED[key] = tuple(tables)
+    return _EXPECTED[key]
+
+
+def fingerprint(signature):
+    """
+    Short hex digest of a signature. Circuits computing the same function
+    always share it, so it groups and indexes solutions by behaviour; equal
+    fingerprints only suggest equivalence, they do not prove it.
+    """
+    payload = b"".join(
+        w.to_bytes(SIGNATURE_PATTERNS // 8, "little") for w in signature
+    )
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+
+def find_mismatch(level, netlist, outputs=None):
+    """
+    Returns an input combination among the random patterns where the netlist
+    disagrees with level.check_func on one of the given output positions
+    (default: all), or None when those signatures match.
+    """
+    if outputs is None:
+        outputs = range(level.output_count)
+    actual, expected = netlist_signature(netlist), level_signature(level)
+    diff = 0
+    for k in outputs:
+        diff |= actual[k] ^ expected[k]
+    if not diff:
+        return None
+    p = (diff & -diff).bit_length() - 1
+    return pattern_inputs(signature_patterns(level.input_count)[0], p)
@@ -0,0 +1,147 @@
+import contextlib
+import copy
+import threading
+import time
+from collections import deque
+
+from eventsim import DEFAULT_CLOCK_HZ, EventSimulator
+from nodes import InputNode
+
+# Fixed simulation steps per wall-clock second, independent of the frame rate
+SIM_STEP_HZ = 1000
+# Steps run back to back after a stall before the backlog is dropped
+MAX_CATCH_UP_STEPS = 50
+
+
+class Snapshot:
+    """Immutable copy of the simulated state, published once per step."""
+
+    def __init__(self, version, time, values, events):
+        self.version = version
+        self.time = time
+        self.values = values  # one value per output pin, in load order
+        self.events = events
+
+
+def output_pins(nodes):
+    return [pin for node in nodes for pin in node.output_pins()]
+
+
+def clone_nodes(nodes):
+    """
+    Deep copy of a circuit. Every node is in the memo before any attribute
+    is copied, so wires never make deepcopy recurse from node to node and
+    long chains copy without hitting the recursion limit.
+    """
+    memo = {}
+    clones = []
+    for node in nodes:
+        clone = copy.copy(node)
+        memo[id(node)] = clone
+        clones.append(clone)
+    for node, clone in zip(nodes, clones):
+        for cls in type(node).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if hasattr(node, name):
+                    setattr(clone, name, copy.deepcopy(getattr(node, name), memo))
+    return clones
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Runs an EventSimulator on its own thread with a fixed timestep.
+
+    The worker simulates a private copy of the circuit; the game never
+    shares node objects with it. Edits and input toggles go in through
+    `commands`, a deque whose append/popleft are atomic, and results come
+    back as a Snapshot that replaces `snapshot` in a single assignment, so
+    the render loop always reads one consistent state. A WaveformRecorder
+    is the one object shared with the game: the worker writes it only while
+    holding recorder.lock.
+    """
+
+    def __init__(self, clock_hz=DEFAULT_CLOCK_HZ, step_hz=SIM_STEP_HZ):
+        super().__init__(daemon=True)
+        self.commands = deque()
+        self.snapshot = None
+        self.clock_hz = clock_hz
+        self.step = 1 / step_hz
+        self.running = True
+        self.simulator = None
+        self.version = None
+        self.pins = []
+
+    # --- Called from the game thread ---
+
+    def load(self, version, nodes, recorder=None):
+        """Replaces the simulated circuit with a copy of nodes."""
+        clone = clone_nodes(nodes)
+        if recorder is not None:
+            # Traces stay keyed by the game's pins across reloads
+            recorder.alias_pins(output_pins(clone), output_pins(nodes))
+        self.commands.append(("load", version, clone, recorder))
+
+    def set_input(self, idx, value):
+        self.commands.append(("input", idx, value))
+
+    def set_clock_hz(self, clock_hz):
+        self.commands.append(("clock_hz", clock_hz))
+
+    def stop(self):
+        self.commands.append(("stop",))
+        self.join()
+
+    # --- Worker thread ---
+
+    def _handle(self, command):
+        kind = command[0]
+        if kind == "load":
+            _, version, nodes, recorder = command
+            start = self.simulator.time if self.simulator else 0
+            self.simulator = EventSimulator(nodes, self.clock_hz, recorder, start)
+            self.version = version
+            self.pins = output_pins(nodes)
+        elif kind == "input":
+            _, idx, value = command
+            if self.simulator and isinstance(self.simulator.nodes[idx], InputNode):
+                self.simulator.nodes[idx].value = value
+        elif kind == "clock_hz":
+            self.clock_hz = command[1]
+            if self.simulator:
+                self.simulator.clock_hz = self.clock_hz
+        elif kind == "stop":
+            self.running = False
+
+    def _recording(self):
+        recorder = self.simulator.recorder if self.simulator else None
+        return recorder.lock if recorder is not None else contextlib.nullcontext()
+
+    def run(self):
+        next_step = time.perf_counter()
+        while self.running:
+            while self.commands:
+                self._handle(self.commands.popleft())
+
+            now = time.perf_counter()
+            if now < next_step:
+                time.sleep(next_step - now)
+                continue
+
+            steps = 0
+            with self._recording():
+                while next_step <= now and steps < MAX_CATCH_UP_STEPS:
+                    if self.simulator:
+                        self.simulator.advance(self.step)
+                    next_step += self.step
+                    steps += 1
+            if next_step <= now:
+                # Too slow to keep up: run slower than real time instead of stalling
+                next_step = now
+
+            if self.simulator:
+                self.snapshot = Snapshot(
+                    self.version,
+                    self.simulator.time,
+                    tuple(pin.value for pin in self.pins),
+                    self.simulator.events,
+                )
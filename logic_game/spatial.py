@@ -0,0 +1,130 @@
+# World pixels per grid cell
+CELL_SIZE = 256
+# Ports and pins stick out of a node's rect by half their size
+PORT_MARGIN = 10
+
+
+def link_bounds(start, end):
+    """Box around a wire drawn by draw_bezier, from its control points."""
+    bulge = abs(end[0] - start[0]) * 0.5
+    return (
+        min(start[0], end[0] - bulge),
+        min(start[1], end[1]),
+        max(start[0] + bulge, end[0]),
+        max(start[1], end[1]),
+    )
+
+
+class SpatialIndex:
+    """
+    Uniform grid of world space for culling and hit tests.
+
+    A node is binned under the box around its rect and the wires into its
+    input ports, so query() finds every node and every wire that may cross a
+    region. The index does not watch the nodes: call moved() after a node
+    moves or resizes, update() after its input connections change, remove()
+    after it is deleted and rebuild() after bulk edits. Wires leaving a node
+    are found through the ConnectionIndex of the same nodes.
+
+    The index also keeps the drawing order: nodes are stacked in the order
+    they were added, and raise_node() brings one to the top.
+    """
+
+    def __init__(self, connections, cell_size=CELL_SIZE):
+        self.connections = connections
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> {node: None}
+        self.spans = {}  # node -> (cx0, cy0, cx1, cy1)
+        self.order = {}  # node -> stacking rank, higher is drawn later
+        self.next_rank = 0
+
+    def __len__(self):
+        return len(self.spans)
+
+    def rebuild(self, nodes):
+        self.cells.clear()
+        self.spans.clear()
+        self.order.clear()
+        for node in nodes:
+            self.update(node)
+
+    def bounds(self, node):
+        r = node.rect
+        x0, y0 = r.left - PORT_MARGIN, r.top - PORT_MARGIN
+        x1, y1 = r.right + PORT_MARGIN, r.bottom + PORT_MARGIN
+        for port in node.input_ports:
+            src = port.connected_node
+            if src is not None:
+                lx0, ly0, lx1, ly1 = link_bounds(src.output_rect.center, port.rect.center)
+                x0, y0 = min(x0, lx0), min(y0, ly0)
+                x1, y1 = max(x1, lx1), max(y1, ly1)
+        return x0, y0, x1, y1
+
+    def _cell_span(self, x0, y0, x1, y1):
+        size = self.cell_size
+        return int(x0 // size), int(y0 // size), int(x1 // size), int(y1 // size)
+
+    def _unbin(self, node):
+        span = self.spans.pop(node, None)
+        if span is None:
+            return
+        cx0, cy0, cx1, cy1 = span
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = self.cells[(cx, cy)]
+                del cell[node]
+                if not cell:
+                    del self.cells[(cx, cy)]
+
+    def update(self, node):
+        """Re-bins a node after it moved or its input connections changed."""
+        self._unbin(node)
+        if node not in self.order:
+            self.raise_node(node)
+        span = self._cell_span(*self.bounds(node))
+        self.spans[node] = span
+        cx0, cy0, cx1, cy1 = span
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.cells.setdefault((cx, cy), {})[node] = None
+
+    def moved(self, node):
+        """Re-bins a moved node and the wires leaving it."""
+        self.update(node)
+        for dst in self.connections.consumers(node):
+            self.update(dst)
+
+    def remove(self, node):
+        self._unbin(node)
+        self.order.pop(node, None)
+
+    def raise_node(self, node):
+        """Draws node above every other node."""
+        self.order[node] = self.next_rank
+        self.next_rank += 1
+
+    def in_draw_order(self, nodes):
+        """Indexed nodes sorted bottom to top."""
+        return sorted(nodes, key=self.order.__getitem__)
+
+    def query(self, rect):
+        """Nodes whose box may overlap rect, in no particular order."""
+        cx0, cy0, cx1, cy1 = self._cell_span(rect.left, rect.top, rect.right, rect.bottom)
+        found = {}
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            # Zoomed far out: walking the occupied cells is cheaper
+            for (cx, cy), cell in self.cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.update(cell)
+            return found
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return found
+
+    def at(self, pos):
+        """Nodes whose box may contain a world position."""
+        size = self.cell_size
+        return self.cells.get((int(pos[0] // size), int(pos[1] // size)), {})
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+import pygame
+
+import atlas
+from nodes import AndNode, NotNode
+
+
+class TestAtlas(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = atlas.CACHE_DIR, atlas._SPRITES, dict(atlas._LOOSE)
+        atlas.CACHE_DIR = self.tmp.name
+        atlas._SPRITES = None
+        atlas._LOOSE.clear()
+
+    def tearDown(self):
+        atlas.CACHE_DIR, atlas._SPRITES, loose = self.saved
+        atlas._LOOSE.clear()
+        atlas._LOOSE.update(loose)
+        self.tmp.cleanup()
+
+    def test_pack_without_overlap(self):
+        sizes = [(300, 160), (150, 80), (1000, 40), (900, 90), (86, 46)]
+        positions, height = atlas.pack(sizes, width=1200)
+        rects = [pygame.Rect(p, s) for p, s in zip(positions, sizes)]
+        for i, rect in enumerate(rects):
+            self.assertLessEqual(rect.right, 1200)
+            self.assertLessEqual(rect.bottom, height)
+            self.assertEqual(rect.collidelist(rects[i + 1 :]), -1)
+
+    def test_atlas_cached_on_disk(self):
+        sprites = atlas.load_atlas()
+        self.assertEqual(set(sprites), set(atlas.atlas_entries()))
+        self.assertEqual(len([f for f in os.listdir(self.tmp.name)]), 2)
+        # A second start reads the file instead of baking
+        real_bake = atlas.bake
+        atlas.bake = None
+        try:
+            cached = atlas.load_atlas()
+        finally:
+            atlas.bake = real_bake
+        key = next(iter(sprites))
+        self.assertEqual(cached[key].get_size(), sprites[key].get_size())
+
+    def test_gate_sprites(self):
+        gate = AndNode(0, 0)
+        sprite = atlas.gate_sprite(gate.image_file, gate.symbol, gate.rect.size)
+        self.assertEqual(sprite.get_size(), gate.rect.size)
+        self.assertIsNotNone(sprite.get_parent())
+        # Sizes outside the atlas are baked once on demand
+        gate.set_input_count(5)
+        tall = atlas.gate_sprite(gate.image_file, gate.symbol, gate.rect.size)
+        self.assertEqual(tall.get_size(), gate.rect.size)
+        self.assertIs(atlas.gate_sprite(gate.image_file, gate.symbol, gate.rect.size), tall)
+        self.assertIsNone(atlas.gate_sprite("missing.svg", None, (10, 10)))
+
+    def test_sized_svg(self):
+        text = '<svg\n   width="170"\n   height="75" stroke-width="2"><g/></svg>'
+        sized = atlas._sized_svg(text, (300, 160))
+        self.assertIn('width="300"', sized)
+        self.assertIn('viewBox="0 0 170 75"', sized)
+        self.assertIn('stroke-width="2"', sized)
+        entries = atlas.atlas_entries()
+        self.assertIn((NotNode.image_file, NotNode.symbol) + NotNode(0, 0).rect.size, entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
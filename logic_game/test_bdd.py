@@ -0,0 +1,147 @@
+import itertools
+import random
+import unittest
+
+import levels
+from bdd import BDD, FALSE, TRUE, find_counterexample, reference_bdds
+from minimize import minimize_level
+from netlist import Netlist
+from verification import EXHAUSTIVE_MAX_INPUTS, verify_solution
+
+BITS = 8
+
+
+def adder_check(bits):
+    def check(inputs):
+        # Written with bitwise operators so it also runs symbolically
+        a, b, carry = inputs[:bits], inputs[bits : 2 * bits], inputs[2 * bits]
+        out = []
+        for i in range(bits):
+            out.append(a[i] ^ b[i] ^ carry)
+            carry = (a[i] & b[i]) | (carry & (a[i] ^ b[i]))
+        return out + [carry]
+
+    return check
+
+
+check_adder = adder_check(BITS)
+
+
+ADDER_LEVEL = levels.Level(
+    id=100,
+    title="8-Bit Adder",
+    description="",
+    allowed_nodes=[],
+    check_func=check_adder,
+    input_count=2 * BITS + 1,
+    output_count=BITS + 1,
+)
+
+
+def ripple_adder(bits, broken_bit=None):
+    """Saved-solution dict of a ripple carry adder built from XOR/AND/OR."""
+    gates = []
+    connections = []
+    base = 3 * bits + 2
+
+    def gate(node_type, *srcs):
+        idx = base + len(gates)
+        gates.append({"type": node_type, "x": 0, "y": 0})
+        for port, src in enumerate(srcs):
+            connections.append({"from_idx": src, "to_idx": idx, "port_idx": port})
+        return idx
+
+    carry = 2 * bits
+    for i in range(bits):
+        a, b = i, bits + i
+        half = gate("XorNode", a, b)
+        total = gate("XorNode", half, carry)
+        if i == broken_bit:
+            carry = gate("AndNode", a, b)
+        else:
+            carry = gate("OrNode", gate("AndNode", a, b), gate("AndNode", half, carry))
+        connections.append({"from_idx": total, "to_idx": 2 * bits + 1 + i, "port_idx": 0})
+    connections.append({"from_idx": carry, "to_idx": 3 * bits + 1, "port_idx": 0})
+    return {"user_nodes": gates, "connections": connections}
+
+
+class TestBDD(unittest.TestCase):
+    def test_canonical_nodes(self):
+        bdd = BDD(2)
+        a, b = bdd.var(0), bdd.var(1)
+        # De Morgan: NOT(A AND B) == NOT A OR NOT B
+        self.assertEqual(
+            bdd.not_(bdd.and_(a, b)), bdd.or_(bdd.not_(a), bdd.not_(b))
+        )
+        self.assertEqual(bdd.xor(a, a), FALSE)
+        self.assertEqual(bdd.or_(a, bdd.not_(a)), TRUE)
+
+    def test_satisfy_one_is_smallest_pattern(self):
+        bdd = BDD(3)
+        f = bdd.and_(bdd.var(1), bdd.or_(bdd.var(0), bdd.var(2)))
+        first = next(
+            c for c in itertools.product([False, True], repeat=3) if bdd.evaluate(f, c)
+        )
+        self.assertEqual(bdd.satisfy_one(f), first)
+
+    def test_satisfy_one_ignores_variable_order(self):
+        rng = random.Random(5)
+        for _ in range(20):
+            order = list(range(5))
+            rng.shuffle(order)
+            bdd = BDD(5, order)
+            f = FALSE
+            for _ in range(3):
+                a, b, c = (bdd.var(rng.randrange(5)) for _ in range(3))
+                f = bdd.or_(f, bdd.and_(bdd.xor(a, b), bdd.not_(c)))
+            first = next(
+                (c for c in itertools.product([False, True], repeat=5) if bdd.evaluate(f, c)),
+                None,
+            )
+            self.assertEqual(bdd.satisfy_one(f), first)
+
+    def test_enumerated_reference_matches_check_func(self):
+        level = levels.LEVELS[8]  # Full Adder, not symbolic
+        bdd = BDD(level.input_count)
+        refs = reference_bdds(bdd, level)
+        for inputs in itertools.product([False, True], repeat=3):
+            self.assertEqual(
+                [bdd.evaluate(r, inputs) for r in refs], level.expected_outputs(inputs)
+            )
+
+
+class TestEquivalence(unittest.TestCase):
+    def test_levels_match_minimized_circuits(self):
+        for level in levels.LEVELS:
+            netlist = minimize_level(level).netlist
+            self.assertIsNone(find_counterexample(level, netlist), level.title)
+
+    def test_wide_adder_is_proven(self):
+        self.assertGreater(ADDER_LEVEL.input_count, EXHAUSTIVE_MAX_INPUTS)
+        self.assertTrue(verify_solution(ADDER_LEVEL, ripple_adder(BITS)).passed)
+
+    def test_wide_adder_counterexample(self):
+        result = verify_solution(ADDER_LEVEL, ripple_adder(BITS, broken_bit=3))
+        self.assertFalse(result.passed)
+        self.assertNotEqual(result.actual, result.expected)
+        self.assertEqual(result.expected, check_adder(result.inputs))
+
+    def test_reference_circuit(self):
+        level = levels.Level(
+            id=101,
+            title="Reference",
+            description="",
+            allowed_nodes=[],
+            check_func=check_adder,
+            input_count=2 * BITS + 1,
+            output_count=BITS + 1,
+            reference=ripple_adder(BITS),
+        )
+        netlist = Netlist.from_solution(
+            level.input_count, level.output_count, ripple_adder(BITS, broken_bit=0)
+        )
+        self.assertIsNotNone(find_counterexample(level, netlist))
+
+
+if __name__ == "__main__":
+    unittest.main()
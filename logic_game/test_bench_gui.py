@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from bench_gui import build_scenario, regressions, run_scenario, summarize
+from event_log import EventLog, event_from_dict, event_to_dict
+from main import Game
+
+
+class TestBenchGui(unittest.TestCase):
+    def setUp(self):
+        self.home = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.home)
+        self.tmp.cleanup()
+
+    def test_build_scenario_solves_level(self):
+        game = Game()
+        times = run_scenario(game, build_scenario, hold=4)
+        self.assertEqual(len(times), summarize(times)["frames"])
+        self.assertEqual(game.max_unlocked_idx, 1)
+
+    def test_event_log_round_trip(self):
+        log = EventLog()
+        events = [
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(3, 4), button=1),
+            pygame.event.Event(pygame.KEYDOWN, key=pygame.K_HOME, mod=0),
+            pygame.event.Event(pygame.WINDOWSHOWN),
+        ]
+        log.record(events)
+        self.assertEqual(len(log.frames[0]), 2)
+        event = event_from_dict(event_to_dict(events[0]))
+        self.assertEqual((event.type, event.pos, event.button), (pygame.MOUSEBUTTONDOWN, (3, 4), 1))
+
+    def test_regressions(self):
+        baseline = {"menu": {"p95_ms": 1.0}}
+        self.assertEqual(regressions({"menu": {"p95_ms": 1.4}}, baseline, 1.5), [])
+        self.assertEqual(len(regressions({"menu": {"p95_ms": 2.0}}, baseline, 1.5)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import pygame
+
+from camera import MAX_ZOOM, Camera
+from nodes import AndNode
+
+
+class TestCamera(unittest.TestCase):
+    def test_round_trip(self):
+        camera = Camera()
+        camera.pan(-300, 120)
+        camera.zoom_at((0, 0), 2)
+        for pos in ((0, 0), (640, 480), (-100, 37)):
+            self.assertEqual(camera.to_world(camera.to_screen(pos)), pos)
+
+    def test_zoom_keeps_point_under_cursor(self):
+        camera = Camera()
+        before = camera.to_world((400, 300))
+        camera.zoom_at((400, 300), 0.25)
+        self.assertEqual(camera.to_world((400, 300)), before)
+        self.assertTrue(camera.lod)
+        camera.zoom_at((400, 300), 1000)
+        self.assertEqual(camera.zoom, MAX_ZOOM)
+
+    def test_frame_fits_rect(self):
+        camera = Camera()
+        world = pygame.Rect(-2000, 500, 10000, 3000)
+        camera.frame(world, (1920, 1080))
+        view = camera.view_rect((1920, 1080))
+        self.assertTrue(view.contains(world))
+        camera.frame(pygame.Rect(0, 0, 100, 100), (1920, 1080))
+        self.assertEqual(camera.zoom, 1.0)
+
+    def test_render_node_restores_world_rect(self):
+        pygame.font.init()
+        surface = pygame.Surface((800, 600))
+        node = AndNode(1000, 1000)
+        ports = [p.rect.copy() for p in node.input_ports]
+        camera = Camera()
+        camera.pan(-900, -900)
+        camera.zoom_at((0, 0), 0.8)
+        camera.render_node(surface, node)
+        self.assertEqual(node.rect.topleft, (1000, 1000))
+        self.assertEqual([p.rect for p in node.input_ports], ports)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import itertools
+import random
+import unittest
+
+import levels
+from codegen import compile_netlist, netlist_source
+from netlist import exhaustive_input_words
+from test_optimize import build, outputs, random_netlist
+from verification import verify_netlist
+
+
+class TestCodegen(unittest.TestCase):
+    def test_matches_simulate(self):
+        rng = random.Random(7)
+        for _ in range(30):
+            netlist = random_netlist(rng, rng.randint(1, 6), rng.randint(1, 3), rng.randint(1, 25))
+            words, mask = exhaustive_input_words(netlist.input_count)
+            self.assertEqual(list(compile_netlist(netlist)(words, mask)), outputs(netlist))
+
+    def test_feedback_loop(self):
+        # Cross-coupled NOR latch: settles like Netlist.simulate
+        netlist = build(2, 1, [("NorNode", [0, 4]), ("NorNode", [1, 3])], [3])
+        self.assertIsNone(netlist.topological_order())
+        self.assertIn("for _ in range", netlist_source(netlist))
+        words, mask = exhaustive_input_words(2)
+        self.assertEqual(list(compile_netlist(netlist)(words, mask)), outputs(netlist))
+
+    def test_straight_line_source(self):
+        netlist = build(2, 1, [("NandNode", [0, 1]), ("NotNode", [3])], [4])
+        source = netlist_source(netlist)
+        self.assertIn("v3 = mask ^ (v0 & v1)", source)
+        self.assertNotIn("for ", source)
+
+    def test_cached_per_structure(self):
+        a = build(2, 1, [("XorNode", [0, 1])], [3])
+        b = build(2, 1, [("XorNode", [0, 1])], [3])
+        self.assertIs(compile_netlist(a), compile_netlist(b))
+
+    def test_first_failure_matches_enumeration(self):
+        level = next(l for l in levels.LEVELS if l.input_count >= 2)
+        rng = random.Random(3)
+        for _ in range(10):
+            netlist = random_netlist(rng, level.input_count, level.output_count, 8)
+            result = verify_netlist(level, netlist)
+            expected = None
+            for inputs in itertools.product([False, True], repeat=level.input_count):
+                if netlist.evaluate(inputs) != level.expected_outputs(inputs):
+                    expected = inputs
+                    break
+            self.assertEqual(result.passed, expected is None)
+            if expected is not None:
+                self.assertEqual(result.inputs, expected)
+                self.assertEqual(result.actual, netlist.evaluate(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
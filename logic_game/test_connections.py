@@ -0,0 +1,74 @@
+import unittest
+
+from connections import ConnectionIndex
+from macros import MacroNode
+from nodes import AndNode, InputNode, NotNode, OutputNode
+from test_macros import HALF_ADDER_MACRO
+from test_netlist import connect
+
+
+class TestConnectionIndex(unittest.TestCase):
+    def test_connect_and_disconnect(self):
+        a, b, gate = InputNode(0, 0), InputNode(0, 100), AndNode(300, 0)
+        index = ConnectionIndex()
+        index.rebuild([a, b, gate])
+        self.assertTrue(index.connect(gate, 0, a))
+        self.assertFalse(index.connect(gate, 0, b))
+        self.assertIs(gate.input_ports[0].connected_node, a)
+        self.assertEqual(index.consumers(a), {gate})
+        self.assertEqual(index.targets(a), [(gate, 0)])
+
+        self.assertIs(index.disconnect(gate, 0), a)
+        self.assertIsNone(gate.input_ports[0].connected_node)
+        self.assertEqual(index.consumers(a), set())
+        self.assertIsNone(index.disconnect(gate, 0))
+
+    def test_remove_clears_consumers(self):
+        a, gate, out = InputNode(0, 0), NotNode(300, 0), OutputNode(600, 0)
+        other = AndNode(300, 200)
+        connect(a, gate)
+        connect(gate, out)
+        connect(gate, other, 1)
+        index = ConnectionIndex()
+        index.rebuild([a, gate, out, other])
+        self.assertEqual(set(index.remove(gate)), {out, other})
+        self.assertIsNone(out.input_ports[0].connected_node)
+        self.assertIsNone(other.input_ports[1].connected_node)
+        self.assertEqual(index.consumers(a), set())
+        self.assertEqual(len(index), 3)
+
+    def test_update_after_direct_edits(self):
+        a, gate = InputNode(0, 0), AndNode(300, 0)
+        gate.set_input_count(3)
+        index = ConnectionIndex()
+        index.rebuild([a, gate])
+        index.connect(gate, 2, a)
+        gate.set_input_count(2)
+        index.update(gate)
+        self.assertEqual(index.consumers(a), set())
+
+    def test_direct_rewire_drops_old_fanout(self):
+        a, b, gate = InputNode(0, 0), InputNode(0, 100), NotNode(300, 0)
+        index = ConnectionIndex()
+        index.rebuild([a, b, gate])
+        index.connect(gate, 0, a)
+        gate.input_ports[0].connected_node = b
+        index.update(gate)
+        self.assertEqual(index.targets(a), [])
+        self.assertEqual(index.readers(b), [gate])
+
+    def test_macro_pins_and_readers(self):
+        block = MacroNode(0, 0, **HALF_ADDER_MACRO)
+        out, gate = OutputNode(3000, 0), AndNode(300, 0)
+        connect(block.pins[1], out)
+        connect(block.pins[1], gate, 0)
+        connect(block.pins[1], gate, 1)
+        index = ConnectionIndex()
+        index.rebuild([block, out, gate])
+        self.assertEqual(index.consumers(block), {out, gate})
+        self.assertEqual(index.readers(block.pins[1]), [out, gate])
+        self.assertEqual(index.readers(block.pins[0]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
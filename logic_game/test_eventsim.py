@@ -0,0 +1,142 @@
+import unittest
+
+from eventsim import WHEEL_SIZE, EventSimulator
+from netlist import Netlist
+from nodes import (
+    CLOCK_TICKS,
+    BusMergeNode,
+    ClockNode,
+    DFlipFlopNode,
+    InputNode,
+    NotNode,
+    OutputNode,
+    RegisterNode,
+    SRLatchNode,
+)
+from test_netlist import connect
+
+
+def ripple_counter(bits, period=1):
+    """Counter of DFFs, each clocked by the inverted output of the previous one."""
+    clock = ClockNode(100, 100, period=period)
+    nodes = [clock]
+    flops = []
+    source = clock
+    for i in range(bits):
+        flop, inverted = DFlipFlopNode(300 + 200 * i, 100), NotNode(300 + 200 * i, 300)
+        connect(inverted, flop, 0)
+        connect(flop, inverted)
+        # Rising clock edges for bit 0, falling edges of the previous bit after
+        if i == 0:
+            connect(source, flop, 1)
+        else:
+            connect(inverted_prev, flop, 1)
+        inverted_prev = inverted
+        flops.append(flop)
+        nodes += [flop, inverted]
+    return nodes, flops
+
+
+def count(flops):
+    return sum(1 << i for i, flop in enumerate(flops) if flop.value)
+
+
+class TestEventSimulator(unittest.TestCase):
+    def test_propagation_delay(self):
+        a, out = InputNode(0, 0), OutputNode(800, 0)
+        chain = [NotNode(100 * i, 0) for i in range(1, 4)]
+        connect(a, chain[0])
+        connect(chain[0], chain[1])
+        connect(chain[1], chain[2])
+        connect(chain[2], out)
+        sim = EventSimulator([a, out] + chain)
+        sim.run_until(10)
+        self.assertTrue(out.value)
+        a.value = True
+        # Three inverters plus the LED buffer, one tick each
+        sim.run_until(sim.time + 3)
+        self.assertTrue(out.value)
+        sim.run_until(sim.time + 1)
+        self.assertFalse(out.value)
+
+    def test_counter_counts_clock_cycles(self):
+        nodes, flops = ripple_counter(3)
+        sim = EventSimulator(nodes)
+        # Rising edges at 50, 150, ...; sample between them once the ripple
+        # has settled. The power-up state is whatever the first inverters make it.
+        sim.run_until(CLOCK_TICKS // 4)
+        start = count(flops)
+        for cycles in range(1, 20):
+            sim.run_until(cycles * CLOCK_TICKS + CLOCK_TICKS // 4)
+            self.assertEqual(count(flops), (start + cycles) % 8)
+
+    def test_slow_clock_uses_overflow(self):
+        nodes, flops = ripple_counter(2, period=16)
+        self.assertGreater(nodes[0].half_period, WHEEL_SIZE)
+        sim = EventSimulator(nodes)
+        cycle = 16 * CLOCK_TICKS
+        sim.run_until(cycle // 4)
+        start = count(flops)
+        sim.run_until(5 * cycle + cycle // 4)
+        self.assertEqual(count(flops), (start + 5) % 4)
+
+    def test_sr_latch_holds(self):
+        s, r = InputNode(0, 0), InputNode(0, 200)
+        latch = SRLatchNode(200, 100)
+        connect(s, latch, 0)
+        connect(r, latch, 1)
+        sim = EventSimulator([s, r, latch])
+        s.value = True
+        sim.run_until(sim.time + 5)
+        s.value = False
+        sim.run_until(sim.time + 5)
+        self.assertTrue(latch.value)
+        r.value = True
+        sim.run_until(sim.time + 5)
+        self.assertFalse(latch.value)
+
+    def test_register_captures_on_rising_edge(self):
+        bits = [InputNode(0, 100 * i) for i in range(2)]
+        word = BusMergeNode(200, 0, width=2)
+        clock = InputNode(0, 300)
+        register = RegisterNode(400, 0, width=2)
+        connect(bits[0], word, 0)
+        connect(bits[1], word, 1)
+        connect(word, register, 0)
+        connect(clock, register, 1)
+        sim = EventSimulator(bits + [clock, word, register])
+        bits[1].value = True
+        sim.run_until(sim.time + 5)
+        self.assertEqual(register.value, 0)
+        clock.value = True
+        sim.run_until(sim.time + 5)
+        self.assertEqual(register.value, 2)
+        bits[0].value = True
+        sim.run_until(sim.time + 5)
+        self.assertEqual(register.value, 2)
+
+    def test_flip_flop_keeps_capture_before_output_settles(self):
+        d, clock = InputNode(0, 0), InputNode(0, 200)
+        flop = DFlipFlopNode(200, 100)
+        connect(d, flop, 0)
+        connect(clock, flop, 1)
+        sim = EventSimulator([d, clock, flop])
+        d.value = True
+        sim.run_until(sim.time + 5)
+        clock.value = True
+        # Polls the edge without running the scheduled Q event
+        sim.run_until(sim.time)
+        d.value = False
+        sim.run_until(sim.time + 5)
+        self.assertTrue(flop.value)
+
+    def test_netlist_sees_reset_state(self):
+        nodes, flops = ripple_counter(2)
+        netlist = Netlist.from_nodes(nodes)
+        self.assertIsNotNone(netlist.topological_order())
+        values = netlist.simulate([])
+        self.assertEqual([values[i] for i in range(len(netlist))], [0, 0, 1, 0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+
+import fonts
+
+
+class TestFonts(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = fonts.FONT_CACHE_FILE, fonts._PATHS, dict(fonts._FONTS)
+        fonts.FONT_CACHE_FILE = os.path.join(self.tmp.name, "fonts.json")
+        fonts._PATHS = None
+        fonts._FONTS.clear()
+
+    def tearDown(self):
+        fonts.FONT_CACHE_FILE, fonts._PATHS, saved_fonts = self.saved
+        fonts._FONTS.clear()
+        fonts._FONTS.update(saved_fonts)
+        self.tmp.cleanup()
+
+    def test_paths_cached_on_disk(self):
+        first = fonts.font_path("Arial")
+        with open(fonts.FONT_CACHE_FILE) as f:
+            self.assertIn("Arial:0", json.load(f))
+        # A fresh run reads the file instead of searching again
+        fonts._PATHS = None
+        self.assertEqual(fonts.font_path("Arial"), first)
+
+    def test_stale_path_resolved_again(self):
+        with open(fonts.FONT_CACHE_FILE, "w") as f:
+            json.dump({"Arial:0": ["/missing/arial.ttf", False]}, f)
+        self.assertNotEqual(fonts.font_path("Arial")[0], "/missing/arial.ttf")
+
+    def test_fonts_shared_per_size(self):
+        self.assertIs(fonts.get_font(20), fonts.get_font(20))
+        self.assertIsNot(fonts.get_font(20), fonts.get_font(20, bold=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import itertools
+import os
+import pickle
+import tempfile
+import unittest
+
+import generate
+from levels import PLAYGROUND_LEVEL
+from netlist import Netlist
+from netlist_io import load_circuit
+from verification import verify_solution
+
+
+class TestGenerate(unittest.TestCase):
+    def assertComputesCheck(self, circuit):
+        netlist = circuit.netlist()
+        for inputs in itertools.product([False, True], repeat=circuit.input_count):
+            expected = [bool(v) for v in circuit.check_func(inputs)]
+            self.assertEqual(netlist.evaluate(inputs), expected, (circuit.title, inputs))
+
+    def test_small_circuits_match_their_checks(self):
+        for circuit in (
+            generate.random_dag(inputs=5, outputs=3, width=8, depth=4, fanout=2, seed=3),
+            generate.ripple_carry_adder(3),
+            generate.carry_lookahead_adder(5, block=2),
+            generate.mux_tree(2),
+            generate.parity_tree(7, arity=3),
+            generate.comparator(3),
+        ):
+            self.assertComputesCheck(circuit)
+
+    def test_wide_circuits_verify_symbolically(self):
+        adder = generate.carry_lookahead_adder(32)
+        self.assertTrue(verify_solution(adder.level(), adder.solution).passed)
+        # The ripple adder's check is the same function, so the solutions swap
+        ripple = generate.ripple_carry_adder(32)
+        self.assertTrue(verify_solution(ripple.level(), adder.solution).passed)
+        wrong = generate.comparator(16)
+        wrong.solution["connections"].pop()
+        self.assertFalse(verify_solution(wrong.level(), wrong.solution).passed)
+
+    def test_levels_pickle_with_their_own_ids(self):
+        circuits = [
+            generate.random_dag(inputs=5, outputs=3, width=8, depth=4, seed=3),
+            generate.ripple_carry_adder(3),
+            generate.mux_tree(2),
+            generate.parity_tree(7),
+            generate.comparator(3),
+        ]
+        ids = {PLAYGROUND_LEVEL.id}
+        for circuit in circuits:
+            level = pickle.loads(pickle.dumps(circuit.level()))
+            inputs = [True] * level.input_count
+            self.assertEqual(level.check_func(inputs), circuit.check_func(inputs))
+            ids.add(level.id)
+        self.assertEqual(len(ids), len(circuits) + 1)
+
+    def test_dag_shape(self):
+        circuit = generate.random_dag(inputs=8, outputs=4, width=16, depth=5, fanout=3)
+        self.assertEqual(circuit.gate_count, 16 * 5)
+        self.assertEqual(circuit.output_count, 4)
+        again = generate.random_dag(inputs=8, outputs=4, width=16, depth=5, fanout=3)
+        self.assertEqual(again.solution, circuit.solution)
+
+    def test_nodes_and_save_formats(self):
+        circuit = generate.comparator(4)
+        nodes = circuit.nodes()
+        self.assertEqual(
+            Netlist.from_nodes(nodes).structural_hash(),
+            circuit.netlist().structural_hash(),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            for ext in (".v", ".blif", ".json"):
+                path = os.path.join(tmp, "cmp" + ext)
+                circuit.save(path)
+                solution, input_names, output_names = load_circuit(path)
+                self.assertEqual(output_names, ["lt", "eq", "gt"])
+                self.assertTrue(verify_solution(circuit.level(), solution).passed)
+
+
+if __name__ == "__main__":
+    unittest.main()
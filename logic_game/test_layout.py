@@ -0,0 +1,89 @@
+import random
+import time
+import unittest
+
+from layout import (
+    LAYER_SPACING,
+    layered_layout,
+    layout_nodes,
+    layout_solution,
+    longest_path_layers,
+)
+from nodes import InputNode, OutputNode
+from test_bdd import ripple_adder
+from test_macros import full_adder_nodes
+
+
+def crossings(fanin, positions):
+    """Crossing pairs among edges between adjacent columns."""
+    edges = [
+        (positions[s], positions[d]) for d, srcs in enumerate(fanin) for s in srcs
+        if positions[d][0] - positions[s][0] == LAYER_SPACING
+    ]
+    count = 0
+    for i, (a0, a1) in enumerate(edges):
+        for b0, b1 in edges[i + 1 :]:
+            if a0[0] == b0[0] and (a0[1] - b0[1]) * (a1[1] - b1[1]) < 0:
+                count += 1
+    return count
+
+
+class TestLayout(unittest.TestCase):
+    def test_longest_path_layers(self):
+        self.assertEqual(longest_path_layers([[], [0], [], [2], [1, 3]]), [0, 1, 0, 1, 2])
+        # The loop 1 -> 2 -> 1 is cut at node 1
+        self.assertEqual(longest_path_layers([[], [0, 2], [1]]), [0, 1, 2])
+
+    def test_crossings_removed(self):
+        # Two inputs feeding two chains listed across each other
+        fanin = [[], [], [1], [0], [2], [3], [4, 5]]
+        positions = layered_layout(fanin, first=[0, 1], last=[6])
+        self.assertEqual(crossings(fanin, positions), 0)
+        self.assertLess(positions[3][1], positions[2][1])
+        # The input layer keeps its order
+        self.assertLess(positions[0][1], positions[1][1])
+
+    def test_layout_live_nodes(self):
+        nodes = full_adder_nodes()
+        layout_nodes(nodes)
+        a, b, cin, s, cout = nodes[:5]
+        self.assertLess(a.rect.y, b.rect.y)
+        self.assertLess(b.rect.y, cin.rect.y)
+        self.assertLess(s.rect.y, cout.rect.y)
+        self.assertEqual(s.rect.x, max(n.rect.x for n in nodes))
+        for node in nodes:
+            for port in node.input_ports:
+                src = port.connected_node
+                if src is not None and not isinstance(node, OutputNode):
+                    self.assertLess(getattr(src, "owner", src).rect.x, node.rect.x)
+        columns = {}
+        for node in nodes:
+            columns.setdefault(node.rect.x, []).append(node.rect)
+        for rects in columns.values():
+            for i, r in enumerate(rects):
+                self.assertEqual(r.collidelist(rects[i + 1 :]), -1)
+        self.assertTrue(all(isinstance(n, InputNode) for n in nodes if n.rect.x == 250))
+
+    def test_layout_solution(self):
+        adder = ripple_adder(4)
+        layout_solution(9, 5, adder)
+        xs = [n["x"] for n in adder["user_nodes"]]
+        for c in adder["connections"]:
+            if c["from_idx"] >= 14 and c["to_idx"] >= 14:
+                self.assertLess(xs[c["from_idx"] - 14], xs[c["to_idx"] - 14])
+
+    def test_large_graph(self):
+        rng = random.Random(1)
+        fanin = [[] for _ in range(64)]
+        for idx in range(64, 8000):
+            fanin.append(rng.sample(range(max(0, idx - 300), idx), 2))
+        start = time.perf_counter()
+        positions = layered_layout(fanin, first=range(64))
+        self.assertLess(time.perf_counter() - start, 5)
+        for dst, srcs in enumerate(fanin):
+            for src in srcs:
+                self.assertLess(positions[src][0], positions[dst][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
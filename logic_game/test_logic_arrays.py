@@ -0,0 +1,36 @@
+import itertools
+import random
+import unittest
+
+from logic_arrays import LogicArrays
+from netlist import Netlist
+from nodes import AndNode, InputNode, NotNode, OutputNode
+from test_netlist import connect
+from test_optimize import random_netlist
+
+
+class TestLogicArrays(unittest.TestCase):
+    def test_matches_netlist_evaluate(self):
+        rng = random.Random(4)
+        for _ in range(10):
+            netlist = random_netlist(rng, 5, 3, 30)
+            arrays = LogicArrays(netlist)
+            for inputs in itertools.product([False, True], repeat=5):
+                self.assertEqual(arrays.evaluate(inputs), netlist.evaluate(inputs))
+
+    def test_unconnected_ports_and_feedback(self):
+        a, out, loop_out = InputNode(0, 0), OutputNode(600, 0), OutputNode(600, 200)
+        gate, inv = AndNode(300, 0), NotNode(300, 200)
+        connect(a, gate, 0)
+        connect(gate, out)
+        connect(inv, inv)
+        connect(inv, loop_out)
+        netlist = Netlist.from_nodes([a, out, loop_out, gate, inv])
+        arrays = LogicArrays(netlist)
+        self.assertGreater(arrays.rounds, 1)
+        for value in (False, True):
+            self.assertEqual(arrays.evaluate([value]), netlist.evaluate([value]))
+
+
+if __name__ == "__main__":
+    unittest.main()
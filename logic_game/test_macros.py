@@ -0,0 +1,101 @@
+import itertools
+import random
+import unittest
+
+import levels
+from macros import (
+    CompiledMacro,
+    MacroNode,
+    compile_macro,
+    macro_gate_types,
+    make_macro,
+)
+from netlist import Netlist, serialize_circuit
+from nodes import InputNode, NotNode, OrNode, OutputNode
+from test_bdd import adder_check, ripple_adder
+from test_netlist import connect, settle
+from test_verification import HALF_ADDER
+from verification import verify_solution
+
+HALF_ADDER_MACRO = make_macro(levels.LEVELS[7], HALF_ADDER)
+
+
+def full_adder_nodes():
+    """Full adder from two half adder blocks and an OR gate."""
+    a, b, cin = (InputNode(250, 200 + 150 * i) for i in range(3))
+    s, cout = OutputNode(1000, 300), OutputNode(1000, 450)
+    first = MacroNode(450, 250, **HALF_ADDER_MACRO)
+    second = MacroNode(650, 300, **HALF_ADDER_MACRO)
+    carry = OrNode(850, 450)
+    connect(a, first, 0)
+    connect(b, first, 1)
+    connect(first.pins[0], second, 0)
+    connect(cin, second, 1)
+    connect(second.pins[0], s)
+    connect(first.pins[1], carry, 0)
+    connect(second.pins[1], carry, 1)
+    connect(carry, cout)
+    return [a, b, cin, s, cout, first, second, carry]
+
+
+class TestMacros(unittest.TestCase):
+    def test_full_adder_from_half_adders(self):
+        nodes = full_adder_nodes()
+        solution = serialize_circuit(nodes)
+        carry_link = {"from_idx": 5, "to_idx": 7, "port_idx": 0, "from_port": 1}
+        self.assertIn(carry_link, solution["connections"])
+        self.assertTrue(verify_solution(levels.LEVELS[8], solution).passed)
+        # Two XOR + two AND from the blocks, plus the OR
+        self.assertEqual(Netlist.from_solution(3, 2, solution).gate_count, 5)
+
+    def test_interactive_simulation_matches_netlist(self):
+        nodes = full_adder_nodes()
+        inputs, outputs = nodes[:3], nodes[3:5]
+        netlist = Netlist.from_nodes(nodes)
+        for values in itertools.product([False, True], repeat=3):
+            settle(nodes, inputs, values)
+            self.assertEqual(netlist.evaluate(values), [n.value for n in outputs])
+
+    def test_nested_macro_with_unconnected_port(self):
+        full_adder = make_macro(levels.LEVELS[8], serialize_circuit(full_adder_nodes()))
+        self.assertEqual(macro_gate_types(full_adder), {"XorNode", "AndNode", "OrNode"})
+        a = InputNode(250, 200)
+        out, inverted = OutputNode(1000, 300), OutputNode(1000, 450)
+        block = MacroNode(500, 300, **full_adder)
+        connect(a, block, 0)  # B and Cin left open, so Sum = A and Cout = 0
+        negate = NotNode(800, 450)
+        connect(block.pins[1], negate)
+        connect(block.pins[0], out)
+        connect(negate, inverted)
+        nodes = [a, out, inverted, block, negate]
+        netlist = Netlist.from_nodes(nodes)
+        for value in (False, True):
+            settle(nodes, [a], [value])
+            self.assertEqual(netlist.evaluate([value]), [value, True])
+            self.assertEqual([out.value, inverted.value], [value, True])
+
+    def test_instances_share_compiled_body(self):
+        first = MacroNode(0, 0, **HALF_ADDER_MACRO)
+        second = MacroNode(0, 200, **HALF_ADDER_MACRO)
+        self.assertIs(first.compiled, second.compiled)
+        self.assertIsNotNone(first.compiled.table)
+
+    def test_wide_macro_uses_schedule(self):
+        bits = 6
+        compiled = compile_macro(2 * bits + 1, bits + 1, ripple_adder(bits))
+        self.assertIsNone(compiled.table)
+        check = adder_check(bits)
+        rng = random.Random(5)
+        for _ in range(50):
+            inputs = tuple(rng.choice([False, True]) for _ in range(2 * bits + 1))
+            self.assertEqual(list(compiled.evaluate(inputs)), check(inputs))
+
+    def test_table_matches_netlist(self):
+        netlist = Netlist.from_solution(7, 4, ripple_adder(3))
+        compiled = CompiledMacro(netlist)
+        for inputs in itertools.product([False, True], repeat=7):
+            self.assertEqual(list(compiled.evaluate(inputs)), netlist.evaluate(inputs))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import itertools
+import random
+import unittest
+
+import generate
+import levels
+from minimize import (
+    cover_cost,
+    cube_mask,
+    espresso,
+    generate_hint,
+    minimize_level,
+    minimize_table,
+    netlist_truth_tables,
+    level_truth_tables,
+    quine_mccluskey,
+)
+from netlist import exhaustive_input_words
+from verification import verify_solution
+
+
+def covered(cubes, n):
+    words, mask = exhaustive_input_words(n)
+    result = 0
+    for cube in cubes:
+        result |= cube_mask(cube, words, mask)
+    return result
+
+
+class TestMinimization(unittest.TestCase):
+    def test_qm_finds_minimal_cover(self):
+        # Majority of three inputs: AB + AC + BC
+        words, mask = exhaustive_input_words(3)
+        a, b, c = words
+        table = (a & b) | (a & c) | (b & c)
+        cubes = quine_mccluskey(table, 3)
+        self.assertEqual(cover_cost(cubes), (3, 6))
+        self.assertEqual(covered(cubes, 3), table)
+
+    def test_espresso_covers_exactly(self):
+        rng = random.Random(7)
+        for n in (5, 7, 10):
+            table = rng.getrandbits(1 << n)
+            self.assertEqual(covered(espresso(table, n), n), table)
+
+    def test_espresso_matches_qm_on_structured_function(self):
+        words, mask = exhaustive_input_words(6)
+        table = (words[0] & words[1]) | (words[2] & ~words[3] & mask)
+        self.assertEqual(
+            cover_cost(espresso(table, 6)), cover_cost(quine_mccluskey(table, 6))
+        )
+
+    def test_packed_check_matches_enumeration(self):
+        circuits = [generate.comparator(3), generate.mux_tree(2), generate.parity_tree(5)]
+        for level in levels.LEVELS + [c.level() for c in circuits]:
+            expected = [0] * level.output_count
+            combos = itertools.product([False, True], repeat=level.input_count)
+            for p, inputs in enumerate(combos):
+                for k, value in enumerate(level.expected_outputs(inputs)):
+                    expected[k] |= bool(value) << p
+            self.assertEqual(level_truth_tables(level), expected, level.title)
+
+    def test_constant_tables(self):
+        self.assertEqual(minimize_table(0, 3), [])
+        self.assertEqual(minimize_table(0xFF, 3), [(0, 0)])
+
+
+class TestSynthesis(unittest.TestCase):
+    def test_every_level_synthesizes_correctly(self):
+        for level in levels.LEVELS:
+            circuit = minimize_level(level)
+            allowed = {cls.__name__ for cls in level.allowed_nodes}
+            used = {n["type"] for n in circuit.solution["user_nodes"]}
+            self.assertLessEqual(used, allowed, level.title)
+            self.assertTrue(verify_solution(level, circuit.solution).passed)
+            self.assertEqual(
+                netlist_truth_tables(circuit.netlist), level_truth_tables(level)
+            )
+
+    def test_nand_only_level(self):
+        circuit = minimize_level(levels.LEVELS[10])  # NOT from NAND
+        self.assertEqual(circuit.gate_count, 1)
+
+    def test_hint_uses_output_labels(self):
+        hint = generate_hint(levels.LEVELS[7])  # Half Adder
+        self.assertEqual(hint.split("\n")[1], "Carry: A AND B")
+
+    def test_unsupported_gate_set(self):
+        with self.assertRaises(ValueError):
+            minimize_level(levels.LEVELS[0], allowed_nodes=[])
+
+
+if __name__ == "__main__":
+    unittest.main()
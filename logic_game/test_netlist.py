@@ -0,0 +1,106 @@
+import itertools
+import unittest
+
+from netlist import Netlist, serialize_circuit
+from nodes import (
+    AndNode,
+    BusAddNode,
+    BusMergeNode,
+    BusMuxNode,
+    BusNotNode,
+    BusSplitNode,
+    InputNode,
+    NotNode,
+    OutputNode,
+    XorNode,
+)
+
+
+def connect(src, dst, port=0):
+    dst.input_ports[port].connected_node = src
+
+
+def settle(nodes, inputs, values):
+    for node, value in zip(inputs, values):
+        node.value = value
+    for _ in range(50):
+        for node in nodes:
+            node.process_logic()
+
+
+class TestNetlist(unittest.TestCase):
+    def assert_matches_nodes(self, nodes, inputs, outputs):
+        netlist = Netlist.from_nodes(nodes)
+        for values in itertools.product([False, True], repeat=len(inputs)):
+            settle(nodes, inputs, values)
+            self.assertEqual(
+                netlist.evaluate(values), [bool(n.value) for n in outputs], values
+            )
+
+    def test_variadic_gates(self):
+        inputs = [InputNode(250, 200 + 150 * i) for i in range(3)]
+        outputs = [OutputNode(1000, 300), OutputNode(1000, 450)]
+        and3, xor3 = AndNode(500, 300, inputs=3), XorNode(500, 450, inputs=3)
+        for i, node in enumerate(inputs):
+            connect(node, and3, i)
+            connect(node, xor3, i)
+        connect(and3, outputs[0])
+        connect(xor3, outputs[1])
+        nodes = inputs + outputs + [and3, xor3]
+        self.assert_matches_nodes(nodes, inputs, outputs)
+
+    def test_params_round_trip(self):
+        gate = AndNode(500, 300, inputs=4)
+        solution = serialize_circuit([gate])
+        self.assertEqual(solution["user_nodes"][0]["inputs"], 4)
+        two = Netlist.from_solution(0, 0, serialize_circuit([AndNode(500, 300)]))
+        four = Netlist.from_solution(0, 0, solution)
+        self.assertNotEqual(two.structural_hash(), four.structural_hash())
+        self.assertEqual(len(four.fanin[0]), 4)
+
+    def test_bus_adder_lowering(self):
+        # 2-bit A + 2-bit B through bus nodes, split back into 3 output bits
+        inputs = [InputNode(250, 200 + 150 * i) for i in range(4)]
+        outputs = [OutputNode(1000, 300 + 150 * i) for i in range(3)]
+        a, b = BusMergeNode(400, 200, width=2), BusMergeNode(400, 400, width=2)
+        connect(inputs[0], a, 0)
+        connect(inputs[1], a, 1)
+        connect(inputs[2], b, 0)
+        connect(inputs[3], b, 1)
+        total = BusAddNode(600, 300, width=3)
+        connect(a, total, 0)
+        connect(b, total, 1)
+        bits = [BusSplitNode(800, 300 + 100 * i, bit=i) for i in range(3)]
+        for i, split in enumerate(bits):
+            connect(total, split)
+            connect(split, outputs[i])
+        nodes = inputs + outputs + [a, b, total] + bits
+        self.assert_matches_nodes(nodes, inputs, outputs)
+
+    def test_bus_mux_not_and_truthiness(self):
+        inputs = [InputNode(250, 200 + 150 * i) for i in range(3)]
+        outputs = [OutputNode(1000, 300), OutputNode(1000, 450)]
+        a = BusMergeNode(400, 200, width=2)
+        connect(inputs[0], a, 0)
+        inverted = BusNotNode(500, 200, width=2)
+        connect(a, inverted)
+        mux = BusMuxNode(600, 300, width=2)
+        connect(a, mux, 0)
+        connect(inverted, mux, 1)
+        connect(inputs[2], mux, 2)
+        # A bus feeding a single-bit port reads True when any bit is set
+        connect(mux, outputs[0])
+        negated = NotNode(700, 450)
+        connect(mux, negated)
+        connect(negated, outputs[1])
+        nodes = inputs + outputs + [a, inverted, mux, negated]
+        self.assert_matches_nodes(nodes, inputs, outputs)
+
+    def test_bus_netlist_counts_bus_as_one_node(self):
+        merge = BusMergeNode(400, 200, width=8)
+        netlist = Netlist.from_nodes([merge, BusAddNode(600, 200, width=8)])
+        self.assertEqual(netlist.gate_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import io
+import random
+import time
+import unittest
+
+import levels
+from netlist import Netlist, exhaustive_input_words
+from netlist_io import (
+    read_blif,
+    read_native,
+    read_verilog,
+    write_blif,
+    write_native,
+    write_verilog,
+)
+from test_bdd import ripple_adder
+from test_verification import HALF_ADDER
+from verification import verify_solution
+
+ADDER_NAMES = (
+    [f"a{i}" for i in range(4)] + [f"b{i}" for i in range(4)] + ["cin"],
+    [f"s{i}" for i in range(4)] + ["cout"],
+)
+
+
+def truth_table(solution, input_count, output_count):
+    words, mask = exhaustive_input_words(input_count)
+    netlist = Netlist.from_solution(input_count, output_count, solution)
+    values = netlist.simulate(words, mask)
+    return [values[i] for i in netlist.outputs]
+
+
+def round_trip(write, read, solution, input_names, output_names):
+    f = io.StringIO()
+    write(f, solution, input_names, output_names)
+    f.seek(0)
+    return read(f)
+
+
+class TestNetlistIO(unittest.TestCase):
+    def check_round_trip(self, write, read):
+        adder = ripple_adder(4)
+        solution, inputs, outputs = round_trip(write, read, adder, *ADDER_NAMES)
+        self.assertEqual((inputs, outputs), ADDER_NAMES)
+        self.assertEqual(truth_table(solution, 9, 5), truth_table(adder, 9, 5))
+        self.assertEqual(
+            Netlist.from_solution(9, 5, solution).gate_count,
+            Netlist.from_solution(9, 5, adder).gate_count,
+        )
+
+    def test_verilog_round_trip(self):
+        self.check_round_trip(write_verilog, read_verilog)
+
+    def test_blif_round_trip(self):
+        self.check_round_trip(write_blif, read_blif)
+
+    def test_native_round_trip_is_exact(self):
+        names = (["A", "B"], ["Sum", "Carry"])
+        solution, inputs, outputs = round_trip(
+            write_native, read_native, HALF_ADDER, *names
+        )
+        self.assertEqual(solution, HALF_ADDER)
+        self.assertEqual((inputs, outputs), names)
+
+    def test_verilog_subset(self):
+        source = """
+        `timescale 1ns/1ps
+        /* Full adder written three ways */
+        module full_adder(input [1:0] x, input cin, output s, output cout);
+          wire half, c1, c2;
+          xor g1 (half, x[1], x[0]);  // half sum
+          xor (s, half, cin);
+          and #1 g2 (c1, x[1], x[0]), g3 (c2, half, cin);
+          assign cout = ~(~c1 & ~c2) | 1'b0;
+        endmodule
+        """
+        solution, inputs, outputs = read_verilog(io.StringIO(source))
+        self.assertEqual(inputs, ["x[1]", "x[0]", "cin"])
+        self.assertEqual(outputs, ["s", "cout"])
+        self.assertTrue(verify_solution(levels.LEVELS[8], solution).passed)
+
+    def test_blif_covers(self):
+        source = """
+        .model mux
+        .inputs a b \\
+          sel
+        .outputs y n
+        # y = sel ? b : a, written as a generic cover
+        .names a b sel y
+        1-0 1
+        -11 1
+        .names a b n
+        11 0
+        .end
+        """
+        solution, inputs, outputs = read_blif(io.StringIO(source))
+        netlist = Netlist.from_solution(3, 2, solution)
+        for a in (False, True):
+            for b in (False, True):
+                for sel in (False, True):
+                    y, n = netlist.evaluate([a, b, sel])
+                    self.assertEqual(y, b if sel else a)
+                    self.assertEqual(n, not (a and b))
+
+    def test_wide_gates_are_split(self):
+        names = " ".join(f"i{k}" for k in range(20))
+        source = f".inputs {names}\n.outputs y\n.names {names} y\n{'1' * 20} 0\n.end\n"
+        solution, inputs, _ = read_blif(io.StringIO(source))
+        netlist = Netlist.from_solution(20, 1, solution)
+        self.assertTrue(all(len(srcs) <= 8 for srcs in netlist.fanin))
+        self.assertEqual(netlist.evaluate([True] * 20), [False])
+        self.assertEqual(netlist.evaluate([True] * 19 + [False]), [True])
+
+    def test_large_circuit_loads_quickly(self):
+        rng = random.Random(3)
+        inputs = [f"i{k}" for k in range(32)]
+        lines = [f"module big({', '.join(inputs)}, y);", f"input {', '.join(inputs)};"]
+        lines.append("output y;")
+        signals = list(inputs)
+        for k in range(12000):
+            op = rng.choice(["and", "or", "xor", "nand", "nor", "xnor"])
+            a, b = rng.sample(signals[-200:], 2)
+            lines.append(f"{op} g{k} (w{k}, {a}, {b});")
+            signals.append(f"w{k}")
+        lines += [f"assign y = {signals[-1]};", "endmodule"]
+
+        start = time.perf_counter()
+        solution, _, _ = read_verilog(iter(lines))
+        netlist = Netlist.from_solution(32, 1, solution)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(netlist.gate_count, 12000)
+
+        # Written back out and read again, the circuit is unchanged
+        text = io.StringIO()
+        write_verilog(text, solution, inputs, ["y"])
+        text.seek(0)
+        again, _, _ = read_verilog(text)
+        vectors = [[rng.choice([False, True]) for _ in inputs] for _ in range(20)]
+        second = Netlist.from_solution(32, 1, again)
+        for vector in vectors:
+            self.assertEqual(netlist.evaluate(vector), second.evaluate(vector))
+
+
+if __name__ == "__main__":
+    unittest.main()
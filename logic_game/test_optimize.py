@@ -0,0 +1,113 @@
+import random
+import unittest
+
+from netlist import Netlist, exhaustive_input_words
+from optimize import optimize
+from test_bdd import ripple_adder
+
+GATES = ["AndNode", "OrNode", "NandNode", "NorNode", "XorNode", "XnorNode", "NotNode"]
+
+
+def outputs(netlist):
+    words, mask = exhaustive_input_words(netlist.input_count)
+    values = netlist.simulate(words, mask)
+    return [values[i] for i in netlist.outputs]
+
+
+def random_netlist(rng, input_count, output_count, gate_count):
+    """Acyclic random circuit with some unconnected ports and unused gates."""
+    base = input_count + output_count
+    types, params, connections = [], [], []
+    for g in range(gate_count):
+        node_type = rng.choice(GATES)
+        ports = 1 if node_type == "NotNode" else rng.randint(2, 4)
+        types.append(node_type)
+        params.append({"inputs": ports} if ports > 2 else {})
+        for port in range(ports):
+            if rng.random() < 0.9:
+                src = rng.choice(list(range(input_count)) + list(range(base, base + g)))
+                connections.append((src, base + g, port))
+    for k in range(output_count):
+        connections.append((rng.randrange(base, base + gate_count), input_count + k, 0))
+    return Netlist(input_count, output_count, types, connections, params)
+
+
+def build(input_count, output_count, gates, outputs_from):
+    """gates: [(type, [srcs])], indices counted from the first gate at base."""
+    base = input_count + output_count
+    connections = [
+        (src, base + g, port)
+        for g, (_, srcs) in enumerate(gates)
+        for port, src in enumerate(srcs)
+        if src is not None
+    ]
+    connections += [(src, input_count + k, 0) for k, src in enumerate(outputs_from)]
+    return Netlist(input_count, output_count, [t for t, _ in gates], connections)
+
+
+class TestOptimize(unittest.TestCase):
+    def test_constants_fold(self):
+        # Out0 = A AND (unconnected), Out1 = A OR NOT(unconnected NOT)
+        netlist = build(
+            1,
+            2,
+            [("AndNode", [0, None]), ("NotNode", [None]), ("NotNode", [4]), ("OrNode", [0, 5])],
+            [3, 6],
+        )
+        optimized = optimize(netlist)
+        self.assertEqual(outputs(optimized), outputs(netlist))
+        self.assertEqual(optimized.types[3:], ["AndNode", "NandNode"])
+
+    def test_double_negation_and_complements(self):
+        # NOT NOT A, A AND NOT A, A XOR A XOR B
+        netlist = build(
+            2,
+            3,
+            [
+                ("NotNode", [0]),
+                ("NotNode", [5]),
+                ("AndNode", [0, 5]),
+                ("XorNode", [0, 0]),
+                ("XorNode", [8, 1]),
+            ],
+            [6, 7, 9],
+        )
+        optimized = optimize(netlist)
+        self.assertEqual(outputs(optimized), outputs(netlist))
+        self.assertEqual(optimized.fanin[2], [0])
+        self.assertEqual(optimized.fanin[4], [1])
+        self.assertEqual(optimized.gate_count, 1)  # the constant 0
+
+    def test_identical_gates_merge(self):
+        # Two XORs with swapped inputs and an unused AND
+        netlist = build(
+            2,
+            2,
+            [("XorNode", [0, 1]), ("XorNode", [1, 0]), ("AndNode", [0, 1])],
+            [4, 5],
+        )
+        optimized = optimize(netlist)
+        self.assertEqual(optimized.gate_count, 1)
+        self.assertEqual(optimized.fanin[2], optimized.fanin[3])
+
+    def test_random_circuits_stay_equivalent(self):
+        rng = random.Random(4)
+        for _ in range(200):
+            netlist = random_netlist(rng, 5, 3, 25)
+            optimized = optimize(netlist)
+            self.assertEqual(outputs(optimized), outputs(netlist))
+            self.assertLessEqual(optimized.gate_count, netlist.gate_count + 2)
+
+    def test_adder_unchanged(self):
+        netlist = Netlist.from_solution(9, 5, ripple_adder(4))
+        optimized = optimize(netlist)
+        self.assertEqual(optimized.gate_count, netlist.gate_count)
+        self.assertEqual(outputs(optimized), outputs(netlist))
+
+    def test_feedback_loop_untouched(self):
+        netlist = build(1, 1, [("OrNode", [0, 2])], [2])
+        self.assertIs(optimize(netlist), netlist)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+import levels
+from netlist import Netlist
+from parallel_verify import (
+    BLOCK_INPUTS,
+    PARALLEL_MIN_INPUTS,
+    block_words,
+    verify_block,
+    verify_parallel,
+)
+from vector_eval import netlist_evaluator
+from verification import VerificationCache, verify_netlist
+
+INPUTS = BLOCK_INPUTS + 1
+
+
+def check_parity(inputs):
+    # Module level so worker processes can unpickle it
+    return sum(inputs) % 2 == 1
+
+
+PARITY_LEVEL = levels.Level(
+    id=101,
+    title="Parity",
+    description="",
+    allowed_nodes=[],
+    check_func=check_parity,
+    input_count=INPUTS,
+    output_count=1,
+)
+
+
+def parity_netlist(broken=False, inputs=INPUTS):
+    """XOR chain; when broken, also flips the output if in0 and in1 are set."""
+    base = inputs + 1
+    types, connections = [], []
+    prev = 0
+    for i in range(1, inputs):
+        types.append("XorNode")
+        connections += [(prev, base + len(types) - 1, 0), (i, base + len(types) - 1, 1)]
+        prev = base + len(types) - 1
+    if broken:
+        types += ["AndNode", "XorNode"]
+        connections += [(0, base + len(types) - 2, 0), (1, base + len(types) - 2, 1)]
+        connections += [(prev, base + len(types) - 1, 0), (base + len(types) - 2, base + len(types) - 1, 1)]
+        prev = base + len(types) - 1
+    connections.append((prev, inputs, 0))
+    return Netlist(inputs, 1, types, connections)
+
+
+class TestParallelVerify(unittest.TestCase):
+    def test_block_words_fix_leading_inputs(self):
+        words, mask = block_words(4, 0b10, 2)
+        self.assertEqual(words[:2], [mask, 0])
+        self.assertEqual(words[2:], [0b1100, 0b1010])
+
+    def test_blocks_in_process(self):
+        evaluator = netlist_evaluator(parity_netlist(broken=True))
+        self.assertIsNone(verify_block(PARITY_LEVEL, evaluator, 0, BLOCK_INPUTS))
+        inputs, actual, expected = verify_block(PARITY_LEVEL, evaluator, 1, BLOCK_INPUTS)
+        self.assertEqual(inputs, (True, True) + (False,) * (INPUTS - 2))
+        self.assertNotEqual(actual, expected)
+
+    def test_pool_reports_first_failure(self):
+        self.assertTrue(verify_parallel(PARITY_LEVEL, parity_netlist(), workers=2).passed)
+        netlist = parity_netlist(broken=True)
+        result = verify_parallel(PARITY_LEVEL, netlist, workers=2)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.inputs, (True, True) + (False,) * (INPUTS - 2))
+        self.assertEqual(result.passed, verify_netlist(PARITY_LEVEL, netlist).passed)
+
+    def test_unpicklable_check_runs_serially(self):
+        parity = PARITY_LEVEL.check_func
+        level = levels.Level(
+            id=102,
+            title="Parity closure",
+            description="",
+            allowed_nodes=[],
+            check_func=lambda inputs: parity(inputs),
+            input_count=INPUTS,
+            output_count=1,
+        )
+        self.assertTrue(verify_parallel(level, parity_netlist(), workers=2).passed)
+        netlist = parity_netlist(broken=True)
+        result = verify_parallel(level, netlist, workers=2)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.inputs, verify_netlist(level, netlist).inputs)
+
+    def test_cache_job_runs_wide_checks_on_the_pool(self):
+        wide = levels.Level(
+            id=103,
+            title="Wide parity",
+            description="",
+            allowed_nodes=[],
+            check_func=check_parity,
+            input_count=PARALLEL_MIN_INPUTS,
+            output_count=1,
+        )
+        netlist = parity_netlist(inputs=wide.input_count)
+        cache = VerificationCache()
+        job = cache.start(wide, netlist)
+        self.assertIsNotNone(job.pool)
+        self.assertTrue(job.wait().passed)
+        # The finished job recorded its result
+        self.assertIs(cache.start(wide, netlist).result, job.result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import time
+import unittest
+
+from profiler import FrameProfiler, StartupProfiler, percentile
+
+
+def run_frames(profiler, count):
+    for _ in range(count):
+        profiler.start_frame()
+        profiler.mark("events")
+        time.sleep(0.001)
+        profiler.mark("logic")
+        profiler.mark("text")
+        profiler.mark("text")
+        profiler.end_frame({"Nodes": 3})
+
+
+class TestFrameProfiler(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        profiler = FrameProfiler()
+        run_frames(profiler, 3)
+        self.assertEqual(len(profiler.frames), 0)
+
+    def test_phases_accumulate(self):
+        profiler = FrameProfiler()
+        profiler.toggle()
+        run_frames(profiler, 5)
+        self.assertEqual(profiler.phase_names(), ["events", "logic", "text"])
+        means = profiler.phase_means()
+        self.assertGreaterEqual(means["logic"], 1.0)
+        lines = profiler.summary_lines(60.0)
+        self.assertIn("Nodes: 3", lines)
+
+    def test_history_is_bounded(self):
+        profiler = FrameProfiler(history=4)
+        profiler.toggle()
+        run_frames(profiler, 10)
+        self.assertEqual(len(profiler.frames), 4)
+
+    def test_exports(self):
+        profiler = FrameProfiler()
+        profiler.toggle()
+        run_frames(profiler, 3)
+
+        f = io.StringIO()
+        profiler.write_csv(f)
+        rows = list(csv.reader(io.StringIO(f.getvalue())))
+        header = ["frame", "total_ms", "events_ms", "logic_ms", "text_ms"]
+        self.assertEqual(rows[0], header)
+        self.assertEqual(len(rows), 4)
+
+        f = io.StringIO()
+        profiler.write_chrome_trace(f)
+        events = json.loads(f.getvalue())["traceEvents"]
+        # A frame slice plus one slice per mark
+        self.assertEqual(len(events), 3 * 5)
+        self.assertTrue(all(e["ph"] == "X" and e["dur"] >= 0 for e in events))
+
+    def test_percentile(self):
+        values = list(range(100))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0)
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_phases_until_finish(self):
+        profiler = StartupProfiler(time.perf_counter_ns())
+        time.sleep(0.002)
+        profiler.mark("imports")
+        profiler.mark("display")
+        profiler.finish()
+        profiler.mark("later")
+        self.assertEqual([name for name, _ in profiler.spans], ["imports", "display"])
+        self.assertGreaterEqual(profiler.first_frame_ms(), 2.0)
+        self.assertTrue(profiler.summary_lines()[-1].startswith("Time to first frame"))
+
+
+if __name__ == "__main__":
+    unittest.main()
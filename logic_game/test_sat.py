@@ -0,0 +1,91 @@
+import itertools
+import random
+import unittest
+
+import levels
+from minimize import minimize_level
+from netlist import Netlist
+from sat import Solver, find_counterexample
+from test_bdd import ADDER_LEVEL, BITS, adder_check, ripple_adder
+from verification import verify_netlist
+
+
+def brute_force(num_vars, clauses):
+    for bits in itertools.product([False, True], repeat=num_vars):
+        if all(any(bits[abs(l) - 1] == (l > 0) for l in c) for c in clauses):
+            return True
+    return False
+
+
+class TestSolver(unittest.TestCase):
+    def test_random_3sat_matches_brute_force(self):
+        rng = random.Random(3)
+        for _ in range(60):
+            n = rng.randint(3, 10)
+            clauses = [
+                [rng.choice([1, -1]) * rng.randint(1, n) for _ in range(3)]
+                for _ in range(rng.randint(n, 5 * n))
+            ]
+            solver = Solver()
+            for _ in range(n):
+                solver.new_var()
+            for c in clauses:
+                solver.add_clause(c)
+            result = solver.solve()
+            self.assertEqual(result, brute_force(n, clauses))
+            if result:
+                model = solver.model
+                for c in clauses:
+                    self.assertTrue(any(model[abs(l)] == (l > 0) for l in c))
+
+    def test_pigeonhole_is_unsat(self):
+        # 5 pigeons, 4 holes
+        solver = Solver()
+        var = {(p, h): solver.new_var() for p in range(5) for h in range(4)}
+        for p in range(5):
+            solver.add_clause([var[p, h] for h in range(4)])
+        for h in range(4):
+            for p, q in itertools.combinations(range(5), 2):
+                solver.add_clause([-var[p, h], -var[q, h]])
+        self.assertFalse(solver.solve())
+
+    def test_assumptions_keep_solver_reusable(self):
+        solver = Solver()
+        a, b = solver.new_var(), solver.new_var()
+        solver.add_clause([a, b])
+        self.assertFalse(solver.solve([-a, -b]))
+        self.assertTrue(solver.solve([-a]))
+        self.assertTrue(solver.model[b])
+
+
+class TestMiter(unittest.TestCase):
+    def test_correct_wide_adder(self):
+        netlist = Netlist.from_solution(
+            ADDER_LEVEL.input_count, ADDER_LEVEL.output_count, ripple_adder(BITS)
+        )
+        self.assertIsNone(find_counterexample(ADDER_LEVEL, netlist))
+
+    def test_counterexample_is_first_failing_combination(self):
+        # A 3-bit adder is small enough to compare against enumeration
+        level = levels.Level(
+            id=102,
+            title="3-Bit Adder",
+            description="",
+            allowed_nodes=[],
+            check_func=adder_check(3),
+            input_count=7,
+            output_count=4,
+        )
+        netlist = Netlist.from_solution(7, 4, ripple_adder(3, broken_bit=1))
+        expected = verify_netlist(level, netlist)
+        self.assertFalse(expected.passed)
+        self.assertEqual(find_counterexample(level, netlist), expected.inputs)
+
+    def test_non_symbolic_level_needs_reference(self):
+        level = levels.LEVELS[8]  # Full Adder uses `and`/`or`
+        with self.assertRaises(ValueError):
+            find_counterexample(level, minimize_level(level).netlist)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import itertools
+import random
+import unittest
+
+from optimize import optimize
+from signature import fingerprint, find_mismatch, level_signature, netlist_signature
+from test_optimize import random_netlist
+from test_parallel_verify import INPUTS, PARITY_LEVEL, parity_netlist
+from verification import quick_reject, verify_netlist
+
+
+class TestSignature(unittest.TestCase):
+    def test_correct_circuit_matches(self):
+        netlist = parity_netlist()
+        self.assertEqual(netlist_signature(netlist), level_signature(PARITY_LEVEL))
+        self.assertIsNone(find_mismatch(PARITY_LEVEL, netlist))
+        self.assertFalse(quick_reject(PARITY_LEVEL, netlist))
+
+    def test_wrong_circuit_rejected_early(self):
+        netlist = parity_netlist(broken=True)
+        inputs = find_mismatch(PARITY_LEVEL, netlist)
+        self.assertIsNotNone(inputs)
+        self.assertNotEqual(netlist.evaluate(inputs), PARITY_LEVEL.expected_outputs(inputs))
+        self.assertTrue(quick_reject(PARITY_LEVEL, netlist))
+        # Reported failure is the first in product order, not the random pattern
+        first = next(
+            combo
+            for combo in itertools.product([False, True], repeat=INPUTS)
+            if netlist.evaluate(combo) != PARITY_LEVEL.expected_outputs(combo)
+        )
+        result = verify_netlist(PARITY_LEVEL, netlist)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.inputs, first)
+        self.assertNotEqual(result.inputs, inputs)
+
+    def test_fingerprint_follows_function(self):
+        rng = random.Random(2)
+        netlist = random_netlist(rng, INPUTS, 2, 30)
+        same = fingerprint(netlist_signature(optimize(netlist)))
+        self.assertEqual(fingerprint(netlist_signature(netlist)), same)
+        self.assertNotEqual(
+            fingerprint(netlist_signature(parity_netlist())),
+            fingerprint(netlist_signature(parity_netlist(broken=True))),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import time
+import unittest
+
+from nodes import CLOCK_TICKS, InputNode, NotNode, OutputNode
+from simthread import SimulationWorker, clone_nodes, output_pins
+from test_eventsim import ripple_counter
+from test_netlist import connect
+from waveform import WaveformRecorder
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class TestSimulationWorker(unittest.TestCase):
+    def setUp(self):
+        self.worker = SimulationWorker(clock_hz=1000)
+        self.worker.start()
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def snapshot_time(self):
+        snapshot = self.worker.snapshot
+        return snapshot.time if snapshot else -1
+
+    def test_runs_without_touching_game_nodes(self):
+        nodes, flops = ripple_counter(3)
+        self.worker.load(1, nodes)
+        self.assertTrue(wait_for(lambda: self.snapshot_time() > 20 * CLOCK_TICKS))
+        # The worker simulates a copy; the game's nodes only change when it
+        # applies a snapshot
+        self.assertFalse(any(flop.value for flop in flops))
+        snapshot = self.worker.snapshot
+        self.assertEqual(len(snapshot.values), len(output_pins(nodes)))
+
+    def test_input_commands(self):
+        a, out = InputNode(0, 0), OutputNode(400, 0)
+        inverted = NotNode(200, 0)
+        connect(a, inverted)
+        connect(inverted, out)
+        nodes = [a, out, inverted]
+        self.worker.load(1, nodes)
+        self.assertTrue(wait_for(lambda: self.snapshot_time() > 10))
+        self.assertTrue(self.worker.snapshot.values[1])
+        self.worker.set_input(0, True)
+        self.assertTrue(wait_for(lambda: not self.worker.snapshot.values[1]))
+
+    def test_recorder_is_locked_while_stepping(self):
+        nodes, _ = ripple_counter(2)
+        recorder = WaveformRecorder()
+        self.worker.load(1, nodes, recorder)
+        self.assertTrue(wait_for(lambda: self.snapshot_time() > 0))
+        with recorder.lock:
+            # Lets a step finished just before publish its snapshot
+            time.sleep(0.01)
+            frozen = self.snapshot_time()
+            time.sleep(0.05)
+            self.assertEqual(self.snapshot_time(), frozen)
+        self.assertTrue(wait_for(lambda: self.snapshot_time() > frozen))
+
+    def test_reload_keeps_time_and_traces(self):
+        nodes, _ = ripple_counter(1)
+        recorder = WaveformRecorder()
+        self.worker.load(1, nodes, recorder)
+        self.assertTrue(wait_for(lambda: self.snapshot_time() > 0))
+        first = self.worker.snapshot.time
+        self.worker.load(2, nodes, recorder)
+        self.assertTrue(wait_for(lambda: self.worker.snapshot.version == 2))
+        self.assertGreaterEqual(self.worker.snapshot.time, first)
+        # Traces are keyed by the game's pins, not the worker's copies
+        self.assertIn(nodes[0], recorder.traces)
+        self.assertEqual(len(recorder.traces), len(output_pins(nodes)))
+
+
+class TestCloneNodes(unittest.TestCase):
+    def test_long_chain(self):
+        nodes = [InputNode(0, 0)]
+        for _ in range(5000):
+            gate = NotNode(0, 0)
+            connect(nodes[-1], gate)
+            nodes.append(gate)
+        clones = clone_nodes(nodes)
+        self.assertIs(clones[-1].input_ports[0].connected_node, clones[-2])
+        self.assertIsNot(clones[-1].input_ports[0], nodes[-1].input_ports[0])
+        self.assertIsNot(clones[-1].rect, nodes[-1].rect)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+import pygame
+
+from macros import MacroNode
+from nodes import AndNode, InputNode, OutputNode
+from connections import ConnectionIndex
+from spatial import CELL_SIZE, SpatialIndex
+from test_macros import HALF_ADDER_MACRO
+from test_netlist import connect
+
+
+def indexed(nodes):
+    connections = ConnectionIndex()
+    connections.rebuild(nodes)
+    index = SpatialIndex(connections)
+    index.rebuild(nodes)
+    return index
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def test_query_finds_nodes_and_wires_in_view(self):
+        a = InputNode(0, 0)
+        far = AndNode(5000, 5000)
+        connect(a, far, 0)
+        index = indexed([a, far])
+        # The wire from a to far crosses a view that contains neither node
+        self.assertIn(far, index.query(pygame.Rect(2500, 2500, 100, 100)))
+        self.assertNotIn(a, index.query(pygame.Rect(2500, 2500, 100, 100)))
+        self.assertNotIn(far, index.query(pygame.Rect(-3000, 2500, 100, 100)))
+
+    def test_moved_updates_outgoing_wires(self):
+        a, gate = InputNode(0, 0), AndNode(300, 0)
+        connect(a, gate, 0)
+        index = indexed([a, gate])
+        a.rect.topleft = (0, 4000)
+        a.update()
+        index.moved(a)
+        self.assertIn(gate, index.query(pygame.Rect(100, 2000, 50, 50)))
+        self.assertEqual(set(index.at((10, 4010))), {a, gate})
+
+        index.connections.disconnect(gate, 0)
+        index.update(gate)
+        self.assertNotIn(gate, index.query(pygame.Rect(100, 2000, 50, 50)))
+        self.assertEqual(index.connections.consumers(a), set())
+
+    def test_draw_order(self):
+        nodes = [AndNode(10 * i, 0) for i in range(4)]
+        index = indexed(nodes)
+        self.assertEqual(index.in_draw_order(index.at((20, 20))), nodes)
+        index.raise_node(nodes[1])
+        index.remove(nodes[2])
+        late = AndNode(50, 0)
+        index.update(late)
+        self.assertEqual(
+            index.in_draw_order(index.at((20, 20))), [nodes[0], nodes[3], nodes[1], late]
+        )
+
+    def test_macro_pins_belong_to_their_macro(self):
+        block = MacroNode(0, 0, **HALF_ADDER_MACRO)
+        out = OutputNode(3000, 0)
+        connect(block.pins[1], out)
+        index = indexed([block, out])
+        self.assertEqual(index.connections.consumers(block), {out})
+
+    def test_query_matches_brute_force(self):
+        rng = random.Random(2)
+        nodes = [AndNode(rng.randrange(20000), rng.randrange(20000)) for _ in range(2000)]
+        index = indexed(nodes)
+        for _ in range(20):
+            view = pygame.Rect(rng.randrange(20000), rng.randrange(20000), 1920, 1080)
+            found = index.query(view)
+            expected = {n for n in nodes if n.rect.inflate(20, 20).colliderect(view)}
+            self.assertLessEqual(expected, set(found))
+            # Never more than one cell of slack around the view
+            slack = view.inflate(4 * CELL_SIZE, 4 * CELL_SIZE)
+            self.assertTrue(all(n.rect.colliderect(slack) for n in found))
+
+
+if __name__ == "__main__":
+    unittest.main()
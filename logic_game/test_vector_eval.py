@@ -0,0 +1,60 @@
+import random
+import unittest
+
+import vector_eval
+from codegen import compile_netlist
+from netlist import exhaustive_input_words
+from test_optimize import build, outputs, random_netlist
+from vector_eval import VectorEvaluator, levelize, netlist_evaluator
+
+
+class TestLevelize(unittest.TestCase):
+    def test_groups_by_depth_and_op(self):
+        # Two ANDs at depth 1, one NAND at depth 1, one OR at depth 2
+        netlist = build(
+            2,
+            1,
+            [("AndNode", [0, 1]), ("AndNode", [1, 0]), ("NandNode", [0, 1]), ("OrNode", [3, 4])],
+            [6],
+        )
+        groups = levelize(netlist)
+        ops = [(base, inverted, sorted(dsts)) for base, inverted, dsts, _ in groups]
+        self.assertEqual(
+            ops,
+            [("AND", False, [3, 4]), ("AND", True, [5]), ("OR", False, [6]), ("BUF", False, [2])],
+        )
+
+    def test_unconnected_ports_read_zero_wire(self):
+        netlist = build(1, 1, [("OrNode", [0, None])], [2])
+        _, _, dsts, srcs = levelize(netlist)[0]
+        self.assertEqual(dsts, [2])
+        self.assertEqual(srcs, [[0], [len(netlist)]])
+
+    def test_feedback_loop_rejected(self):
+        netlist = build(2, 1, [("NorNode", [0, 4]), ("NorNode", [1, 3])], [3])
+        with self.assertRaises(ValueError):
+            levelize(netlist)
+        self.assertIs(netlist_evaluator(netlist), compile_netlist(netlist))
+
+
+@unittest.skipIf(vector_eval.np is None, "NumPy is not installed")
+class TestVectorEvaluator(unittest.TestCase):
+    def test_matches_simulate(self):
+        rng = random.Random(11)
+        for _ in range(30):
+            # Up to 8 inputs spans several 64-bit words per wire
+            netlist = random_netlist(rng, rng.randint(1, 8), rng.randint(1, 3), rng.randint(1, 40))
+            words, mask = exhaustive_input_words(netlist.input_count)
+            self.assertEqual(list(VectorEvaluator(netlist)(words, mask)), outputs(netlist))
+
+    def test_large_circuits_use_vectors(self):
+        rng = random.Random(5)
+        netlist = random_netlist(rng, 10, 4, vector_eval.VECTOR_MIN_GATES)
+        evaluator = netlist_evaluator(netlist)
+        self.assertIsInstance(evaluator, VectorEvaluator)
+        words, mask = exhaustive_input_words(10)
+        self.assertEqual(list(evaluator(words, mask)), outputs(netlist))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+import levels
+from nodes import InputNode, OutputNode, XorNode, AndNode
+from netlist import Netlist, serialize_circuit
+from verification import VerificationCache, verify_solution, verify_solutions
+
+# Half adder: Sum = A XOR B, Carry = A AND B
+HALF_ADDER = {
+    "user_nodes": [
+        {"type": "XorNode", "x": 500, "y": 300},
+        {"type": "AndNode", "x": 500, "y": 450},
+    ],
+    "connections": [
+        {"from_idx": 0, "to_idx": 4, "port_idx": 0},
+        {"from_idx": 1, "to_idx": 4, "port_idx": 1},
+        {"from_idx": 0, "to_idx": 5, "port_idx": 0},
+        {"from_idx": 1, "to_idx": 5, "port_idx": 1},
+        {"from_idx": 4, "to_idx": 2, "port_idx": 0},
+        {"from_idx": 5, "to_idx": 3, "port_idx": 0},
+    ],
+}
+
+
+class TestStructuralHash(unittest.TestCase):
+    def build_nodes(self, dx=0):
+        a, b = InputNode(250, 200), InputNode(250, 350)
+        s, c = OutputNode(1000, 300), OutputNode(1000, 450)
+        xor, and_ = XorNode(500 + dx, 300), AndNode(500, 450 + dx)
+        xor.input_ports[0].connected_node = a
+        xor.input_ports[1].connected_node = b
+        and_.input_ports[0].connected_node = a
+        and_.input_ports[1].connected_node = b
+        s.input_ports[0].connected_node = xor
+        c.input_ports[0].connected_node = and_
+        return [a, b, s, c, xor, and_]
+
+    def test_positions_are_ignored(self):
+        h1 = Netlist.from_nodes(self.build_nodes()).structural_hash()
+        h2 = Netlist.from_nodes(self.build_nodes(dx=123)).structural_hash()
+        self.assertEqual(h1, h2)
+
+    def test_live_and_saved_forms_match(self):
+        nodes = self.build_nodes()
+        live = Netlist.from_nodes(nodes)
+        saved = Netlist.from_solution(2, 2, serialize_circuit(nodes))
+        self.assertEqual(live.structural_hash(), saved.structural_hash())
+        self.assertEqual(
+            live.structural_hash(),
+            Netlist.from_solution(2, 2, HALF_ADDER).structural_hash(),
+        )
+
+    def test_wiring_changes_hash(self):
+        nodes = self.build_nodes()
+        before = Netlist.from_nodes(nodes).structural_hash()
+        nodes[4].input_ports[1].connected_node = None
+        self.assertNotEqual(before, Netlist.from_nodes(nodes).structural_hash())
+
+    def test_cone_hashes_follow_edits(self):
+        nodes = self.build_nodes()
+        before = Netlist.from_nodes(nodes).cone_hashes()
+        nodes[5].input_ports[1].connected_node = None
+        after = Netlist.from_nodes(nodes).cone_hashes()
+        self.assertEqual(before[0], after[0])
+        self.assertNotEqual(before[1], after[1])
+
+
+class TestVerification(unittest.TestCase):
+    def setUp(self):
+        self.level = levels.LEVELS[7]  # Half Adder
+
+    def test_correct_solution_passes(self):
+        self.assertTrue(verify_solution(self.level, HALF_ADDER).passed)
+
+    def test_failure_reports_first_combination(self):
+        broken = dict(HALF_ADDER, connections=HALF_ADDER["connections"][:-1])
+        result = verify_solution(self.level, broken)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.inputs, (True, True))
+        self.assertEqual(result.actual, [False, False])
+        self.assertEqual(result.expected, [False, True])
+
+    def test_cache_hits_on_unchanged_circuit(self):
+        cache = VerificationCache()
+        verify_solution(self.level, HALF_ADDER, cache)
+        verify_solution(self.level, HALF_ADDER, cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_cache_round_trip(self):
+        cache = VerificationCache()
+        verify_solution(self.level, HALF_ADDER, cache)
+        restored = VerificationCache(cache.to_dict())
+        self.assertTrue(verify_solution(self.level, HALF_ADDER, restored).passed)
+        self.assertEqual(restored.hits, 1)
+
+    def test_only_changed_cones_are_rechecked(self):
+        # Sum built from OR is wrong; the carry output is still proven
+        wrong_sum = dict(
+            HALF_ADDER,
+            user_nodes=[{"type": "OrNode", "x": 500, "y": 300}] + HALF_ADDER["user_nodes"][1:],
+        )
+        cache = VerificationCache()
+        result = verify_solution(self.level, wrong_sum, cache)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.proven, [1])
+        result = verify_solution(self.level, HALF_ADDER, cache)
+        self.assertTrue(result.passed)
+        self.assertEqual(result.proven, [0])
+
+    def test_bulk_deduplicates(self):
+        moved = dict(
+            HALF_ADDER,
+            user_nodes=[dict(n, x=n["x"] + 40) for n in HALF_ADDER["user_nodes"]],
+        )
+        cache = VerificationCache()
+        results = verify_solutions(self.level, [HALF_ADDER, moved, HALF_ADDER], cache)
+        self.assertTrue(all(r.passed for r in results))
+        self.assertEqual(cache.misses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import unittest
+
+from eventsim import EventSimulator
+from nodes import CLOCK_TICKS, BusMergeNode, InputNode, NotNode, OutputNode
+from test_eventsim import ripple_counter
+from test_netlist import connect
+from waveform import Trace, WaveformRecorder
+
+
+class TestTrace(unittest.TestCase):
+    def test_ring_buffer_keeps_newest(self):
+        trace = Trace("x", capacity=4)
+        for t in range(10):
+            trace.append(t, t % 2)
+        times, values = trace.samples()
+        self.assertEqual(list(times), [6, 7, 8, 9])
+        self.assertEqual(list(values), [0, 1, 0, 1])
+        self.assertEqual(trace.last_value, 1)
+
+    def test_window(self):
+        trace = Trace("x")
+        for t, v in [(0, 0), (10, 1), (20, 0)]:
+            trace.append(t, v)
+        self.assertEqual(trace.window(15), (1, [(20, 0)]))
+        self.assertEqual(trace.window(0), (0, [(10, 1), (20, 0)]))
+
+
+class TestRecorder(unittest.TestCase):
+    def test_records_only_transitions(self):
+        nodes, flops = ripple_counter(2)
+        recorder = WaveformRecorder(capacity=None)
+        sim = EventSimulator(nodes, recorder=recorder)
+        sim.run_until(10 * CLOCK_TICKS)
+        clock = recorder.traces[nodes[0]]
+        # Initial value plus one change per half period
+        self.assertEqual(len(clock), 1 + 20)
+        bit1 = recorder.traces[flops[1]]
+        self.assertEqual(len(set(bit1.values)), 2)
+        self.assertLess(len(bit1), len(clock))
+
+    def test_disabled_recorder(self):
+        nodes, _ = ripple_counter(2)
+        sim = EventSimulator(nodes)
+        sim.run_until(5 * CLOCK_TICKS)
+        self.assertIsNone(sim.recorder)
+
+    def test_traces_survive_rebuild(self):
+        a, out = InputNode(0, 0), OutputNode(400, 0)
+        connect(a, out)
+        recorder = WaveformRecorder()
+        sim = EventSimulator([a, out], recorder=recorder)
+        sim.run_until(10)
+        a.value = True
+        sim = EventSimulator([a, out], recorder=recorder, start_time=sim.time)
+        sim.run_until(20)
+        self.assertEqual(list(recorder.traces[out].times), [0, 11])
+
+    def test_vcd_export(self):
+        a = InputNode(0, 0)
+        word = BusMergeNode(200, 0, width=2)
+        inverted = NotNode(200, 200)
+        connect(a, word, 1)
+        connect(a, inverted)
+        recorder = WaveformRecorder()
+        sim = EventSimulator([a, word, inverted], recorder=recorder)
+        sim.run_until(5)
+        a.value = True
+        sim.run_until(10)
+        f = io.StringIO()
+        recorder.write_vcd(f)
+        vcd = f.getvalue()
+        self.assertIn("$var wire 1 ! Input_0 $end", vcd)
+        self.assertIn('$var wire 2 " MERGE_1 $end', vcd)
+        self.assertIn("$enddefinitions $end", vcd)
+        # Input rises at 5, the merged word follows one tick later
+        self.assertIn("#5\n1!\n", vcd)
+        self.assertIn('#6\nb10 "\n0#\n', vcd)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy the generated evaluator is used
+    np = None
+
+from codegen import compile_netlist
+
+# Below this many gates the generated straight-line evaluator is faster than
+# paying NumPy's per-call overhead on every group
+VECTOR_MIN_GATES = 2000
+
+# NOT is a one-input inverted buffer, so it shares its groups with BUF
+_BASE_OPS = {
+    "BUF": ("BUF", False),
+    "NOT": ("BUF", True),
+    "AND": ("AND", False),
+    "NAND": ("AND", True),
+    "OR": ("OR", False),
+    "NOR": ("OR", True),
+    "XOR": ("XOR", False),
+    "XNOR": ("XOR", True),
+}
+
+if np is not None:
+    # Bitwise reduction over the ports axis of a gathered group
+    _REDUCE = {
+        "BUF": lambda rows, axis: rows[0].copy(),
+        "AND": np.bitwise_and.reduce,
+        "OR": np.bitwise_or.reduce,
+        "XOR": np.bitwise_xor.reduce,
+    }
+
+# Vector evaluators keyed by structural hash
+_VECTORIZED = {}
+
+
+def levelize(netlist):
+    """
+    Groups the gates of an acyclic single-bit netlist by topological depth,
+    base op, inversion and input count. Returns [(op, inverted, dsts, srcs)]
+    in evaluation order, where srcs[port][k] feeds dsts[k] and unconnected
+    ports read the constant-zero wire len(netlist).
+    """
+    order = netlist.topological_order()
+    if order is None:
+        raise ValueError("Circuits with feedback loops cannot be levelized")
+    zero = len(netlist)
+    depth = [0] * len(netlist)
+    groups = {}
+    for idx in order:
+        op, srcs = netlist.primitive(idx)
+        if op == "CONST0":
+            # Wires start at zero and nothing else writes this one
+            continue
+        depth[idx] = 1 + max((depth[s] for s in srcs if s is not None), default=0)
+        base, inverted = _BASE_OPS[op]
+        group = groups.setdefault((depth[idx], base, inverted, len(srcs)), ([], []))
+        group[0].append(idx)
+        group[1].append([s if s is not None else zero for s in srcs])
+    return [
+        (base, inverted, dsts, [list(port) for port in zip(*rows)])
+        for (_, base, inverted, _), (dsts, rows) in sorted(groups.items())
+    ]
+
+
+class VectorEvaluator:
+    """
+    Levelized evaluation of a netlist over bit-parallel words with NumPy.
+
+    Every wire is a row of 64-bit words in one value array. Each group of
+    same-depth, same-op gates is one gather of its source rows, one bitwise
+    reduction and one scatter into its destination rows. Called like the
+    generated evaluator: evaluator(words, mask) -> tuple of output words.
+    """
+
+    def __init__(self, netlist):
+        if np is None:
+            raise ImportError("VectorEvaluator requires NumPy")
+        netlist = netlist.bit_level()
+        self.input_count = netlist.input_count
+        self.wire_count = len(netlist) + 1
+        self.outputs = np.array(list(netlist.outputs), dtype=np.intp)
+        self.groups = [
+            (
+                _REDUCE[base],
+                inverted,
+                np.array(dsts, dtype=np.intp),
+                np.array(srcs, dtype=np.intp),
+            )
+            for base, inverted, dsts, srcs in levelize(netlist)
+        ]
+
+    def __call__(self, input_words, mask):
+        width = max(1, (mask.bit_length() + 63) // 64)
+        values = np.zeros((self.wire_count, width), dtype=np.uint64)
+        for i, word in enumerate(input_words):
+            values[i] = np.frombuffer(word.to_bytes(width * 8, "little"), dtype="<u8")
+
+        for reduce, inverted, dsts, srcs in self.groups:
+            # srcs is (ports, gates); the gather is (ports, gates, width)
+            result = reduce(values[srcs], axis=0)
+            if inverted:
+                np.invert(result, out=result)
+            values[dsts] = result
+
+        return tuple(
+            int.from_bytes(values[i].astype("<u8").tobytes(), "little") & mask
+            for i in self.outputs
+        )
+
+
+def netlist_evaluator(netlist):
+    """
+    Best evaluator for a netlist: the levelized NumPy one for large acyclic
+    circuits, the generated straight-line one otherwise.
+    """
+    netlist = netlist.bit_level()
+    if (
+        np is not None
+        and netlist.gate_count >= VECTOR_MIN_GATES
+        and netlist.topological_order() is not None
+    ):
+        key = netlist.structural_hash()
+        if key not in _VECTORIZED:
+            _VECTORIZED[key] = VectorEvaluator(netlist)
+        return _VECTORIZED[key]
+    return compile_netlist(netlist)
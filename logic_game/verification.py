@@ -0,0 +1,356 @@
+import argparse
+import json
+
+import levels
+import bdd
+import parallel_verify
+import sat
+from minimize import level_truth_tables
+from netlist import Netlist, exhaustive_input_words
+from netlist_io import load_circuit
+from optimize import optimize
+from signature import SIGNATURE_PATTERNS, find_mismatch, fingerprint, netlist_signature
+from vector_eval import netlist_evaluator
+
+# Above this many inputs the combinations are no longer enumerated; the
+# circuit is proven equivalent with BDDs, or SAT when the BDDs grow too big.
+EXHAUSTIVE_MAX_INPUTS = 16
+
+LEVELS_BY_ID = {level.id: level for level in levels.LEVELS}
+
+# Packed expected outputs keyed by (check_func, input count, output count)
+_EXPECTED = {}
+
+
+class VerificationResult:
+    def __init__(self, passed, inputs=None, actual=None, expected=None, proven=()):
+        self.passed = passed
+        # First failing combination, only set when passed is False
+        self.inputs = inputs
+        self.actual = actual
+        self.expected = expected
+        # Positions of the checked outputs shown correct for every combination
+        self.proven = list(proven)
+
+    @property
+    def message(self):
+        if self.passed:
+            return "Level Complete! Logic Verified."
+        return (
+            f"Failed at inputs: {self.inputs}. "
+            f"Got {self.actual}, expected {self.expected}."
+        )
+
+    def to_dict(self):
+        return {
+            "passed": self.passed,
+            "inputs": list(self.inputs) if self.inputs is not None else None,
+            "actual": self.actual,
+            "expected": self.expected,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        inputs = data.get("inputs")
+        return cls(
+            data["passed"],
+            tuple(inputs) if inputs is not None else None,
+            data.get("actual"),
+            data.get("expected"),
+        )
+
+
+def is_symbolic(level, netlist):
+    """True when verify_netlist proves the circuit instead of enumerating."""
+    return (
+        level.input_count > EXHAUSTIVE_MAX_INPUTS
+        and netlist.topological_order() is not None
+    )
+
+
+def _failure(level, netlist, inputs, proven=()):
+    return VerificationResult(
+        False,
+        inputs,
+        netlist.evaluate(inputs),
+        level.expected_outputs(inputs),
+        proven,
+    )
+
+
+def quick_reject(level, netlist, outputs=None):
+    """
+    Simulates the random signature patterns, on which most wrong circuits
+    already fail. True when they show a mismatch on the given output
+    positions (default: all). The failure to report still comes from
+    verify_netlist, so it is the first in itertools.product order rather
+    than whichever random pattern failed.
+    """
+    if 1 << level.input_count <= SIGNATURE_PATTERNS:
+        # No more combinations than patterns: enumerating is as cheap
+        return False
+    return find_mismatch(level, netlist, outputs) is not None
+
+
+def verify_netlist(level, netlist, outputs=None):
+    """
+    Checks a netlist against level.check_func for every input combination.
+    outputs limits the check to those output positions (default: all).
+    A failure reports the first failing combination in itertools.product
+    order, whichever engine finds it.
+    """
+    if outputs is None:
+        outputs = range(level.output_count)
+    outputs = list(outputs)
+    if not outputs:
+        return VerificationResult(True)
+    if is_symbolic(level, netlist):
+        try:
+            inputs = bdd.find_counterexample(level, netlist, outputs=outputs)
+        except bdd.BDDSizeLimit:
+            inputs = sat.find_counterexample(level, netlist, outputs)
+        if inputs is None:
+            return VerificationResult(True, proven=outputs)
+        return _failure(level, netlist, inputs)
+
+    # Every combination at once through one evaluator call
+    n = level.input_count
+    words, mask = exhaustive_input_words(n)
+    actual_tables = netlist_evaluator(netlist)(words, mask)
+    expected = expected_tables(level)
+    diffs = {k: actual_tables[k] ^ expected[k] for k in outputs}
+    proven = [k for k in outputs if not diffs[k]]
+    diff = 0
+    for d in diffs.values():
+        diff |= d
+    if not diff:
+        return VerificationResult(True, proven=proven)
+    # Lowest set bit is the first failing combination in itertools.product order
+    p = (diff & -diff).bit_length() - 1
+    inputs = tuple(bool(p >> (n - 1 - i) & 1) for i in range(n))
+    actual = [bool(w >> p & 1) for w in actual_tables]
+    return VerificationResult(
+        False, inputs, actual, level.expected_outputs(inputs), proven
+    )
+
+
+def expected_tables(level):
+    """Packed truth tables of level.check_func, computed once per level."""
+    key = (level.check_func, level.input_count, level.output_count)
+    if key not in _EXPECTED:
+        _EXPECTED[key] = level_truth_tables(level)
+    return _EXPECTED[key]
+
+
+class VerificationCache:
+    """
+    Verification results keyed by (level id, structural hash), so an unchanged
+    circuit or a duplicate saved solution is only ever checked once.
+
+    Outputs shown correct are also remembered by the hash of their fan-in
+    cone, so after an edit only the outputs whose cone changed are checked
+    again.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = {}
+        self.proven = set()  # (level id, output position, cone hash)
+        self.hits = 0
+        self.misses = 0
+        for key, data in (entries or {}).items():
+            self.entries[key] = VerificationResult.from_dict(data)
+
+    @staticmethod
+    def _key(level_id, circuit_hash):
+        return f"{level_id}:{circuit_hash}"
+
+    def get(self, level_id, circuit_hash):
+        result = self.entries.get(self._key(level_id, circuit_hash))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, level_id, circuit_hash, result):
+        self.entries[self._key(level_id, circuit_hash)] = result
+
+    def unproven(self, level, netlist):
+        """Positions of the outputs whose cone has not been proven correct."""
+        return [
+            k
+            for k, cone in enumerate(netlist.cone_hashes())
+            if (level.id, k, cone) not in self.proven
+        ]
+
+    def record(self, level, netlist, result):
+        self.put(level.id, netlist.structural_hash(), result)
+        cones = netlist.cone_hashes()
+        for k in result.proven:
+            self.proven.add((level.id, k, cones[k]))
+
+    def start(self, level, netlist, parallel=True):
+        """
+        Starts verifying a netlist; returns a VerificationJob. Cached and
+        narrow circuits are done at once. With parallel set, wide exhaustive
+        checks run on a process pool and the job has to be polled.
+        """
+        result = self.get(level.id, netlist.structural_hash())
+        if result is not None:
+            return VerificationJob(self, level, netlist, result)
+        # Checked in optimized form; the hashes stay those of the player's circuit
+        optimized = optimize(netlist)
+        outputs = self.unproven(level, netlist)
+        if (
+            parallel
+            and outputs
+            and level.input_count >= parallel_verify.PARALLEL_MIN_INPUTS
+            and not is_symbolic(level, optimized)
+            # Most wrong circuits already fail on the random signature;
+            # those are searched serially for their first failure
+            and not quick_reject(level, optimized, outputs)
+        ):
+            pool = parallel_verify.ParallelVerification(
+                level, optimized, outputs=outputs
+            )
+            return VerificationJob(self, level, netlist, pool=pool)
+        result = verify_netlist(level, optimized, outputs)
+        self.record(level, netlist, result)
+        return VerificationJob(self, level, netlist, result)
+
+    def verify(self, level, netlist):
+        return self.start(level, netlist, parallel=False).result
+
+    def to_dict(self):
+        return {key: result.to_dict() for key, result in self.entries.items()}
+
+
+class VerificationJob:
+    """
+    A verification started by VerificationCache.start. poll() never blocks:
+    it returns the result once known, recorded in the cache, else None.
+    """
+
+    def __init__(self, cache, level, netlist, result=None, pool=None):
+        self.cache = cache
+        self.level = level
+        self.netlist = netlist
+        self.result = result
+        self.pool = pool  # ParallelVerification still running, if any
+
+    @property
+    def progress(self):
+        return 1.0 if self.result is not None else self.pool.progress
+
+    def poll(self, timeout=0):
+        if self.result is None:
+            result = self.pool.poll(timeout)
+            if result is None:
+                return None
+            self.result = result
+            self.cache.record(self.level, self.netlist, result)
+        return self.result
+
+    def wait(self):
+        while self.poll(timeout=None) is None:
+            pass
+        return self.result
+
+    def cancel(self):
+        if self.pool is not None:
+            self.pool.cancel()
+
+
+def verify_solution(level, solution, cache=None):
+    """Verifies a saved solution dict without building any pygame nodes."""
+    cache = cache if cache is not None else VerificationCache()
+    netlist = Netlist.from_solution(level.input_count, level.output_count, solution)
+    return cache.verify(level, netlist)
+
+
+def verify_solutions(level, solutions, cache=None):
+    """
+    Bulk-verifies a cohort of saved solutions for one level.
+    Structurally identical solutions are checked once and share a result.
+    Returns the results in input order.
+    """
+    cache = cache if cache is not None else VerificationCache()
+    by_hash = {}
+    results = []
+    for solution in solutions:
+        netlist = Netlist.from_solution(
+            level.input_count, level.output_count, solution
+        )
+        circuit_hash = netlist.structural_hash()
+        if circuit_hash not in by_hash:
+            by_hash[circuit_hash] = cache.verify(level, netlist)
+        results.append(by_hash[circuit_hash])
+    return results
+
+
+def verify_circuit_files(level, paths, cache=None):
+    """Verifies netlist files (.v, .blif, native) against one level."""
+    cache = cache if cache is not None else VerificationCache()
+    for path in paths:
+        solution, input_names, output_names = load_circuit(path)
+        if (len(input_names), len(output_names)) != (
+            level.input_count,
+            level.output_count,
+        ):
+            print(
+                f"{path}: {len(input_names)} inputs/{len(output_names)} outputs, "
+                f"level {level.id} needs {level.input_count}/{level.output_count}"
+            )
+            continue
+        result = verify_solution(level, solution, cache)
+        print(f"{path}: {'passed' if result.passed else result.message}")
+
+
+def main(paths):
+    # Collect every level's solutions across all given save files
+    cohort = {}
+    for path in paths:
+        with open(path, "r") as f:
+            data = json.load(f)
+        for level_id, solution in data.get("solutions", {}).items():
+            cohort.setdefault(int(level_id), []).append((path, solution))
+
+    cache = VerificationCache()
+    for level_id in sorted(cohort):
+        level = LEVELS_BY_ID.get(level_id)
+        if not level or not level.check_func:
+            continue
+        entries = cohort[level_id]
+        results = verify_solutions(level, [sol for _, sol in entries], cache)
+        # Duplicate circuits share one result object
+        unique = len({id(r) for r in results})
+        # Different circuits computing the same function share a fingerprint
+        behaviours = {
+            fingerprint(
+                netlist_signature(
+                    Netlist.from_solution(level.input_count, level.output_count, sol)
+                )
+            )
+            for _, sol in entries
+        }
+        passed = sum(1 for r in results if r.passed)
+        print(
+            f"Level {level_id}: {passed}/{len(results)} passed "
+            f"({unique} unique circuits, {len(behaviours)} behaviours)"
+        )
+        for (path, _), result in zip(entries, results):
+            if not result.passed:
+                print(f"  {path}: {result.message}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify saved solutions")
+    parser.add_argument("paths", nargs="+", help="save files, or netlist files")
+    parser.add_argument(
+        "--level", type=int, help="verify netlist files against this level id"
+    )
+    args = parser.parse_args()
+    if args.level is not None:
+        verify_circuit_files(LEVELS_BY_ID[args.level], args.paths)
+    else:
+        main(args.paths)
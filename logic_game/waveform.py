@@ -0,0 +1,214 @@
+import bisect
+import datetime
+import threading
+from array import array
+
+import pygame
+
+from netlist import order_nodes
+from nodes import ClockNode, InputNode, OutputNode
+
+# Samples kept per signal in ring-buffer mode
+RING_CAPACITY = 4096
+
+WAVE_COLOR = (100, 255, 100)
+BUS_WAVE_COLOR = (100, 200, 255)
+PANEL_BG = (20, 20, 20)
+ROW_HEIGHT = 26
+LABEL_WIDTH = 140
+
+
+class Trace:
+    """
+    Value transitions of one signal as parallel time/value arrays.
+
+    With a capacity the arrays form a ring buffer that overwrites the oldest
+    transitions, so memory stays bounded however long the simulation runs.
+    """
+
+    def __init__(self, name, width=1, capacity=None):
+        self.name = name
+        self.width = width
+        self.capacity = capacity
+        self.times = array("Q")
+        self.values = array("Q")
+        self.start = 0  # index of the oldest sample once the ring is full
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, time, value):
+        if self.capacity is None or len(self.times) < self.capacity:
+            self.times.append(time)
+            self.values.append(value)
+        else:
+            self.times[self.start] = time
+            self.values[self.start] = value
+            self.start = (self.start + 1) % self.capacity
+
+    @property
+    def last_value(self):
+        if not self.times:
+            return None
+        return self.values[self.start - 1]
+
+    def samples(self):
+        """Returns (times, values) oldest first."""
+        if not self.start:
+            return self.times, self.values
+        s = self.start
+        return self.times[s:] + self.times[:s], self.values[s:] + self.values[:s]
+
+    def window(self, start_time):
+        """Value at start_time and the transitions after it."""
+        times, values = self.samples()
+        i = bisect.bisect_right(times, start_time)
+        initial = values[i - 1] if i else None
+        return initial, list(zip(times[i:], values[i:]))
+
+
+def _vcd_id(n):
+    # Short identifier codes from the printable ASCII range
+    chars = []
+    while True:
+        n, r = divmod(n, 94)
+        chars.append(chr(33 + r))
+        if not n:
+            return "".join(chars)
+        n -= 1
+
+
+class WaveformRecorder:
+    """
+    Records transitions of node outputs fed in by the event simulator.
+
+    A SimulationWorker writes the traces from its own thread. It holds
+    `lock` while it steps, and alias_pins, watch_nodes, write_vcd,
+    panel_signals and draw_waveforms take the lock themselves. Read
+    `traces` directly only while holding it.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self.traces = {}  # pin -> Trace, in the order signals were watched
+        # Pins of a simulated copy of the circuit -> the pins traces are keyed by
+        self.aliases = {}
+        self.lock = threading.Lock()
+
+    def alias_pins(self, pins, keys):
+        """Records changes of pins (e.g. on a worker's copy) under keys."""
+        with self.lock:
+            self.aliases = dict(zip(pins, keys))
+
+    def watch_nodes(self, nodes, time):
+        """Starts tracing every output of nodes, continuing existing traces."""
+        with self.lock:
+            self._watch_nodes(nodes, time)
+
+    def _watch_nodes(self, nodes, time):
+        input_nodes, output_nodes, user_nodes = order_nodes(nodes)
+        for idx, node in enumerate(input_nodes + output_nodes + user_nodes):
+            pins = node.output_pins()
+            for k, pin in enumerate(pins):
+                key = self.aliases.get(pin, pin)
+                if key not in self.traces:
+                    name = "".join(c if c.isalnum() else "_" for c in node.title)
+                    name = f"{name}_{idx}" + (f"_{k}" if len(pins) > 1 else "")
+                    width = getattr(node, "width", 1) if len(pins) == 1 else 1
+                    self.traces[key] = Trace(name, width, self.capacity)
+                self.record(pin, time, pin.value)
+
+    def record(self, pin, time, value):
+        trace = self.traces.get(self.aliases.get(pin, pin))
+        if trace is not None and trace.last_value != int(value):
+            trace.append(time, int(value))
+
+    def write_vcd(self, f, timescale="1ns"):
+        """Writes every trace as a Value Change Dump, one tick per timescale unit."""
+        with self.lock:
+            traces = [
+                (t.name, t.width, [a[:] for a in t.samples()])
+                for t in self.traces.values()
+            ]
+        codes = [_vcd_id(i) for i in range(len(traces))]
+        f.write(f"$date {datetime.datetime.now().isoformat()} $end\n")
+        f.write("$version Logic Nodes $end\n")
+        f.write(f"$timescale {timescale} $end\n")
+        f.write("$scope module circuit $end\n")
+        for (name, width, _), code in zip(traces, codes):
+            f.write(f"$var wire {width} {code} {name} $end\n")
+        f.write("$upscope $end\n$enddefinitions $end\n")
+
+        changes = {}
+        for (_, width, samples), code in zip(traces, codes):
+            for time, value in zip(*samples):
+                if width == 1:
+                    text = f"{value}{code}"
+                else:
+                    text = f"b{value:b} {code}"
+                changes.setdefault(time, []).append(text)
+
+        first = True
+        for time in sorted(changes):
+            f.write(f"#{time}\n")
+            if first:
+                f.write("$dumpvars\n")
+            f.write("\n".join(changes[time]) + "\n")
+            if first:
+                f.write("$end\n")
+                first = False
+
+
+def panel_signals(recorder, nodes):
+    """Pins shown in the waveform panel: fixed nodes, clocks and the selection."""
+    shown = []
+    with recorder.lock:
+        for node in nodes:
+            if node.selected or isinstance(node, (InputNode, OutputNode, ClockNode)):
+                shown.extend(p for p in node.output_pins() if p in recorder.traces)
+    return shown
+
+
+def draw_waveforms(surface, rect, recorder, pins, end_time, span, font):
+    """Draws the last `span` ticks before end_time of the given pins."""
+    with recorder.lock:
+        _draw_waveforms(surface, rect, recorder, pins, end_time, span, font)
+
+
+def _draw_waveforms(surface, rect, recorder, pins, end_time, span, font):
+    pygame.draw.rect(surface, PANEL_BG, rect)
+    pygame.draw.rect(surface, (80, 80, 80), rect, 1)
+    start_time = max(0, end_time - span)
+    plot_x = rect.x + LABEL_WIDTH
+    plot_w = rect.width - LABEL_WIDTH - 10
+
+    def x_of(time):
+        return plot_x + (time - start_time) * plot_w / max(1, span)
+
+    rows = (rect.height - 10) // ROW_HEIGHT
+    for row, pin in enumerate(pins[:rows]):
+        trace = recorder.traces[pin]
+        top = rect.y + 5 + row * ROW_HEIGHT
+        high, low = top + 4, top + ROW_HEIGHT - 6
+        label = font.render(trace.name, True, (200, 200, 200))
+        surface.blit(label, (rect.x + 5, top))
+
+        value, changes = trace.window(start_time)
+        x = plot_x
+        color = WAVE_COLOR if trace.width == 1 else BUS_WAVE_COLOR
+        for time, new_value in changes + [(end_time, None)]:
+            x_next = x_of(min(time, end_time))
+            if value is not None:
+                if trace.width == 1:
+                    y = high if value else low
+                    pygame.draw.line(surface, color, (x, y), (x_next, y))
+                    if new_value is not None:
+                        pygame.draw.line(surface, color, (x_next, high), (x_next, low))
+                else:
+                    pygame.draw.line(surface, color, (x, high), (x_next, high))
+                    pygame.draw.line(surface, color, (x, low), (x_next, low))
+                    if x_next - x > 30:
+                        text = font.render(f"{value:X}", True, color)
+                        surface.blit(text, (x + 4, top))
+                    pygame.draw.line(surface, color, (x_next, high), (x_next, low))
+            x, value = x_next, new_value